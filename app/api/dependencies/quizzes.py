@@ -1,6 +1,8 @@
 from fastapi import Query, Depends
+from fastapi.exceptions import HTTPException
+from starlette.status import HTTP_400_BAD_REQUEST
 
-from app.schemas.quiz import QuizFilters
+from app.schemas.quiz import QUIZ_SCALAR_FIELDS, QuizFieldSelection, QuizFilters, QuizGenerateRequest, QuizInclude
 from app.schemas.pagination import PaginationParams
 from app.api.dependencies.pagination import get_pagination_params
 
@@ -11,3 +13,48 @@ def get_quiz_filters(
     search: str = Query(None, description="Search text in quiz titles and descriptions"),
 ) -> QuizFilters:
     return QuizFilters(skip=pagination.skip, limit=pagination.limit, tag=tag, search=search)
+
+
+def _split_names(value: str, allowed: tuple[str, ...], parameter: str) -> set[str]:
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {parameter}: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}",
+        )
+    return names
+
+
+def get_quiz_field_selection(
+    fields: str = Query(None, description="Comma-separated quiz fields to return, e.g. id,title (id is always returned)"),
+    include: str = Query(None, description="Comma-separated related data to embed: tags, questions, options"),
+) -> QuizFieldSelection | None:
+    """None unless the client asked for a sparse response; endpoints then return their full default shape."""
+    if fields is None and include is None:
+        return None
+
+    selected_fields = QUIZ_SCALAR_FIELDS
+    if fields is not None:
+        names = _split_names(fields, QUIZ_SCALAR_FIELDS, "fields") | {"id"}
+        selected_fields = tuple(name for name in QUIZ_SCALAR_FIELDS if name in names)
+
+    includes = _split_names(include or "", tuple(item.value for item in QuizInclude), "include")
+    if QuizInclude.OPTIONS.value in includes:
+        includes.add(QuizInclude.QUESTIONS.value)
+
+    return QuizFieldSelection(
+        fields=selected_fields,
+        include=tuple(item for item in QuizInclude if item.value in includes),
+    )
+
+
+def get_quiz_generate_request(
+    prompt: str = Query(..., description="What the quiz should be about"),
+    num_questions: int = Query(5, description="Number of questions to generate"),
+    is_public: bool = Query(True),
+    tag_names: list[str] = Query([], description="Tags of the stored quiz; repeat the parameter for several"),
+    force_fresh: bool = Query(False, description="Call the model even if this prompt was generated recently"),
+) -> QuizGenerateRequest:
+    """QuizGenerateRequest from query parameters, for GET endpoints such as the SSE stream (EventSource cannot send a body)."""
+    return QuizGenerateRequest(prompt=prompt, num_questions=num_questions, is_public=is_public, tag_names=tag_names, force_fresh=force_fresh)
@@ -1,4 +1,7 @@
-from app.schemas.user import UsersFilters
+from fastapi import Query
+
+from app.schemas.quiz import LeaderboardWindow
+from app.schemas.user import UserLeaderboardFilters, UsersFilters
 
 
 def get_users_filters(skip: int | None = 0, limit: int | None = 100) -> UsersFilters:
@@ -6,3 +9,17 @@ def get_users_filters(skip: int | None = 0, limit: int | None = 100) -> UsersFil
         skip=skip,
         limit=limit,
     )
+
+
+def get_leaderboard_filters(
+    window: LeaderboardWindow = LeaderboardWindow.ALL,
+    limit: int = Query(20, ge=1, le=100),
+    after_score: int | None = None,
+    after_id: int | None = None,
+) -> UserLeaderboardFilters:
+    return UserLeaderboardFilters(
+        window=window,
+        limit=limit,
+        after_score=after_score,
+        after_id=after_id,
+    )
@@ -0,0 +1,41 @@
+"""
+Route class that skips FastAPI's second validation pass for responses services already built.
+
+Services construct their response models with `model_validate`, after which FastAPI would validate the returned
+object against `response_model` again and turn it into plain Python data before encoding it. When an endpoint returns
+an instance of exactly the declared response model, `PrevalidatedRoute` hands it straight to `FastJSONResponse`,
+which serializes it once. Any other return value (a subclass, a dict, a Response) takes the regular FastAPI path.
+"""
+import asyncio
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from app.utils.responses import FastJSONResponse
+
+
+class PrevalidatedRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, endpoint, **kwargs)
+
+        response_model = self.response_model
+        call = self.dependant.call
+        if not (isinstance(response_model, type) and issubclass(response_model, BaseModel)):
+            return
+        if not asyncio.iscoroutinefunction(call):
+            return
+
+        status_code = self.status_code or 200
+
+        @wraps(call)
+        async def call_prevalidated(**values: Any) -> Any:
+            value = await call(**values)
+            if type(value) is response_model:
+                return FastJSONResponse(content=value, status_code=status_code)
+            return value
+
+        # The request handler built above looks the call up on the dependant at request time
+        self.dependant.call = call_prevalidated
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1 import answers, auth, questions, quiz_attempts, quizzes, tags, users
+from app.api.v1 import admin, answers, auth, questions, quiz_attempts, quizzes, tags, users
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -10,3 +10,4 @@ api_router.include_router(quizzes.router, prefix="/quizzes", tags=["quizzes"])
 api_router.include_router(questions.router, prefix="/questions", tags=["questions"])
 api_router.include_router(answers.router, prefix="/answers", tags=["answers"])
 api_router.include_router(tags.router, prefix="/tags", tags=["tags"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
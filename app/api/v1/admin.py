@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends
+from starlette.status import HTTP_200_OK
+
+from app.api.dependencies.auth import get_current_admin_user
+from app.api.routing import PrevalidatedRoute
+from app.models.user import User
+from app.schemas.trace import TraceFilters, TraceOutData, TraceResponse
+from app.utils import ERROR_RESPONSES
+from app.utils.tracing import tracer
+
+router = APIRouter(route_class=PrevalidatedRoute)
+
+
+@router.get(
+    path="/traces",
+    status_code=HTTP_200_OK,
+    response_model=TraceResponse,
+    responses=ERROR_RESPONSES,
+    name="admin:traces",
+)
+async def get_recent_traces(
+    *,
+    trace_filters: TraceFilters = Depends(),
+    current_user: User = Depends(get_current_admin_user()),
+):
+    """
+    Most recent request traces kept by this worker, newest first (admin only; empty unless tracing is enabled).
+    """
+    if tracer.buffer is None:
+        return TraceResponse(message="Tracing is disabled", data=[], detail=None)
+
+    traces = tracer.buffer.recent(trace_filters.limit, min_duration_ms=trace_filters.min_duration_ms or 0.0)
+    return TraceResponse(data=[TraceOutData.from_spans(spans) for spans in traces], detail={"count": len(traces)})
@@ -4,8 +4,8 @@ from starlette.status import HTTP_200_OK, HTTP_201_CREATED
 from app.api.dependencies.auth import get_current_user_auth
 from app.api.dependencies.database import get_repository
 from app.api.dependencies.service import get_service
+from app.api.routing import PrevalidatedRoute
 from app.database.repositories.answers import AnswersRepository
-from app.database.repositories.options import OptionsRepository
 from app.database.repositories.questions import QuestionsRepository
 from app.database.repositories.quizzes import QuizzesRepository
 from app.models.user import User
@@ -13,7 +13,7 @@ from app.schemas.answer import AnswerResponse, AnswerSubmit, QuizResultResponse
 from app.services.answers import AnswersService
 from app.utils import ERROR_RESPONSES
 
-router = APIRouter()
+router = APIRouter(route_class=PrevalidatedRoute)
 
 
 @router.post(
@@ -29,7 +29,6 @@ async def submit_answers_to_attempt(
     answers_service: AnswersService = Depends(get_service(AnswersService)),
     answers_repo: AnswersRepository = Depends(get_repository(AnswersRepository)),
     questions_repo: QuestionsRepository = Depends(get_repository(QuestionsRepository)),
-    options_repo: OptionsRepository = Depends(get_repository(OptionsRepository)),
     answers: list[AnswerSubmit],
     current_user: User = Depends(get_current_user_auth()),
 ):
@@ -42,7 +41,6 @@ async def submit_answers_to_attempt(
         answers=answers,
         answers_repo=answers_repo,
         questions_repo=questions_repo,
-        options_repo=options_repo,
     )
 
     return await result.unwrap()
@@ -4,6 +4,7 @@ from starlette.status import HTTP_200_OK, HTTP_201_CREATED
 from app.api.dependencies.auth import get_current_user_auth
 from app.api.dependencies.database import get_repository
 from app.api.dependencies.service import get_service
+from app.api.routing import PrevalidatedRoute
 from app.core.config import get_app_settings
 from app.core.settings.app import AppSettings
 from app.database.repositories.users import UsersRepository
@@ -12,7 +13,7 @@ from app.schemas.user import UserInCreate, UserInSignIn, UserResponse
 from app.services.users import UsersService
 from app.utils import ERROR_RESPONSES
 
-router = APIRouter()
+router = APIRouter(route_class=PrevalidatedRoute)
 
 
 @router.get(
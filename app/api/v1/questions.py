@@ -5,6 +5,7 @@ from app.api.dependencies.auth import get_current_admin_user
 from app.api.dependencies.database import get_repository
 from app.api.dependencies.questions import get_question_filters
 from app.api.dependencies.service import get_service
+from app.api.routing import PrevalidatedRoute
 from app.database.repositories.options import OptionsRepository
 from app.database.repositories.questions import QuestionsRepository
 from app.database.repositories.quizzes import QuizzesRepository
@@ -13,7 +14,7 @@ from app.schemas.question import QuestionFilters, QuestionInCreate, QuestionInUp
 from app.services.questions import QuestionsService
 from app.utils import ERROR_RESPONSES
 
-router = APIRouter()
+router = APIRouter(route_class=PrevalidatedRoute)
 
 
 @router.post(
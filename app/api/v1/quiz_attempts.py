@@ -16,17 +16,19 @@ from starlette.status import HTTP_200_OK, HTTP_201_CREATED
 from app.api.dependencies.auth import get_current_user_auth
 from app.api.dependencies.database import get_repository
 from app.api.dependencies.service import get_service
+from app.api.routing import PrevalidatedRoute
 from app.database.repositories.quiz_attempts import QuizAttemptsRepository
 from app.database.repositories.quizzes import QuizzesRepository
 from app.database.repositories.questions import QuestionsRepository
 from app.database.repositories.answers import AnswersRepository
+from app.database.repositories.score_rollups import ScoreRollupsRepository
 from app.models.user import User
-from app.schemas.quiz_attempt import AttemptResponse, AttemptSubmission, AttemptDetailResponse
+from app.schemas.quiz_attempt import AttemptResponse, AttemptSubmission, AttemptDetailResponse, BestAttemptResponse
 from app.schemas.answer import QuizResultResponse
 from app.services.quiz_attempts import QuizAttemptsService
 from app.utils import ERROR_RESPONSES
 
-router = APIRouter()
+router = APIRouter(route_class=PrevalidatedRoute)
 
 
 @router.post(
@@ -39,18 +41,18 @@ router = APIRouter()
     summary="Start a new quiz attempt",
     description="""
     **Start a new quiz attempt for the authenticated user.**
-    
+
     This endpoint:
     - Creates a new quiz attempt record
     - Auto-increments the attempt number for this user/quiz combination
     - Returns the attempt ID that must be used when submitting answers
     - Checks if user already has an unfinished attempt for this quiz
-    
+
     **Requirements:**
     - User must be authenticated
     - Quiz must exist and be accessible to the user
     - User cannot have an existing unfinished attempt for this quiz
-    
+
     **Response includes:**
     - Attempt ID (required for answer submissions)
     - Quiz ID and attempt number
@@ -91,21 +93,21 @@ async def start_quiz_attempt(
     summary="Submit and finish a quiz attempt",
     description="""
     **Submit and finalize a quiz attempt.**
-    
+
     This endpoint:
     - Marks the attempt as finished with a completion timestamp
     - Calculates the final score based on correct answers
     - Returns detailed quiz results including score breakdown
-    - Updates user's total score if applicable
-    
+    - Adds any improvement over the user's previous best on this quiz to their total score
+
     **Requirements:**
     - User must be authenticated and own the attempt
     - Attempt must exist and not be already finished
     - All required answers should be submitted before finishing
-    
+
     **Request Body:**
     - Empty JSON object `{}` (just triggers the submission)
-    
+
     **Response includes:**
     - Final score and percentage
     - Number of correct/incorrect answers
@@ -127,6 +129,7 @@ async def submit_quiz_attempt(
     attempts_repo: QuizAttemptsRepository = Depends(get_repository(QuizAttemptsRepository)),
     questions_repo: QuestionsRepository = Depends(get_repository(QuestionsRepository)),
     answers_repo: AnswersRepository = Depends(get_repository(AnswersRepository)),
+    rollups_repo: ScoreRollupsRepository = Depends(get_repository(ScoreRollupsRepository)),
     current_user: User = Depends(get_current_user_auth()),
 ):
     result = await attempts_service.submit_quiz_attempt(
@@ -135,6 +138,44 @@ async def submit_quiz_attempt(
         attempts_repo=attempts_repo,
         questions_repo=questions_repo,
         answers_repo=answers_repo,
+        rollups_repo=rollups_repo,
+    )
+
+    return await result.unwrap()
+
+
+@router.get(
+    path="/attempts/best",
+    status_code=HTTP_200_OK,
+    response_model=BestAttemptResponse,
+    responses=ERROR_RESPONSES,
+    name="attempts:get_user_best_attempts",
+    tags=["Quiz Attempts"],
+    summary="Get the current user's best attempt per quiz",
+    description="""
+    **Retrieve the authenticated user's best result on every quiz they have finished.**
+
+    This endpoint:
+    - Returns one entry per quiz, most recently played first
+    - Reads the maintained per-quiz summary instead of scanning attempt history
+
+    **Requirements:**
+    - User must be authenticated
+
+    **Response includes:**
+    - Best score, the attempt that reached it and when it was finished
+    - Number of finished attempts and when the latest one was finished
+    """,
+)
+async def get_user_best_attempts(
+    *,
+    attempts_service: QuizAttemptsService = Depends(get_service(QuizAttemptsService)),
+    attempts_repo: QuizAttemptsRepository = Depends(get_repository(QuizAttemptsRepository)),
+    current_user: User = Depends(get_current_user_auth()),
+):
+    result = await attempts_service.get_user_best_attempts(
+        user=current_user,
+        attempts_repo=attempts_repo,
     )
 
     return await result.unwrap()
@@ -150,23 +191,23 @@ async def submit_quiz_attempt(
     summary="Get detailed quiz attempt with questions and user answers",
     description="""
     **Retrieve detailed information about a quiz attempt including questions, options, and user's answers.**
-    
+
     This endpoint:
     - Returns complete attempt metadata (ID, quiz ID, user ID, attempt number, timing, score)
     - Includes all questions in the quiz with their options
     - Shows user's submitted answers for this attempt
     - Perfect for reviewing attempt details or showing quiz results
-    
+
     **Requirements:**
     - User must be authenticated
     - Attempt must exist
-    
+
     **Response includes:**
     - Complete attempt information (start/finish times, score, etc.)
     - All quiz questions with their text, type, points, and options
     - User's submitted answers (selected options or text responses)
     - Correctness indicators for each answer
-    
+
     **Use cases:**
     - Show detailed quiz results to users
     - Review attempt performance
@@ -207,18 +248,18 @@ async def get_attempt_details_by_id(
     summary="Get quiz attempt details by ID",
     description="""
     **Retrieve detailed information about a specific quiz attempt.**
-    
+
     This endpoint:
     - Returns attempt metadata (ID, quiz ID, user ID, attempt number)
     - Shows timing information (started/finished timestamps)
     - Displays current or final score
     - Includes related quiz and user information
-    
+
     **Requirements:**
     - User must be authenticated
     - Attempt must exist
     - Can view any attempt (useful for reviewing past attempts)
-    
+
     **Response includes:**
     - Attempt ID and attempt number
     - Associated quiz and user information
@@ -256,24 +297,24 @@ async def get_attempt_by_id(
     summary="Get all user attempts for a specific quiz",
     description="""
     **Retrieve all quiz attempts by the current user for a specific quiz.**
-    
+
     This endpoint:
     - Returns all attempts made by the authenticated user for the specified quiz
     - Ordered by attempt number (first attempt to latest attempt)
     - Includes both finished and unfinished attempts
     - Useful for showing user's quiz history and progress
-    
+
     **Requirements:**
     - User must be authenticated
     - Quiz must exist
     - Only returns attempts for the current user (privacy protection)
-    
+
     **Response includes:**
     - Array of attempt objects
     - Each attempt contains: ID, attempt number, timestamps, scores
     - Finished status for each attempt
     - Complete attempt history for the user on this quiz
-    
+
     **Use cases:**
     - Show user their quiz attempt history
     - Display progress tracking
@@ -312,15 +353,15 @@ async def get_user_attempts_for_quiz(
     summary="Get all attempts by the current user",
     description="""
     **Retrieve all quiz attempts made by the authenticated user.**
-    
+
     This endpoint:
     - Returns all attempts made by the current user across all quizzes
     - Useful for showing user's complete attempt history
     - Includes both finished and unfinished attempts
-    
+
     **Requirements:**
     - User must be authenticated
-    
+
     **Response includes:**
     - Array of attempt objects
     - Each attempt contains: ID, quiz ID, attempt number, timestamps, scores
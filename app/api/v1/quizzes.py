@@ -1,21 +1,33 @@
-from fastapi import APIRouter, Depends
-from starlette.status import HTTP_200_OK, HTTP_201_CREATED
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_202_ACCEPTED
 
-from app.api.dependencies.auth import get_current_admin_user
+from app.api.dependencies.auth import get_current_admin_user, get_current_user_auth
 from app.api.dependencies.database import get_repository
-from app.api.dependencies.quizzes import get_quiz_filters
+from app.api.dependencies.quizzes import get_quiz_field_selection, get_quiz_filters, get_quiz_generate_request
 from app.api.dependencies.service import get_service
+from app.api.routing import PrevalidatedRoute
+from app.database.repositories.generation_jobs import GenerationJobsRepository
 from app.database.repositories.quizzes import QuizzesRepository
 from app.database.repositories.tags import TagsRepository
 from app.database.repositories.questions import QuestionsRepository
 from app.database.repositories.options import OptionsRepository
+from app.database.repositories.score_rollups import ScoreRollupsRepository
+from app.models.generation_job import GenerationJobStatus
 from app.models.user import User
-from app.schemas.quiz import QuizFilters, QuizInCreate, QuizInUpdate, QuizResponse, QuizDetailResponse, QuizPaginatedResponse, LeaderboardResponse, QuizGenerateRequest
+from app.schemas.quiz import QuizFieldSelection, QuizFilters, QuizInCreate, QuizInUpdate, QuizResponse, QuizDetailResponse, QuizPaginatedResponse, LeaderboardResponse, LeaderboardPositionResponse, LeaderboardWindow, QuizGenerateRequest
+from app.schemas.generation_job import GenerationJobResponse
+from app.services.quiz_attempts import QuizAttemptsService
+from app.services.quiz_generation import QuizGenerationService
 from app.services.quizzes import QuizzesService
-# GeminiAIService will be imported when needed
 from app.utils import ERROR_RESPONSES
+from app.utils.export import EXPORT_MEDIA_TYPES, ExportFormat
+from app.utils.popularity import search_terms
+from app.utils.response_cache import encoded_body, json_response, listing_responses
+from app.utils.responses import FastJSONResponse
+from app.utils.sse import SSE_HEADERS, SSE_MEDIA_TYPE
 
-router = APIRouter()
+router = APIRouter(route_class=PrevalidatedRoute)
 
 
 @router.post(
@@ -52,68 +64,97 @@ async def create_quiz(
 
 @router.post(
     path="/generate",
-    status_code=HTTP_201_CREATED,
-    response_model=QuizResponse,
-    responses=ERROR_RESPONSES,
+    status_code=HTTP_202_ACCEPTED,
+    response_model=GenerationJobResponse,
+    responses={
+        **ERROR_RESPONSES,
+        HTTP_201_CREATED: {"model": GenerationJobResponse, "description": "Quiz created from a pre-generated quiz"},
+    },
     name="quizzes:generate",
 )
 async def generate_quiz(
     *,
+    http_request: Request,
     request: QuizGenerateRequest,
-    quizzes_service: QuizzesService = Depends(get_service(QuizzesService)),
-    quizzes_repo: QuizzesRepository = Depends(get_repository(QuizzesRepository)),
-    tags_repo: TagsRepository = Depends(get_repository(TagsRepository)),
-    questions_repo: QuestionsRepository = Depends(get_repository(QuestionsRepository)),
-    options_repo: OptionsRepository = Depends(get_repository(OptionsRepository)),
+    generation_service: QuizGenerationService = Depends(get_service(QuizGenerationService)),
+    jobs_repo: GenerationJobsRepository = Depends(get_repository(GenerationJobsRepository)),
     current_user: User = Depends(get_current_admin_user()),
 ):
     """
-    Generate a quiz using AI based on the provided prompt.
+    Queue generation of a quiz using AI based on the provided prompt.
+    Returns 202 with the job; poll the URL in the Location header until it has succeeded (its quiz_id is set) or failed.
+    Returns 201 with the succeeded job instead when a quiz pre-generated for the prompt's topic (or a cached one)
+    could be used right away.
     """
-    from app.services.gemini_ai import GeminiAIService
-    gemini_service = GeminiAIService()
-    
-    ai_quiz_data = await gemini_service.generate_quiz_from_prompt(
-        prompt=request.prompt,
-        num_questions=request.num_questions
+    result = await generation_service.submit_generation(
+        creator=current_user,
+        request=request,
+        jobs_repo=jobs_repo,
     )
-    
-    from app.schemas.question import QuestionInQuizCreate
-    from app.schemas.option import OptionInCreate
-    
-    questions = []
-    for question_data in ai_quiz_data.questions:
-        options = [
-            OptionInCreate(
-                option_text=option_text,
-                is_correct=(i == question_data.correct_answer)
-            )
-            for i, option_text in enumerate(question_data.options)
-        ]
-        
-        questions.append(
-            QuestionInQuizCreate(
-                question_text=question_data.question_text,
-                question_type="single",
-                options=options
-            )
-        )
-    
-    quiz_in = QuizInCreate(
-        title=ai_quiz_data.title,
-        description=ai_quiz_data.description,
-        is_public=request.is_public,
-        tag_names=request.tag_names,
-        questions=questions
+
+    job_response = await result.unwrap()
+    queued = job_response.data.status == GenerationJobStatus.PENDING
+    if queued:
+        http_request.app.state.generation_workers.notify()
+
+    return FastJSONResponse(
+        content=job_response,
+        status_code=HTTP_202_ACCEPTED if queued else HTTP_201_CREATED,
+        headers={"Location": str(http_request.url_for("quizzes:get_generation_job", job_id=job_response.data.id))},
     )
-    
-    result = await quizzes_service.create_quiz(
+
+
+@router.get(
+    path="/generate/stream",
+    status_code=HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        **ERROR_RESPONSES,
+        HTTP_200_OK: {"content": {SSE_MEDIA_TYPE: {}}},
+    },
+    name="quizzes:generate_stream",
+)
+async def stream_generated_quiz(
+    *,
+    request: QuizGenerateRequest = Depends(get_quiz_generate_request),
+    generation_service: QuizGenerationService = Depends(get_service(QuizGenerationService)),
+    current_user: User = Depends(get_current_admin_user()),
+):
+    """
+    Generate a quiz using AI and stream it as Server-Sent Events while the model writes it.
+    - `field` events carry the title and description, `question` events each question as soon as it is complete
+    - the quiz is stored when generation finishes and sent in a final `done` event; failures end with an `error` event
+    """
+    result = await generation_service.stream_generation(
         creator=current_user,
-        quiz_in=quiz_in,
-        quizzes_repo=quizzes_repo,
-        tags_repo=tags_repo,
-        questions_repo=questions_repo,
-        options_repo=options_repo,
+        request=request,
+    )
+    events = await result.unwrap()
+
+    return StreamingResponse(events, media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+
+@router.get(
+    path="/generate/{job_id}",
+    status_code=HTTP_200_OK,
+    response_model=GenerationJobResponse,
+    responses=ERROR_RESPONSES,
+    name="quizzes:get_generation_job",
+)
+async def get_generation_job(
+    *,
+    job_id: int,
+    generation_service: QuizGenerationService = Depends(get_service(QuizGenerationService)),
+    jobs_repo: GenerationJobsRepository = Depends(get_repository(GenerationJobsRepository)),
+    current_user: User = Depends(get_current_admin_user()),
+):
+    """
+    Get the status of a quiz generation job you queued, and the generated quiz id once it succeeded.
+    """
+    result = await generation_service.get_generation_job(
+        job_id=job_id,
+        user=current_user,
+        jobs_repo=jobs_repo,
     )
 
     return await result.unwrap()
@@ -131,16 +172,28 @@ async def get_all_quizzes(
     quizzes_service: QuizzesService = Depends(get_service(QuizzesService)),
     quizzes_repo: QuizzesRepository = Depends(get_repository(QuizzesRepository)),
     quiz_filters: QuizFilters = Depends(get_quiz_filters),
+    selection: QuizFieldSelection | None = Depends(get_quiz_field_selection),
 ):
     """
     Get all public quizzes.
+    - Use 'fields' (e.g. id,title) and 'include' (tags) to return only what the client needs
+    Rendered pages are cached briefly per worker and dropped on any quiz or tag write.
     """
+    cache_key = listing_responses.key("quizzes:get_all", skip=quiz_filters.skip, limit=quiz_filters.limit, selection=selection)
+    cached_body = listing_responses.get(cache_key)
+    if cached_body is not None:
+        return json_response(cached_body)
+
+    generation = listing_responses.generation
     result = await quizzes_service.get_all_quizzes(
         quiz_filters=quiz_filters,
         quizzes_repo=quizzes_repo,
+        selection=selection,
     )
 
-    return await result.unwrap()
+    body = encoded_body(await result.unwrap())
+    listing_responses.set(cache_key, body, generation)
+    return json_response(body)
 
 
 @router.get(
@@ -155,19 +208,41 @@ async def search_quizzes(
     quizzes_service: QuizzesService = Depends(get_service(QuizzesService)),
     quizzes_repo: QuizzesRepository = Depends(get_repository(QuizzesRepository)),
     quiz_filters: QuizFilters = Depends(get_quiz_filters),
+    selection: QuizFieldSelection | None = Depends(get_quiz_field_selection),
 ):
     """
     Search quizzes by text (title/description) or tag. 
     - Use 'search' parameter for text search in quiz titles and descriptions
     - Use 'tag' parameter for tag-based search
-    - If no parameters provided, returns all public quizzes
+    - Use 'fields' (e.g. id,title) and 'include' (tags) to return only what the client needs
+    - If no parameters provided, returns all public quizzes (cached briefly like the plain listing)
     """
+    if quiz_filters.search or quiz_filters.tag:
+        search_terms.record(quiz_filters.search or quiz_filters.tag)
+        result = await quizzes_service.search_quizzes(
+            quiz_filters=quiz_filters,
+            quizzes_repo=quizzes_repo,
+            selection=selection,
+        )
+
+        value = await result.unwrap()
+        return json_response(value) if selection is not None else value
+
+    cache_key = listing_responses.key("quizzes:search", skip=quiz_filters.skip, limit=quiz_filters.limit, selection=selection)
+    cached_body = listing_responses.get(cache_key)
+    if cached_body is not None:
+        return json_response(cached_body)
+
+    generation = listing_responses.generation
     result = await quizzes_service.search_quizzes(
         quiz_filters=quiz_filters,
         quizzes_repo=quizzes_repo,
+        selection=selection,
     )
 
-    return await result.unwrap()
+    body = encoded_body(await result.unwrap())
+    listing_responses.set(cache_key, body, generation)
+    return json_response(body)
 
 
 @router.get(
@@ -182,16 +257,20 @@ async def get_quiz_by_id(
     quiz_id: int,
     quizzes_service: QuizzesService = Depends(get_service(QuizzesService)),
     quizzes_repo: QuizzesRepository = Depends(get_repository(QuizzesRepository)),
+    selection: QuizFieldSelection | None = Depends(get_quiz_field_selection),
 ):
     """
     Get a quiz by ID with all questions and their options.
+    - Use 'fields' and 'include' (tags, questions, options) to load and return only part of the quiz
+    The document is rendered by Postgres and streamed back as-is (see QuizzesService.get_quiz_document).
     """
-    result = await quizzes_service.get_quiz_by_id(
+    result = await quizzes_service.get_quiz_document(
         quiz_id=quiz_id,
         quizzes_repo=quizzes_repo,
+        selection=selection,
     )
 
-    return await result.unwrap()
+    return json_response(await result.unwrap())
 
 
 @router.get(
@@ -207,17 +286,21 @@ async def get_quizzes_by_user(
     quizzes_service: QuizzesService = Depends(get_service(QuizzesService)),
     quizzes_repo: QuizzesRepository = Depends(get_repository(QuizzesRepository)),
     quiz_filters: QuizFilters = Depends(get_quiz_filters),
+    selection: QuizFieldSelection | None = Depends(get_quiz_field_selection),
 ):
     """
     Get quizzes created by a specific user.
+    - Use 'fields' (e.g. id,title) and 'include' (tags) to return only what the client needs
     """
     result = await quizzes_service.get_quizzes_by_user(
         user_id=user_id,
         quiz_filters=quiz_filters,
         quizzes_repo=quizzes_repo,
+        selection=selection,
     )
 
-    return await result.unwrap()
+    value = await result.unwrap()
+    return json_response(value) if selection is not None else value
 
 
 @router.put(
@@ -263,20 +346,89 @@ async def update_quiz(
 async def get_quiz_leaderboard(
     *,
     quiz_id: int,
+    window: LeaderboardWindow = LeaderboardWindow.ALL,
     quizzes_service: QuizzesService = Depends(get_service(QuizzesService)),
     quizzes_repo: QuizzesRepository = Depends(get_repository(QuizzesRepository)),
+    rollups_repo: ScoreRollupsRepository = Depends(get_repository(ScoreRollupsRepository)),
 ):
     """
     Get the leaderboard for a specific quiz showing top scoring attempts.
+    - Use 'window' to rank only attempts finished in the current UTC day or week (weeks start on Monday)
     """
     result = await quizzes_service.get_quiz_leaderboard(
         quiz_id=quiz_id,
         quizzes_repo=quizzes_repo,
+        rollups_repo=rollups_repo,
+        window=window,
+    )
+
+    return await result.unwrap()
+
+
+@router.get(
+    path="/{quiz_id}/leaderboard/me",
+    status_code=HTTP_200_OK,
+    response_model=LeaderboardPositionResponse,
+    responses=ERROR_RESPONSES,
+    name="quizzes:get_leaderboard_position",
+)
+async def get_quiz_leaderboard_position(
+    *,
+    quiz_id: int,
+    neighbours: int = Query(2, ge=0, le=10),
+    current_user: User = Depends(get_current_user_auth()),
+    quizzes_service: QuizzesService = Depends(get_service(QuizzesService)),
+    quizzes_repo: QuizzesRepository = Depends(get_repository(QuizzesRepository)),
+):
+    """
+    Get the current user's best attempt on a quiz, their rank and the entries directly above and below them.
+    """
+    result = await quizzes_service.get_leaderboard_position(
+        quiz_id=quiz_id,
+        user=current_user,
+        quizzes_repo=quizzes_repo,
+        neighbours=neighbours,
     )
 
     return await result.unwrap()
 
 
+@router.get(
+    path="/{quiz_id}/export",
+    status_code=HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        **ERROR_RESPONSES,
+        HTTP_200_OK: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}},
+    },
+    name="quizzes:export_results",
+)
+async def export_quiz_results(
+    *,
+    quiz_id: int,
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    attempts_service: QuizAttemptsService = Depends(get_service(QuizAttemptsService)),
+    quizzes_repo: QuizzesRepository = Depends(get_repository(QuizzesRepository)),
+    current_user: User = Depends(get_current_admin_user()),
+):
+    """
+    Export every attempt on a quiz with its answers (admin only), one row per answer, as NDJSON or CSV.
+    Rows are streamed from a server-side cursor in constant memory.
+    """
+    result = await attempts_service.export_quiz_results(
+        quiz_id=quiz_id,
+        export_format=export_format,
+        quizzes_repo=quizzes_repo,
+    )
+    chunks = await result.unwrap()
+
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="quiz-{quiz_id}-results.{export_format.value}"'},
+    )
+
+
 @router.delete(
     path="/{quiz_id}",
     status_code=HTTP_200_OK,
@@ -4,13 +4,14 @@ from starlette.status import HTTP_200_OK, HTTP_201_CREATED
 from app.api.dependencies.auth import get_current_admin_user
 from app.api.dependencies.database import get_repository
 from app.api.dependencies.service import get_service
+from app.api.routing import PrevalidatedRoute
 from app.database.repositories.tags import TagsRepository
 from app.models.user import User
 from app.schemas.tag import TagFilters, TagInCreate, TagInUpdate, TagResponse
 from app.services.tags import TagsService
 from app.utils import ERROR_RESPONSES
 
-router = APIRouter()
+router = APIRouter(route_class=PrevalidatedRoute)
 
 
 @router.post(
@@ -4,14 +4,16 @@ from starlette.status import HTTP_200_OK
 from app.api.dependencies.auth import get_current_user_auth
 from app.api.dependencies.database import get_repository
 from app.api.dependencies.service import get_service
-from app.api.dependencies.users import get_users_filters
+from app.api.dependencies.users import get_leaderboard_filters, get_users_filters
+from app.api.routing import PrevalidatedRoute
+from app.database.repositories.score_rollups import ScoreRollupsRepository
 from app.database.repositories.users import UsersRepository
 from app.models.user import User
-from app.schemas.user import UserInUpdate, UserResponse, UsersFilters
+from app.schemas.user import UserInUpdate, UserLeaderboardFilters, UserLeaderboardResponse, UserResponse, UsersFilters
 from app.services.users import UsersService
 from app.utils import ERROR_RESPONSES
 
-router = APIRouter()
+router = APIRouter(route_class=PrevalidatedRoute)
 
 
 @router.get(
@@ -35,6 +37,34 @@ async def read_users(
     return await result.unwrap()
 
 
+@router.get(
+    "/leaderboard",
+    status_code=HTTP_200_OK,
+    response_model=UserLeaderboardResponse,
+    responses=ERROR_RESPONSES,
+    name="users:leaderboard",
+)
+async def read_leaderboard(
+    *,
+    users_service: UsersService = Depends(get_service(UsersService)),
+    users_repo: UsersRepository = Depends(get_repository(UsersRepository)),
+    leaderboard_filters: UserLeaderboardFilters = Depends(get_leaderboard_filters),
+    rollups_repo: ScoreRollupsRepository = Depends(get_repository(ScoreRollupsRepository)),
+) -> UserLeaderboardResponse:
+    """
+    Global leaderboard ordered by total score (sum of each user's best score per quiz).
+    Pass next_after_score / next_after_id from the previous page as after_score / after_id to continue.
+    Use 'window' to rank by scores earned in the current UTC day or week instead of all time.
+    """
+    result = await users_service.get_leaderboard(
+        users_repo=users_repo,
+        rollups_repo=rollups_repo,
+        leaderboard_filters=leaderboard_filters,
+    )
+
+    return await result.unwrap()
+
+
 @router.get(
     "/{user_id}",
     status_code=HTTP_200_OK,
@@ -0,0 +1,29 @@
+"""
+Precompress static assets into .gz (and .zst when zstandard is installed) siblings.
+
+The app also does this at startup when STATIC_PRECOMPRESS is enabled; run it at build time so containers with a
+read-only filesystem still serve precompressed assets:
+
+    python -m app.commands.compress_static --directory app/static
+"""
+import argparse
+import logging
+
+from app.utils.compression import precompress_directory
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--directory", default="app/static")
+    parser.add_argument("--minimum-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    count = precompress_directory(args.directory, minimum_size=args.minimum_size)
+    logger.info("Done, %s files precompressed.", count)
+
+
+if __name__ == "__main__":
+    main()
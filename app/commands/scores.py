@@ -0,0 +1,57 @@
+"""
+Recompute users.total_score from finished quiz attempts.
+
+total_score is maintained incrementally when an attempt is submitted; run this once after
+deploying that change (and whenever scores are suspected to have drifted):
+
+    python -m app.commands.scores --batch-size 1000
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import get_app_settings
+from app.database.repositories.users import UsersRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def recompute_total_scores(batch_size: int) -> int:
+    settings = get_app_settings()
+    engine = create_async_engine(url=str(settings.db_url), future=True)
+    updated = 0
+
+    try:
+        async with AsyncSession(bind=engine) as session:
+            users_repo = UsersRepository(session)
+            id_range = await users_repo.get_user_id_range()
+            if not id_range:
+                return 0
+
+            first_id, last_id = id_range
+            for batch_start in range(first_id, last_id + 1, batch_size):
+                batch_end = min(batch_start + batch_size - 1, last_id)
+                updated += await users_repo.recompute_total_scores(first_id=batch_start, last_id=batch_end)
+                # Commit per batch so row locks on users are held only briefly
+                await session.commit()
+                logger.info("Recomputed total scores for users %s..%s", batch_start, batch_end)
+    finally:
+        await engine.dispose()
+
+    return updated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    updated = asyncio.run(recompute_total_scores(batch_size=args.batch_size))
+    logger.info("Done, %s users updated.", updated)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ SUCCESS_MATCHED_USER_TOKEN = "The user who matched with token."
 SUCCESS_MATCHED_USER_EMAIL = "The user who matched with email."
 SUCCESS_UPDATE_USER = "Updated user data successfully."
 SUCCESS_DELETE_USER = "Deleted user successfully."
+SUCCESS_GET_LEADERBOARD = "Global leaderboard retrieved successfully."
 
 # FAIL
 FAIL_VALIDATION_USER_DUPLICATED = "There is a duplicate user already."
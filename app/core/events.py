@@ -2,19 +2,29 @@ from collections.abc import Callable
 
 from fastapi import FastAPI
 
+from app.core.generation_workers import start_generation_workers, stop_generation_workers
 from app.core.settings.app import AppSettings
+from app.core.tasks import start_background_tasks, stop_background_tasks
+from app.core.tracing import start_tracing, stop_tracing
 from app.database.events import close_db_connection, connect_to_db
 
 
 def create_start_app_handler(app: FastAPI, settings: AppSettings) -> Callable:
     async def start_app() -> None:
         await connect_to_db(app, settings)
+        start_tracing(app, settings)
+        start_background_tasks(app, settings)
+        start_generation_workers(app, settings)
 
     return start_app
 
 
 def create_stop_app_handler(app):
     async def stop_app():
+        # Pool refills use the model client that stopping the generation workers closes
+        await stop_background_tasks(app)
+        await stop_generation_workers(app)
         await close_db_connection(app)
+        stop_tracing()
 
     return stop_app
@@ -0,0 +1,138 @@
+"""
+In-process worker pool for quiz generation jobs.
+
+Each worker claims one job at a time from the database (see GenerationJobsRepository.claim_next_job), so several
+app processes can run pools against the same table. Workers sleep until `notify()` is called after a job is
+queued on this process, or until the poll interval passes to pick up jobs queued elsewhere and jobs whose worker
+died. While a job runs, its worker renews the job's lease every third of the lease, so only jobs of dead workers
+are reclaimed. On shutdown, jobs still running are released back to pending so the next start picks them up right
+away; the same happens when the Gemini circuit breaker is open, and the worker pauses until it may close again.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.settings.app import AppSettings
+from app.database.repositories.generation_jobs import GenerationJobsRepository
+from app.models.generation_job import QuizGenerationJob
+from app.services.gemini_ai import close_gemini_service
+from app.services.quiz_generation import QuizGenerationService
+from app.utils.resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationWorkerPool:
+    def __init__(self, pool: async_sessionmaker[AsyncSession], settings: AppSettings) -> None:
+        self.pool = pool
+        self.workers = settings.generation_workers
+        self.poll_interval = settings.generation_poll_interval_seconds
+        self.lease_seconds = settings.generation_job_lease_seconds
+        self.max_attempts = settings.generation_job_max_attempts
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def notify(self) -> None:
+        """Wake idle workers, e.g. right after a job was queued."""
+        self._wakeup.set()
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        if self._tasks:
+            self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _wait(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                async with self.pool() as session:
+                    job = await GenerationJobsRepository(session).claim_next_job(
+                        lease_seconds=self.lease_seconds,
+                        max_attempts=self.max_attempts,
+                    )
+            except Exception:
+                logger.exception("Claiming a quiz generation job failed")
+                job = None
+
+            if job is None:
+                await self._wait()
+                continue
+
+            try:
+                async with self._leased(job), self.pool() as session:
+                    await QuizGenerationService(db=session).run_generation_job(job=job)
+            except CircuitOpenError as e:
+                # This also holds back jobs the generation cache could answer; they run once the circuit closes
+                logger.warning("Pausing quiz generation worker: %s", e)
+                await asyncio.sleep(e.retry_after)
+            except asyncio.CancelledError:
+                async with self.pool() as session:
+                    await GenerationJobsRepository(session).release_job(job=job)
+                raise
+            except Exception:
+                # The lease expires and another worker retries the job
+                logger.exception("Quiz generation job %s failed unexpectedly", job.id)
+
+    @asynccontextmanager
+    async def _leased(self, job: QuizGenerationJob):
+        """Keep renewing the job's lease while it runs, so a slow generation is not claimed by another worker."""
+        renewal = asyncio.create_task(self._renew_lease(job))
+        try:
+            yield
+        finally:
+            renewal.cancel()
+            await asyncio.gather(renewal, return_exceptions=True)
+
+    async def _renew_lease(self, job: QuizGenerationJob) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.pool() as session:
+                    renewed = await GenerationJobsRepository(session).renew_lease(job=job, lease_seconds=self.lease_seconds)
+            except Exception:
+                # Retried on the next tick; the lease only runs out after missing several
+                logger.exception("Renewing the lease of quiz generation job %s failed", job.id)
+                continue
+            if not renewed:
+                # Storing the quiz checks the job too and rolls back, this only stops renewing
+                logger.warning("Quiz generation job %s lost its lease", job.id)
+                return
+
+    async def _sweep(self) -> None:
+        """Fail jobs whose last allowed attempt was interrupted; the others are reclaimed by workers."""
+        while True:
+            try:
+                async with self.pool() as session:
+                    failed = await GenerationJobsRepository(session).fail_abandoned_jobs(max_attempts=self.max_attempts)
+                if failed:
+                    logger.warning("Failed %s quiz generation jobs interrupted on their last attempt", failed)
+            except Exception:
+                logger.exception("Sweeping abandoned quiz generation jobs failed")
+            await asyncio.sleep(self.lease_seconds)
+
+
+def start_generation_workers(app: FastAPI, settings: AppSettings) -> None:
+    app.state.generation_workers = GenerationWorkerPool(app.state.pool, settings)
+    app.state.generation_workers.start()
+
+
+async def stop_generation_workers(app: FastAPI) -> None:
+    workers = getattr(app.state, "generation_workers", None)
+    if workers is not None:
+        await workers.stop()
+    close_gemini_service()
@@ -0,0 +1,125 @@
+"""
+Application metrics read at scrape time from the statistics the app already keeps: the caches, single-flight
+coalescing, the Gemini client and circuit breaker, the bcrypt threads and the database connection pool.
+"""
+import hmac
+from collections.abc import Iterator
+from ipaddress import ip_address, ip_network
+
+from fastapi import FastAPI, Request
+
+from app.core.security import bcrypt_stats
+from app.core.settings.app import AppSettings
+from app.services.gemini_ai import gemini_circuit, gemini_stats
+from app.services.quiz_generation import generation_cache_stats, generation_pool_stats
+from app.utils.answer_keys import answer_keys
+from app.utils.leaderboard_cache import quiz_leaderboards
+from app.utils.metrics import MetricFamily, registry
+from app.utils.resilience import CircuitState
+from app.utils.response_cache import listing_responses
+from app.utils.singleflight import single_flight_stats
+from app.utils.swr_cache import swr_cache_stats
+
+
+def cache_metrics() -> Iterator[MetricFamily]:
+    requests = MetricFamily("cache_requests_total", "counter", "Cache lookups by cache and result.", ("cache", "result"))
+    for name, cache in (
+        ("listing_responses", listing_responses),
+        ("answer_keys", answer_keys),
+        ("leaderboards", quiz_leaderboards),
+        ("quiz_generation", generation_cache_stats),
+        ("quiz_generation_pool", generation_pool_stats),
+    ):
+        requests.add(cache.hits, name, "hit")
+        requests.add(cache.misses, name, "miss")
+
+    refreshes = MetricFamily(
+        "cache_refreshes_total", "counter", "Background refreshes of stale-while-revalidate caches.", ("cache", "result")
+    )
+    for namespace, stats in swr_cache_stats.items():
+        requests.add(stats.hits, namespace, "hit")
+        requests.add(stats.stale, namespace, "stale")
+        requests.add(stats.misses, namespace, "miss")
+        refreshes.add(stats.refreshes - stats.refresh_errors, namespace, "success")
+        refreshes.add(stats.refresh_errors, namespace, "error")
+
+    coalescing = MetricFamily(
+        "single_flight_calls_total", "counter", "Calls that ran (leader) or joined one in flight (coalesced).", ("method", "role")
+    )
+    for name, stats in single_flight_stats.items():
+        coalescing.add(stats.leaders, name, "leader")
+        coalescing.add(stats.coalesced, name, "coalesced")
+
+    yield from (requests, refreshes, coalescing)
+
+
+def gemini_metrics() -> Iterator[MetricFamily]:
+    calls = MetricFamily("gemini_calls_total", "counter", "Model calls by result.", ("result",))
+    calls.add(gemini_stats.successes, "success")
+    calls.add(gemini_stats.failures, "failure")
+    calls.add(gemini_stats.timeouts, "timeout")
+    calls.add(gemini_stats.rejected, "circuit_open")
+    yield calls
+
+    in_flight = MetricFamily("gemini_calls_in_flight", "gauge", "Model calls running.")
+    in_flight.add(gemini_stats.in_flight)
+    waiting = MetricFamily("gemini_calls_waiting", "gauge", "Model calls waiting for a concurrency slot.")
+    waiting.add(gemini_stats.waiting)
+    rate_limited = MetricFamily("gemini_rate_limited_seconds_total", "counter", "Time calls spent waiting on the rate limiter.")
+    rate_limited.add(gemini_stats.rate_limited_seconds)
+    yield from (in_flight, waiting, rate_limited)
+
+    circuit = MetricFamily("gemini_circuit_state", "gauge", "1 for the current state of the model circuit breaker.", ("state",))
+    for state in CircuitState:
+        circuit.add(int(gemini_circuit.state == state), state.value)
+    opened = MetricFamily("gemini_circuit_opened_total", "counter", "Times the model circuit breaker opened.")
+    opened.add(gemini_circuit.times_opened)
+    yield from (circuit, opened)
+
+
+def bcrypt_metrics() -> Iterator[MetricFamily]:
+    in_flight = MetricFamily("bcrypt_in_flight", "gauge", "Password hashes and checks running or queued.")
+    in_flight.add(bcrypt_stats.in_flight)
+    queued = MetricFamily("bcrypt_queue_depth", "gauge", "Password hashes and checks waiting for a bcrypt thread.")
+    queued.add(bcrypt_stats.queued)
+    yield from (in_flight, queued)
+
+
+registry.add_collector(cache_metrics)
+registry.add_collector(gemini_metrics)
+registry.add_collector(bcrypt_metrics)
+
+
+def db_pool_metrics(app: FastAPI) -> Iterator[MetricFamily]:
+    engine = getattr(app.state, "engine", None)
+    if engine is None:
+        return
+
+    pool = engine.sync_engine.pool
+    for name, help, value in (
+        ("db_pool_size", "Connections the pool keeps open.", pool.size()),
+        ("db_pool_checked_out", "Connections in use by sessions.", pool.checkedout()),
+        ("db_pool_overflow", "Connections open beyond the pool size.", max(0, pool.overflow())),
+        ("db_pool_waiting", "Sessions waiting for a connection.", getattr(pool, "waiting", 0)),
+    ):
+        family = MetricFamily(name, "gauge", help)
+        family.add(value)
+        yield family
+
+
+def render_metrics(app: FastAPI) -> str:
+    return registry.render(extra=db_pool_metrics(app))
+
+
+def metrics_access_allowed(request: Request, settings: AppSettings) -> bool:
+    """Whether the client may scrape /metrics: a matching bearer token, or an address in an allowed network."""
+    if settings.metrics_token is not None:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), settings.metrics_token.get_secret_value().encode()):
+            return True
+
+    try:
+        client = ip_address(request.client.host) if request.client else None
+    except ValueError:
+        return False
+    return client is not None and any(client in ip_network(network) for network in settings.metrics_allowed_networks)
@@ -1,8 +1,41 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from time import perf_counter
+from typing import Any
+
 import bcrypt
 from passlib.context import CryptContext
 
+from app.core import settings
+from app.utils.metrics import registry
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is slow by design, so hashing and checking run on threads of their own instead of blocking the event loop
+bcrypt_executor = ThreadPoolExecutor(max_workers=settings.bcrypt_workers, thread_name_prefix="bcrypt")
+
+bcrypt_duration = registry.histogram(
+    "bcrypt_duration_seconds",
+    "Time to hash or check a password, including time queued for a bcrypt thread.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+@dataclass
+class BcryptStats:
+    in_flight: int = 0
+
+    @property
+    def queued(self) -> int:
+        """Calls waiting for a free bcrypt thread."""
+        return max(0, self.in_flight - settings.bcrypt_workers)
+
+
+bcrypt_stats = BcryptStats()
+
 
 def generate_salt() -> str:
     return bcrypt.gensalt().decode()
@@ -14,3 +47,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+async def run_bcrypt(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a password hashing or checking call on the bcrypt threads."""
+    bcrypt_stats.in_flight += 1
+    started_at = perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(bcrypt_executor, partial(func, *args, **kwargs))
+    finally:
+        bcrypt_stats.in_flight -= 1
+        bcrypt_duration.observe(perf_counter() - started_at)
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import ConfigDict, SecretStr, PostgresDsn
 
@@ -27,6 +27,114 @@ class AppSettings(BaseAppSettings):
     allowed_hosts: list[str] = ["*"]
     db_url: PostgresDsn
 
+    # threads hashing and checking passwords
+    bcrypt_workers: int = 4
+
+    # Prometheus metrics at /metrics, answered only for clients in metrics_allowed_networks or sending
+    # "Authorization: Bearer <metrics_token>". Behind a proxy or load balancer every client has the proxy's address,
+    # so don't list its network: use the token, or scrape the app directly
+    metrics_enabled: bool = True
+    metrics_allowed_networks: list[str] = ["127.0.0.0/8", "::1/128"]
+    metrics_token: SecretStr | None = None
+
+    # request tracing: spans for routes, services, repositories, serialization and SQL, kept in memory for
+    # /api/v1/admin/traces and optionally appended to a JSON-lines file or posted to an OTLP/HTTP collector
+    tracing_enabled: bool = False
+    tracing_sample_rate: float = 1.0
+    tracing_buffer_traces: int = 200
+    tracing_file: str | None = None
+    tracing_otlp_endpoint: str | None = None
+    tracing_otlp_headers: dict[str, str] = {}
+    tracing_service_name: str = "quiz-api"
+    tracing_sql_max_length: int = 1000
+
+    # per-worker quiz leaderboard cache
+    leaderboard_top_k: int = 50
+    leaderboard_cache_quizzes: int = 1024
+    leaderboard_cache_ttl_seconds: float = 30.0
+
+    # per-worker answer key cache used for grading; the TTL bounds how long other workers grade against a key
+    # whose correct options were edited on this one
+    answer_key_cache_quizzes: int = 1024
+    answer_key_cache_ttl_seconds: float = 60.0
+
+    # per-worker cache of rendered public listing responses
+    response_cache_entries: int = 512
+    response_cache_ttl_seconds: float = 5.0
+
+    # stale-while-revalidate caches for quiz counts and quiz detail documents; writes only invalidate the worker
+    # that handled them, so other workers may serve an edited or deleted quiz for up to the hard TTL
+    quiz_count_cache_soft_ttl_seconds: float = 10.0
+    quiz_count_cache_hard_ttl_seconds: float = 60.0
+    quiz_detail_cache_soft_ttl_seconds: float = 2.0
+    quiz_detail_cache_hard_ttl_seconds: float = 5.0
+
+    # windowed leaderboard rollups
+    rollup_day_retention_days: int = 2
+    rollup_compaction_interval_seconds: float = 3600.0
+
+    # rows fetched per server-side cursor batch in streamed exports
+    export_batch_size: int = 1000
+
+    # background quiz generation; workers renew a running job's lease, so a job is only retried once its worker died
+    generation_workers: int = 4
+    generation_poll_interval_seconds: float = 5.0
+    generation_job_lease_seconds: float = 120.0
+    generation_job_max_attempts: int = 3
+    # "fake" generates deterministic quizzes locally (no network or API key), for load tests and benchmarks
+    llm_provider: Literal["gemini", "fake"] = "gemini"
+    fake_llm_latency_seconds: float = 1.0
+    fake_llm_error_rate: float = 0.0
+    fake_llm_seed: int = 0
+    gemini_model: str = "gemini-1.5-flash"
+    gemini_timeout_seconds: float = 60.0
+    # Larger quizzes are generated by parallel calls of at most this many questions each
+    gemini_questions_per_call: int = 10
+    gemini_max_output_tokens: int = 2048
+    # Gemini calls run on their own thread pool, at most gemini_max_concurrency at a time within the API quota
+    gemini_executor_workers: int = 8
+    gemini_max_concurrency: int = 4
+    gemini_requests_per_minute: float = 60.0
+    gemini_burst: int = 5
+    # fail fast for gemini_circuit_reset_seconds after this many consecutive timeouts or API errors
+    gemini_circuit_failure_threshold: int = 3
+    gemini_circuit_reset_seconds: float = 30.0
+    # generated quizzes are reused for the same normalized prompt, question count and model for this long
+    generation_cache_ttl_seconds: float = 7 * 24 * 3600
+
+    # pool of quizzes generated ahead of time for configured and popular topics (tags on most quizzes, searches);
+    # refilled during generation_pool_refill_hours (UTC, empty for any time) with at most
+    # generation_pool_concurrency model calls at once
+    generation_pool_enabled: bool = False
+    generation_pool_topics: list[str] = []
+    generation_pool_popular_topics: int = 10
+    generation_pool_quizzes_per_topic: int = 3
+    generation_pool_questions: int = 10
+    generation_pool_concurrency: int = 2
+    generation_pool_refill_hours: list[int] = [1, 2, 3, 4, 5]
+    generation_pool_refill_interval_seconds: float = 900.0
+    generation_pool_max_age_seconds: float = 14 * 24 * 3600
+    search_term_counter_capacity: int = 1000
+
+    # response compression and static assets
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_zstd_level: int = 3
+    compression_content_types: list[str] = [
+        "application/json",
+        "application/x-ndjson",
+        "application/javascript",
+        "text/javascript",
+        "text/css",
+        "text/csv",
+        "text/html",
+        "text/plain",
+        "image/svg+xml",
+    ]
+    static_precompress: bool = True
+    static_max_age_seconds: int = 30 * 24 * 3600
+
     @property
     def fastapi_kwargs(self) -> dict[str, Any]:
         return {
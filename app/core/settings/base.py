@@ -14,4 +14,5 @@ class BaseAppSettings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env")
 
     app_env: AppEnvTypes = AppEnvTypes.dev
-    gemini_api_key: SecretStr
+    # only needed with llm_provider = "gemini"
+    gemini_api_key: SecretStr | None = None
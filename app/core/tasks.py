@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+
+from fastapi import FastAPI
+
+from app.core.settings.app import AppSettings
+from app.database.repositories.generation_pool import GenerationPoolRepository
+from app.database.repositories.score_rollups import ScoreRollupsRepository
+from app.services.quiz_generation import QuizGenerationService
+from app.utils.popularity import search_terms
+from app.utils.resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+async def compact_score_rollups(app: FastAPI, settings: AppSettings) -> None:
+    """Periodically fold day leaderboard rollups past their retention into week buckets."""
+    while True:
+        await asyncio.sleep(settings.rollup_compaction_interval_seconds)
+
+        before = datetime.now(UTC).date() - timedelta(days=settings.rollup_day_retention_days)
+        try:
+            async with app.state.pool() as session:
+                removed = await ScoreRollupsRepository(session).compact_day_rollups(before=before)
+                await session.commit()
+        except Exception:
+            logger.exception("Score rollup compaction failed")
+            continue
+
+        if removed is not None:
+            logger.info("Compacted %s day rollups older than %s", removed, before)
+
+
+def in_refill_hours(moment: datetime, hours: list[int]) -> bool:
+    return not hours or moment.astimezone(UTC).hour in hours
+
+
+async def refill_generation_pool(app: FastAPI, settings: AppSettings) -> None:
+    """Periodically top up the pre-generated quiz pool for popular topics, off-peak and within a concurrency budget."""
+    budget = asyncio.Semaphore(settings.generation_pool_concurrency)
+
+    async def refill(topic: str) -> int:
+        async with budget:
+            if not in_refill_hours(datetime.now(UTC), settings.generation_pool_refill_hours):
+                return 0
+            async with app.state.pool() as session:
+                return await QuizGenerationService(db=session).refill_pool_topic(
+                    topic=topic,
+                    size=settings.generation_pool_quizzes_per_topic,
+                    num_questions=settings.generation_pool_questions,
+                )
+
+    while True:
+        await asyncio.sleep(settings.generation_pool_refill_interval_seconds)
+        if not in_refill_hours(datetime.now(UTC), settings.generation_pool_refill_hours):
+            continue
+
+        try:
+            async with app.state.pool() as session:
+                await GenerationPoolRepository(session).discard_stale_data(max_age_seconds=settings.generation_pool_max_age_seconds)
+                topics = await QuizGenerationService(db=session).pool_topics()
+        except Exception:
+            logger.exception("Choosing generation pool topics failed")
+            continue
+        search_terms.decay()
+
+        results = await asyncio.gather(*(refill(topic) for topic in topics), return_exceptions=True)
+        for topic, result in zip(topics, results):
+            if isinstance(result, CircuitOpenError):
+                logger.warning("Generation pool refill for %r skipped: %s", topic, result)
+            elif isinstance(result, Exception):
+                logger.error("Generation pool refill for %r failed", topic, exc_info=result)
+
+        added = sum(result for result in results if isinstance(result, int))
+        if added:
+            logger.info("Added %s quizzes to the generation pool for %s topics", added, len(topics))
+
+
+def start_background_tasks(app: FastAPI, settings: AppSettings) -> None:
+    app.state.background_tasks = [
+        asyncio.create_task(compact_score_rollups(app, settings)),
+    ]
+    if settings.generation_pool_enabled:
+        app.state.background_tasks.append(asyncio.create_task(refill_generation_pool(app, settings)))
+
+
+async def stop_background_tasks(app: FastAPI) -> None:
+    tasks = getattr(app.state, "background_tasks", [])
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,35 @@
+"""
+Tracing exporters configured from settings and SQL instrumentation of the database engine.
+"""
+import logging
+
+from fastapi import FastAPI
+
+from app.core.settings.app import AppSettings
+from app.utils.tracing import JsonLinesExporter, OTLPHttpExporter, RingBufferExporter, instrument_engine, tracer
+
+logger = logging.getLogger(__name__)
+
+
+def start_tracing(app: FastAPI, settings: AppSettings) -> None:
+    if not settings.tracing_enabled:
+        return
+
+    exporters = [RingBufferExporter(settings.tracing_buffer_traces)]
+    if settings.tracing_file:
+        exporters.append(JsonLinesExporter(settings.tracing_file))
+    if settings.tracing_otlp_endpoint:
+        exporters.append(
+            OTLPHttpExporter(
+                settings.tracing_otlp_endpoint,
+                service_name=settings.tracing_service_name,
+                headers=settings.tracing_otlp_headers,
+            )
+        )
+    tracer.configure(exporters, sample_rate=settings.tracing_sample_rate)
+    instrument_engine(app.state.engine, max_statement_length=settings.tracing_sql_max_length)
+    logger.info("Tracing %.0f%% of requests to %s", settings.tracing_sample_rate * 100, [type(e).__name__ for e in exporters])
+
+
+def stop_tracing() -> None:
+    tracer.shutdown()
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.settings.app import AppSettings
+from app.database.pool import MeteredQueuePool
 
 logger = logging.getLogger(__name__)
 
@@ -12,8 +13,16 @@ logger = logging.getLogger(__name__)
 async def connect_to_db(app: FastAPI, settings: AppSettings) -> None:
     logger.info("Connecting to database...")
 
-    engine = create_async_engine(url=str(settings.db_url), pool_size=50, max_overflow=0, echo=True, future=True)
+    engine = create_async_engine(
+        url=str(settings.db_url),
+        poolclass=MeteredQueuePool,
+        pool_size=50,
+        max_overflow=0,
+        echo=True,
+        future=True,
+    )
     async_session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=True)
+    app.state.engine = engine
     app.state.pool = async_session_factory
 
     logger.info("Connected to database.")
@@ -18,6 +18,11 @@ from app.models.answer import Answer
 from app.models.quiz_attempt import QuizAttempt
 from app.models.option import Option
 from app.models.tag import Tag
+from app.models.user_quiz_best import UserQuizBest
+from app.models.score_rollup import QuizScoreRollup, UserScoreRollup
+from app.models.generation_job import QuizGenerationJob
+from app.models.generation_cache import QuizGenerationCacheEntry
+from app.models.generation_pool import QuizPoolEntry
 
 
 
@@ -0,0 +1,29 @@
+"""add users total_score index
+
+Revision ID: 3b8e1f0a9c42
+Revises: 6364c2cef3ed
+Create Date: 2026-10-19 10:12:31.402117
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3b8e1f0a9c42'
+down_revision = '6364c2cef3ed'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_users_total_score_id',
+        'users',
+        [sa.text('total_score DESC'), 'id'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_total_score_id', table_name='users')
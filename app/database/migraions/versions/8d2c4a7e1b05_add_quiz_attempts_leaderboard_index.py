@@ -0,0 +1,29 @@
+"""add quiz_attempts leaderboard index
+
+Revision ID: 8d2c4a7e1b05
+Revises: 3b8e1f0a9c42
+Create Date: 2026-10-19 11:03:47.218390
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '8d2c4a7e1b05'
+down_revision = '3b8e1f0a9c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_quiz_attempts_leaderboard',
+        'quiz_attempts',
+        ['quiz_id', sa.text('score DESC'), 'finished_at'],
+        unique=False,
+        postgresql_where=sa.text('finished_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quiz_attempts_leaderboard', table_name='quiz_attempts')
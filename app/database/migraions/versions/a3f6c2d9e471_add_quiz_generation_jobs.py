@@ -0,0 +1,45 @@
+"""add quiz generation jobs
+
+Revision ID: a3f6c2d9e471
+Revises: e5a90b3d7f16
+Create Date: 2026-10-19 16:02:37.418203
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'a3f6c2d9e471'
+down_revision = 'e5a90b3d7f16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE TYPE generationjobstatus AS ENUM ('pending', 'running', 'succeeded', 'failed')")
+    status = postgresql.ENUM('pending', 'running', 'succeeded', 'failed', name='generationjobstatus', create_type=False)
+
+    op.create_table('quiz_generation_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('creator_id', sa.Integer(), nullable=False),
+    sa.Column('status', status, server_default=sa.text("'pending'"), nullable=False),
+    sa.Column('request', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('quiz_id', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['creator_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_quiz_generation_jobs_claim', 'quiz_generation_jobs', ['status', 'created_at'], unique=False, postgresql_where=sa.text("status IN ('pending', 'running')"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quiz_generation_jobs_claim', table_name='quiz_generation_jobs')
+    op.drop_table('quiz_generation_jobs')
+    op.execute("DROP TYPE generationjobstatus")
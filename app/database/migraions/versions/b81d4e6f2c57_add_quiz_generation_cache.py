@@ -0,0 +1,33 @@
+"""add quiz generation cache
+
+Revision ID: b81d4e6f2c57
+Revises: a3f6c2d9e471
+Create Date: 2026-10-19 17:11:05.263918
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'b81d4e6f2c57'
+down_revision = 'a3f6c2d9e471'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('quiz_generation_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('prompt', sa.Text(), nullable=False),
+    sa.Column('num_questions', sa.Integer(), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('hits', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('quiz_generation_cache')
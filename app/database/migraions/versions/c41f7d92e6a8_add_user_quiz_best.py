@@ -0,0 +1,70 @@
+"""add user_quiz_best
+
+Revision ID: c41f7d92e6a8
+Revises: 8d2c4a7e1b05
+Create Date: 2026-10-19 12:26:05.731944
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c41f7d92e6a8'
+down_revision = '8d2c4a7e1b05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_quiz_best',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('quiz_id', sa.Integer(), nullable=False),
+    sa.Column('best_score', sa.Integer(), nullable=False),
+    sa.Column('best_attempt_id', sa.Integer(), nullable=False),
+    sa.Column('best_finished_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('attempts_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('last_finished_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['best_attempt_id'], ['quiz_attempts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'quiz_id')
+    )
+
+    # Backfill from finished attempts; ties keep the earliest finished attempt
+    op.execute("""
+        INSERT INTO user_quiz_best (
+            user_id, quiz_id, best_score, best_attempt_id, best_finished_at, attempts_count, last_finished_at
+        )
+        SELECT best.user_id, best.quiz_id, best.score, best.id, best.finished_at, totals.attempts_count, totals.last_finished_at
+        FROM (
+            SELECT DISTINCT ON (qa.user_id, qa.quiz_id) qa.user_id, qa.quiz_id, qa.score, qa.id, qa.finished_at
+            FROM quiz_attempts qa
+            WHERE qa.finished_at IS NOT NULL AND qa.deleted_at IS NULL
+            ORDER BY qa.user_id, qa.quiz_id, qa.score DESC, qa.finished_at ASC
+        ) best
+        JOIN (
+            SELECT qa.user_id, qa.quiz_id, COUNT(*) AS attempts_count, MAX(qa.finished_at) AS last_finished_at
+            FROM quiz_attempts qa
+            WHERE qa.finished_at IS NOT NULL AND qa.deleted_at IS NULL
+            GROUP BY qa.user_id, qa.quiz_id
+        ) totals ON totals.user_id = best.user_id AND totals.quiz_id = best.quiz_id
+    """)
+
+    op.create_index('ix_user_quiz_best_leaderboard', 'user_quiz_best', ['quiz_id', sa.text('best_score DESC'), 'best_finished_at', 'user_id'], unique=False)
+    op.create_index('ix_user_quiz_best_user_recent', 'user_quiz_best', ['user_id', sa.text('last_finished_at DESC')], unique=False)
+
+    # Leaderboard reads moved to user_quiz_best
+    op.drop_index('ix_quiz_attempts_leaderboard', table_name='quiz_attempts')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_quiz_attempts_leaderboard',
+        'quiz_attempts',
+        ['quiz_id', sa.text('score DESC'), 'finished_at'],
+        unique=False,
+        postgresql_where=sa.text('finished_at IS NOT NULL'),
+    )
+    op.drop_index('ix_user_quiz_best_user_recent', table_name='user_quiz_best')
+    op.drop_index('ix_user_quiz_best_leaderboard', table_name='user_quiz_best')
+    op.drop_table('user_quiz_best')
@@ -0,0 +1,34 @@
+"""add quiz generation pool
+
+Revision ID: d7e3a1c95b20
+Revises: b81d4e6f2c57
+Create Date: 2026-10-19 19:02:41.730215
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd7e3a1c95b20'
+down_revision = 'b81d4e6f2c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('quiz_generation_pool',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('topic', sa.Text(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('num_questions', sa.Integer(), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_quiz_generation_pool_claim', 'quiz_generation_pool', ['topic', 'model', 'num_questions', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quiz_generation_pool_claim', table_name='quiz_generation_pool')
+    op.drop_table('quiz_generation_pool')
@@ -0,0 +1,75 @@
+"""add score rollups
+
+Revision ID: e5a90b3d7f16
+Revises: c41f7d92e6a8
+Create Date: 2026-10-19 13:48:12.094551
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'e5a90b3d7f16'
+down_revision = 'c41f7d92e6a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE TYPE leaderboardperiod AS ENUM ('day', 'week')")
+    period = postgresql.ENUM('day', 'week', name='leaderboardperiod', create_type=False)
+
+    op.create_table('quiz_score_rollups',
+    sa.Column('quiz_id', sa.Integer(), nullable=False),
+    sa.Column('period', period, nullable=False),
+    sa.Column('bucket_start', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('best_score', sa.Integer(), nullable=False),
+    sa.Column('best_attempt_id', sa.Integer(), nullable=False),
+    sa.Column('best_finished_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['best_attempt_id'], ['quiz_attempts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('quiz_id', 'period', 'bucket_start', 'user_id')
+    )
+    op.create_table('user_score_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period', period, nullable=False),
+    sa.Column('bucket_start', sa.Date(), nullable=False),
+    sa.Column('total_score', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'period', 'bucket_start')
+    )
+
+    # Backfill the current UTC week so day / week leaderboards are not empty right after deploying
+    op.execute("""
+        INSERT INTO quiz_score_rollups (quiz_id, period, bucket_start, user_id, best_score, best_attempt_id, best_finished_at)
+        SELECT DISTINCT ON (qa.quiz_id, b.period, b.bucket_start, qa.user_id)
+            qa.quiz_id, b.period, b.bucket_start, qa.user_id, qa.score, qa.id, qa.finished_at
+        FROM quiz_attempts qa
+        CROSS JOIN LATERAL (VALUES
+            ('day'::leaderboardperiod, (qa.finished_at AT TIME ZONE 'UTC')::date),
+            ('week'::leaderboardperiod, date_trunc('week', qa.finished_at AT TIME ZONE 'UTC')::date)
+        ) AS b(period, bucket_start)
+        WHERE qa.finished_at >= date_trunc('week', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+        AND qa.deleted_at IS NULL
+        ORDER BY qa.quiz_id, b.period, b.bucket_start, qa.user_id, qa.score DESC, qa.finished_at ASC
+    """)
+    op.execute("""
+        INSERT INTO user_score_rollups (user_id, period, bucket_start, total_score)
+        SELECT user_id, period, bucket_start, SUM(best_score)
+        FROM quiz_score_rollups
+        GROUP BY user_id, period, bucket_start
+    """)
+
+    op.create_index('ix_quiz_score_rollups_leaderboard', 'quiz_score_rollups', ['quiz_id', 'period', 'bucket_start', sa.text('best_score DESC'), 'best_finished_at', 'user_id'], unique=False)
+    op.create_index('ix_user_score_rollups_leaderboard', 'user_score_rollups', ['period', 'bucket_start', sa.text('total_score DESC'), 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_score_rollups_leaderboard', table_name='user_score_rollups')
+    op.drop_index('ix_quiz_score_rollups_leaderboard', table_name='quiz_score_rollups')
+    op.drop_table('user_score_rollups')
+    op.drop_table('quiz_score_rollups')
+    op.execute("DROP TYPE leaderboardperiod")
@@ -0,0 +1,27 @@
+"""Connection pool that reports how many sessions are waiting for a connection and for how long."""
+from time import perf_counter
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.utils.metrics import registry
+
+connection_wait_duration = registry.histogram(
+    "db_pool_wait_duration_seconds",
+    "Time to get a connection from the pool, including opening a new one.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+
+    def connect(self):
+        self.waiting += 1
+        started_at = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.waiting -= 1
+            connection_wait_duration.observe(perf_counter() - started_at)
@@ -3,6 +3,7 @@ from sqlalchemy.exc import DatabaseError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.utils import AppExceptionCase
+from app.utils.tracing import span
 
 
 class BaseRepository:
@@ -31,7 +32,8 @@ def db_error_handler(func) -> Callable:
 
     async def wrapper(*args, **kwargs):
         try:
-            return await func(*args, **kwargs)
+            with span(func.__qualname__, "repository"):
+                return await func(*args, **kwargs)
         except DatabaseError as e:
             db_error_context = str(e.orig.__context__) if e.orig and e.orig.__context__ else str(e)
             raise AppExceptionCase(
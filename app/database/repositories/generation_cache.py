@@ -0,0 +1,48 @@
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.repositories.base import BaseRepository, db_error_handler
+from app.models.generation_cache import QuizGenerationCacheEntry
+
+
+class GenerationCacheRepository(BaseRepository):
+    def __init__(self, conn: AsyncSession) -> None:
+        super().__init__(conn)
+
+    @db_error_handler
+    async def get_fresh_data(self, *, key: str, ttl_seconds: float) -> dict[str, Any] | None:
+        """Cached generation data younger than `ttl_seconds`, counting the hit; None on a miss."""
+        query = (
+            update(QuizGenerationCacheEntry)
+            .where(
+                QuizGenerationCacheEntry.key == key,
+                QuizGenerationCacheEntry.created_at > func.now() - timedelta(seconds=ttl_seconds),
+            )
+            .values(hits=QuizGenerationCacheEntry.hits + 1)
+            .returning(QuizGenerationCacheEntry.data)
+        )
+        data = (await self.connection.execute(query)).scalar_one_or_none()
+        await self.connection.commit()
+
+        return data
+
+    @db_error_handler
+    async def store_data(self, *, key: str, model: str, prompt: str, num_questions: int, data: dict[str, Any]) -> None:
+        entry = insert(QuizGenerationCacheEntry).values(
+            key=key,
+            model=model,
+            prompt=prompt,
+            num_questions=num_questions,
+            data=data,
+        )
+        await self.connection.execute(
+            entry.on_conflict_do_update(
+                index_elements=[QuizGenerationCacheEntry.key],
+                set_={"data": entry.excluded.data, "hits": 0, "created_at": func.now()},
+            )
+        )
+        await self.connection.commit()
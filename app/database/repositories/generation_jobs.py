@@ -0,0 +1,147 @@
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.repositories.base import BaseRepository, db_error_handler
+from app.models.generation_job import GenerationJobStatus, QuizGenerationJob
+
+
+def _run_of(job: QuizGenerationJob):
+    """The job's row while it is still running the attempt `job` was claimed for."""
+    return and_(
+        QuizGenerationJob.id == job.id,
+        QuizGenerationJob.status == GenerationJobStatus.RUNNING,
+        QuizGenerationJob.attempts == job.attempts,
+    )
+
+
+def _lease_expired():
+    return and_(QuizGenerationJob.status == GenerationJobStatus.RUNNING, QuizGenerationJob.lease_expires_at < func.now())
+
+
+class GenerationJobsRepository(BaseRepository):
+    def __init__(self, conn: AsyncSession) -> None:
+        super().__init__(conn)
+
+    @db_error_handler
+    async def create_job(self, *, creator_id: int, request: dict[str, Any], quiz_id: int | None = None) -> QuizGenerationJob:
+        """Queue a job, or record one that already succeeded when the quiz was created without the model."""
+        job = QuizGenerationJob(creator_id=creator_id, request=request)
+        if quiz_id is not None:
+            job.status = GenerationJobStatus.SUCCEEDED
+            job.quiz_id = quiz_id
+            job.started_at = job.finished_at = func.now()
+        self.connection.add(job)
+        await self.connection.commit()
+        await self.connection.refresh(job)
+
+        return job
+
+    @db_error_handler
+    async def get_job(self, *, job_id: int) -> QuizGenerationJob | None:
+        return await self.connection.get(QuizGenerationJob, job_id)
+
+    @db_error_handler
+    async def claim_next_job(self, *, lease_seconds: float, max_attempts: int) -> QuizGenerationJob | None:
+        """
+        Take the oldest pending job, or a running one whose worker let its lease expire, and commit it as running.
+        SKIP LOCKED lets workers in every process claim concurrently without waiting on each other.
+        """
+        next_job = (
+            select(QuizGenerationJob.id)
+            .where(
+                or_(QuizGenerationJob.status == GenerationJobStatus.PENDING, _lease_expired()),
+                QuizGenerationJob.attempts < max_attempts,
+            )
+            .order_by(QuizGenerationJob.created_at, QuizGenerationJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        claim = (
+            update(QuizGenerationJob)
+            .where(QuizGenerationJob.id == next_job)
+            .values(
+                status=GenerationJobStatus.RUNNING,
+                attempts=QuizGenerationJob.attempts + 1,
+                lease_expires_at=func.now() + timedelta(seconds=lease_seconds),
+                started_at=func.now(),
+            )
+            .returning(QuizGenerationJob)
+            .execution_options(synchronize_session=False)
+        )
+        job = (await self.connection.scalars(claim)).one_or_none()
+        await self.connection.commit()
+
+        return job
+
+    @db_error_handler
+    async def renew_lease(self, *, job: QuizGenerationJob, lease_seconds: float) -> bool:
+        """Push back the lease of a job this worker still runs; False if it expired and another worker claimed it."""
+        result = await self.connection.execute(
+            update(QuizGenerationJob)
+            .where(_run_of(job))
+            .values(lease_expires_at=func.now() + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        await self.connection.commit()
+
+        return result.rowcount == 1
+
+    @db_error_handler
+    async def lock_running_job(self, *, job: QuizGenerationJob) -> bool:
+        """
+        Lock the job's row for the rest of the transaction if this run of it still owns the job, so the result can
+        be stored and the job completed together; claim_next_job skips locked rows.
+        """
+        query = select(QuizGenerationJob.id).where(_run_of(job)).with_for_update()
+
+        raw_result = await self.connection.execute(query)
+        return raw_result.scalar() is not None
+
+    @db_error_handler
+    async def complete_job(self, *, job: QuizGenerationJob, quiz_id: int) -> None:
+        await self._finish(job, status=GenerationJobStatus.SUCCEEDED, quiz_id=quiz_id, error=None, finished_at=func.now())
+
+    @db_error_handler
+    async def fail_job(self, *, job: QuizGenerationJob, error: str, retry: bool) -> None:
+        """Record a failed run; with `retry` the job goes back to pending for another worker."""
+        if retry:
+            await self._finish(job, status=GenerationJobStatus.PENDING, error=error)
+        else:
+            await self._finish(job, status=GenerationJobStatus.FAILED, error=error, finished_at=func.now())
+
+    @db_error_handler
+    async def release_job(self, *, job: QuizGenerationJob) -> None:
+        """Hand a job back without counting the run, e.g. when its worker is shutting down."""
+        await self._finish(job, status=GenerationJobStatus.PENDING, attempts=QuizGenerationJob.attempts - 1)
+
+    @db_error_handler
+    async def fail_abandoned_jobs(self, *, max_attempts: int) -> int:
+        """Fail running jobs whose lease expired after their last allowed attempt; returns how many."""
+        result = await self.connection.execute(
+            update(QuizGenerationJob)
+            .where(_lease_expired(), QuizGenerationJob.attempts >= max_attempts)
+            .values(
+                status=GenerationJobStatus.FAILED,
+                error="Generation was interrupted too many times",
+                lease_expires_at=None,
+                finished_at=func.now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.connection.commit()
+
+        return result.rowcount
+
+    async def _finish(self, job: QuizGenerationJob, **values: Any) -> None:
+        # Matching the attempt makes this a no-op if the lease expired and another worker claimed the job since
+        await self.connection.execute(
+            update(QuizGenerationJob)
+            .where(_run_of(job))
+            .values(lease_expires_at=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        await self.connection.commit()
@@ -0,0 +1,78 @@
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.repositories.base import BaseRepository, db_error_handler
+from app.models.generation_pool import QuizPoolEntry
+
+# Advisory lock id (with the topic's hash as second key) so only one worker refills a topic at a time
+GENERATION_POOL_LOCK_ID = 3_203_002
+
+
+class GenerationPoolRepository(BaseRepository):
+    def __init__(self, conn: AsyncSession) -> None:
+        super().__init__(conn)
+
+    @db_error_handler
+    async def claim_data(self, *, topic: str, model: str, num_questions: int) -> dict[str, Any] | None:
+        """
+        Remove and return the oldest pooled quiz for the topic with at least `num_questions` questions, or None.
+        SKIP LOCKED lets concurrent requests each claim a different quiz without waiting on each other.
+        """
+        entry = (
+            select(QuizPoolEntry.id)
+            .where(
+                QuizPoolEntry.topic == topic,
+                QuizPoolEntry.model == model,
+                QuizPoolEntry.num_questions >= num_questions,
+            )
+            .order_by(QuizPoolEntry.num_questions, QuizPoolEntry.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        query = delete(QuizPoolEntry).where(QuizPoolEntry.id == entry).returning(QuizPoolEntry.data)
+        data = (await self.connection.execute(query)).scalar_one_or_none()
+        await self.connection.commit()
+
+        return data
+
+    @db_error_handler
+    async def lock_topic(self, *, topic: str) -> bool:
+        """
+        Take the topic's refill lock; False if another worker holds it. The lock belongs to the database connection
+        rather than a transaction, so the session must be bound to one connection until unlock_topic.
+        """
+        locked = await self.connection.execute(select(func.pg_try_advisory_lock(GENERATION_POOL_LOCK_ID, func.hashtext(topic))))
+        await self.connection.commit()
+
+        return bool(locked.scalar())
+
+    @db_error_handler
+    async def unlock_topic(self, *, topic: str) -> None:
+        await self.connection.execute(select(func.pg_advisory_unlock(GENERATION_POOL_LOCK_ID, func.hashtext(topic))))
+        await self.connection.commit()
+
+    @db_error_handler
+    async def count_data(self, *, topic: str, model: str, num_questions: int) -> int:
+        query = select(func.count()).where(
+            QuizPoolEntry.topic == topic,
+            QuizPoolEntry.model == model,
+            QuizPoolEntry.num_questions == num_questions,
+        )
+        return (await self.connection.execute(query)).scalar_one()
+
+    @db_error_handler
+    async def add_data(self, *, topic: str, model: str, num_questions: int, data: dict[str, Any]) -> None:
+        self.connection.add(QuizPoolEntry(topic=topic, model=model, num_questions=num_questions, data=data))
+        await self.connection.commit()
+
+    @db_error_handler
+    async def discard_stale_data(self, *, max_age_seconds: float) -> int:
+        query = delete(QuizPoolEntry).where(QuizPoolEntry.created_at < func.now() - timedelta(seconds=max_age_seconds))
+        result = await self.connection.execute(query)
+        await self.connection.commit()
+
+        return result.rowcount
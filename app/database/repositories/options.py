@@ -1,9 +1,9 @@
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.repositories.base import BaseRepository, db_error_handler
 from app.models.option import Option
-from app.schemas.option import OptionInCreate, OptionInUpdate
+from app.schemas.option import OptionInCreate, OptionInQuestionUpdate, OptionInUpdate
 from datetime import datetime, timezone
 
 
@@ -41,6 +41,21 @@ class OptionsRepository(BaseRepository):
 
         return options
 
+    @db_error_handler
+    async def create_options(self, *, options_in: dict[int, list[OptionInCreate]]) -> None:
+        """Insert the options of several new questions, keyed by question id, in one statement."""
+        rows = [
+            {
+                "question_id": question_id,
+                "option_text": option_in.option_text,
+                "is_correct": option_in.is_correct,
+            }
+            for question_id, question_options_in in options_in.items()
+            for option_in in question_options_in
+        ]
+        if rows:
+            await self.connection.execute(insert(Option), rows)
+
     @db_error_handler
     async def get_option_by_id(self, *, option_id: int) -> Option | None:
         query = select(Option).where(and_(Option.id == option_id, Option.deleted_at.is_(None)))
@@ -93,3 +108,53 @@ class OptionsRepository(BaseRepository):
         await self.connection.refresh(option)
 
         return option
+
+    @db_error_handler
+    async def sync_options(self, *, existing: dict[int, list[Option]], options_in: dict[int, list[OptionInQuestionUpdate]]) -> None:
+        """
+        Diff options_in against the existing (non-deleted) options of each question, keyed by question id.
+        Only changed options are updated, options without an id are inserted and missing ones are soft-deleted.
+        Changes for all questions are batched into at most one INSERT, one UPDATE and one soft-delete UPDATE.
+        """
+        now = datetime.now(timezone.utc)
+        updates = []
+        inserts = []
+        deleted_ids = []
+
+        for question_id, question_options_in in options_in.items():
+            existing_by_id = {option.id: option for option in existing.get(question_id, [])}
+            kept_ids = set()
+
+            for option_in in question_options_in:
+                if option_in.id is None:
+                    inserts.append(
+                        {
+                            "question_id": question_id,
+                            "option_text": option_in.option_text,
+                            "is_correct": option_in.is_correct,
+                        }
+                    )
+                    continue
+
+                kept_ids.add(option_in.id)
+                option = existing_by_id[option_in.id]
+                if (option.option_text, option.is_correct) != (option_in.option_text, option_in.is_correct):
+                    updates.append(
+                        {
+                            "id": option.id,
+                            "option_text": option_in.option_text,
+                            "is_correct": option_in.is_correct,
+                            "updated_at": now,
+                        }
+                    )
+
+            deleted_ids.extend(option_id for option_id in existing_by_id if option_id not in kept_ids)
+
+        if deleted_ids:
+            await self.connection.execute(
+                update(Option).where(Option.id.in_(deleted_ids)).values(deleted_at=now).execution_options(synchronize_session=False)
+            )
+        if updates:
+            await self.connection.execute(update(Option), updates)
+        if inserts:
+            await self.connection.execute(insert(Option), inserts)
@@ -0,0 +1,172 @@
+"""
+Column sets for projection queries.
+
+A projection selects exactly the fields of an output schema as Core rows, with nested lists (a quiz's tags, a
+question's options) aggregated to JSON by Postgres in the same statement. List endpoints turn the rows into schemas
+in bulk with app.utils.projection instead of hydrating ORM entities and validating them one attribute at a time.
+Column labels must match the schema field names.
+"""
+from collections.abc import Collection
+
+from sqlalchemy import JSON, Integer, Text, and_, case, cast, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from app.models.option import Option
+from app.models.question import Question
+from app.models.quiz import Quiz
+from app.models.quiz_attempt import QuizAttempt
+from app.models.quiz_tag import quiz_tags
+from app.models.tag import Tag
+from app.schemas.quiz import QUIZ_SCALAR_FIELDS
+
+
+def json_object(**columns):
+    """Build a Postgres json_build_object() call with keys in declaration order."""
+    args = []
+    for key, column in columns.items():
+        args.extend((literal_column(f"'{key}'"), column))
+    return func.json_build_object(*args)
+
+
+def json_timestamp(column):
+    """
+    Render a timestamptz column the way Pydantic serializes datetimes (UTC with a "Z" suffix, microseconds only when
+    there are any), so documents built in Postgres match the responses built from schemas. NULL stays NULL.
+    """
+    utc = func.timezone("UTC", column)
+    fraction = case(
+        (cast(func.extract("microseconds", column), Integer) % 1_000_000 != 0, func.to_char(utc, ".US", type_=Text)),
+        else_=literal("", Text),
+    )
+    return func.to_char(utc, 'YYYY-MM-DD"T"HH24:MI:SS', type_=Text) + fraction + literal("Z", Text)
+
+
+def json_array(subquery_select, element, order_by):
+    """Aggregate element into a JSON array, returning [] instead of NULL for no rows."""
+    return subquery_select.with_only_columns(
+        func.coalesce(func.json_agg(aggregate_order_by(element, order_by)), literal_column("'[]'::json"), type_=JSON)
+    ).scalar_subquery()
+
+
+def question_options_json():
+    """Non-deleted options of the enclosing query's question, as a JSON array ordered by id."""
+    option_json = json_object(
+        id=Option.id,
+        question_id=Option.question_id,
+        option_text=Option.option_text,
+        is_correct=Option.is_correct,
+        created_at=json_timestamp(Option.created_at),
+        updated_at=json_timestamp(Option.updated_at),
+        deleted_at=json_timestamp(Option.deleted_at),
+    )
+    return json_array(
+        select(Option.id).where(and_(Option.question_id == Question.id, Option.deleted_at.is_(None))).correlate(Question),
+        option_json,
+        Option.id,
+    )
+
+
+def quiz_tags_json():
+    """Tags of the enclosing query's quiz, as a JSON array ordered by id."""
+    tag_json = json_object(
+        id=Tag.id,
+        name=Tag.name,
+        created_at=json_timestamp(Tag.created_at),
+        updated_at=json_timestamp(Tag.updated_at),
+        deleted_at=json_timestamp(Tag.deleted_at),
+    )
+    # Correlate only the quiz: queries filtering by tag join tags into the enclosing FROM as well
+    return json_array(
+        select(Tag.id).join(quiz_tags, quiz_tags.c.tag_id == Tag.id).where(quiz_tags.c.quiz_id == Quiz.id).correlate(Quiz),
+        tag_json,
+        Tag.id,
+    )
+
+
+def quiz_questions_json(*, with_options: bool = True):
+    """Non-deleted questions of the enclosing query's quiz, as a JSON array ordered by id."""
+    question_columns = {
+        "id": Question.id,
+        "quiz_id": Question.quiz_id,
+        "question_text": Question.question_text,
+        "question_type": Question.question_type,
+        "points": Question.points,
+    }
+    if with_options:
+        question_columns["options"] = question_options_json()
+    question_json = json_object(
+        **question_columns,
+        created_at=json_timestamp(Question.created_at),
+        updated_at=json_timestamp(Question.updated_at),
+        deleted_at=json_timestamp(Question.deleted_at),
+    )
+    return json_array(
+        select(Question.id).where(and_(Question.quiz_id == Quiz.id, Question.deleted_at.is_(None))).correlate(Quiz),
+        question_json,
+        Question.id,
+    )
+
+
+def quiz_document(*, fields: Collection[str] = QUIZ_SCALAR_FIELDS, include: Collection[str] = ("tags", "questions", "options")):
+    """
+    JSON object of the enclosing query's quiz with the given scalar fields and related lists ("tags", "questions",
+    "options" inside questions). Keys keep the order of the full quiz detail document.
+    """
+    columns = {
+        "id": Quiz.id,
+        "title": Quiz.title,
+        "description": Quiz.description,
+        "creator_id": Quiz.creator_id,
+        "is_public": Quiz.is_public,
+        "tags": quiz_tags_json() if "tags" in include else None,
+        "created_at": json_timestamp(Quiz.created_at),
+        "updated_at": json_timestamp(Quiz.updated_at),
+        "deleted_at": json_timestamp(Quiz.deleted_at),
+        "questions": quiz_questions_json(with_options="options" in include) if "questions" in include else None,
+    }
+    return json_object(
+        **{key: column for key, column in columns.items() if key in fields or (key in include and column is not None)}
+    )
+
+
+def quiz_projection() -> tuple:
+    """Columns of QuizOutData."""
+    return (
+        Quiz.id,
+        Quiz.title,
+        Quiz.description,
+        Quiz.creator_id,
+        Quiz.is_public,
+        quiz_tags_json().label("tags"),
+        Quiz.created_at,
+        Quiz.updated_at,
+        Quiz.deleted_at,
+    )
+
+
+def question_projection() -> tuple:
+    """Columns of QuestionOutData."""
+    return (
+        Question.id,
+        Question.quiz_id,
+        Question.question_text,
+        Question.question_type,
+        Question.points,
+        question_options_json().label("options"),
+        Question.created_at,
+        Question.updated_at,
+        Question.deleted_at,
+    )
+
+
+def attempt_projection() -> tuple:
+    """Columns of AttemptOutData."""
+    return (
+        QuizAttempt.id,
+        QuizAttempt.quiz_id,
+        QuizAttempt.user_id,
+        QuizAttempt.attempt_no,
+        QuizAttempt.score,
+        QuizAttempt.started_at,
+        QuizAttempt.finished_at,
+    )
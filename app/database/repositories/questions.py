@@ -1,10 +1,13 @@
-from sqlalchemy import and_, select
+from sqlalchemy import and_, insert, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.database.repositories.base import BaseRepository, db_error_handler
+from app.database.repositories.projections import question_projection
 from app.models.question import Question
-from app.schemas.question import QuestionInCreate, QuestionInUpdate
+from app.schemas.question import QuestionInCreate, QuestionInQuizCreate, QuestionInQuizUpdate, QuestionInUpdate
+from app.utils.answer_keys import AnswerKey, QuestionKey
 from datetime import datetime, timezone
 
 
@@ -12,6 +15,23 @@ class QuestionsRepository(BaseRepository):
     def __init__(self, conn: AsyncSession) -> None:
         super().__init__(conn)
 
+    @staticmethod
+    def _select_questions(projection: bool):
+        """Questions with their non-deleted options, as ORM entities or, with projection, as QuestionOutData rows."""
+        from app.models.option import Option
+
+        if projection:
+            return select(*question_projection())
+        return select(Question).options(selectinload(Question.options.and_(Option.deleted_at.is_(None))))
+
+    async def _fetch_questions(self, query, projection: bool) -> list[Question] | list[Row]:
+        raw_result = await self.connection.execute(query)
+        results = raw_result.fetchall()
+
+        if projection:
+            return list(results)
+        return [result.Question for result in results]
+
     @db_error_handler
     async def create_question(self, *, question_in: QuestionInCreate) -> Question:
         question = Question(
@@ -27,10 +47,32 @@ class QuestionsRepository(BaseRepository):
         return question
 
     @db_error_handler
-    async def get_question_by_id(self, *, question_id: int) -> Question | None:
+    async def create_questions(self, *, quiz_id: int, questions_in: list[QuestionInQuizCreate]) -> list[int]:
+        """Insert all questions of a new quiz in one statement; returns their ids in the order of questions_in."""
+        if not questions_in:
+            return []
+
+        rows = [
+            {
+                "quiz_id": quiz_id,
+                "question_text": question_in.question_text,
+                "question_type": question_in.question_type,
+                "points": question_in.points,
+            }
+            for question_in in questions_in
+        ]
+        raw_result = await self.connection.scalars(insert(Question).returning(Question.id, sort_by_parameter_order=True), rows)
+
+        return list(raw_result.all())
+
+    @db_error_handler
+    async def get_question_by_id(self, *, question_id: int, refresh: bool = False) -> Question | None:
         from app.models.option import Option
 
         query = select(Question).options(selectinload(Question.options.and_(Option.deleted_at.is_(None)))).where(and_(Question.id == question_id, Question.deleted_at.is_(None)))
+        if refresh:
+            # bulk statements bypass the identity map, so overwrite anything already loaded in this session
+            query = query.execution_options(populate_existing=True)
 
         raw_result = await self.connection.execute(query)
         result = raw_result.fetchone()
@@ -41,28 +83,52 @@ class QuestionsRepository(BaseRepository):
         return result.Question if result is not None else result
 
     @db_error_handler
-    async def get_questions_by_quiz_id(self, *, quiz_id: int, skip: int = 0, limit: int = 100) -> list[Question]:
-        from app.models.option import Option
+    async def get_questions_by_quiz_id(self, *, quiz_id: int, skip: int = 0, limit: int = 100, projection: bool = False) -> list[Question] | list[Row]:
+        query = self._select_questions(projection).where(and_(Question.quiz_id == quiz_id, Question.deleted_at.is_(None))).offset(skip).limit(limit)
 
-        query = (
-            select(Question).options(selectinload(Question.options.and_(Option.deleted_at.is_(None)))).where(and_(Question.quiz_id == quiz_id, Question.deleted_at.is_(None))).offset(skip).limit(limit)
-        )
+        return await self._fetch_questions(query, projection)
 
-        raw_result = await self.connection.execute(query)
-        results = raw_result.fetchall()
+    @db_error_handler
+    async def get_quiz_id_by_question_id(self, *, question_id: int) -> int | None:
+        query = select(Question.quiz_id).where(and_(Question.id == question_id, Question.deleted_at.is_(None)))
 
-        return [result.Question for result in results]
+        raw_result = await self.connection.execute(query)
+        return raw_result.scalar()
 
     @db_error_handler
-    async def get_all_questions(self, *, skip: int = 0, limit: int = 100) -> list[Question]:
+    async def get_answer_key(self, *, quiz_id: int) -> AnswerKey:
+        """Compile the quiz answer key (question type, points and correct option ids per question) in one query."""
         from app.models.option import Option
 
-        query = select(Question).options(selectinload(Question.options.and_(Option.deleted_at.is_(None)))).where(Question.deleted_at.is_(None)).offset(skip).limit(limit)
+        query = (
+            select(Question.id, Question.question_type, Question.points, Option.id.label("option_id"))
+            .outerjoin(
+                Option,
+                and_(Option.question_id == Question.id, Option.is_correct.is_(True), Option.deleted_at.is_(None)),
+            )
+            .where(and_(Question.quiz_id == quiz_id, Question.deleted_at.is_(None)))
+        )
 
         raw_result = await self.connection.execute(query)
-        results = raw_result.fetchall()
 
-        return [result.Question for result in results]
+        questions: dict[int, tuple[str, int]] = {}
+        correct_option_ids: dict[int, set[int]] = {}
+        for row in raw_result.fetchall():
+            questions[row.id] = (row.question_type, row.points)
+            option_ids = correct_option_ids.setdefault(row.id, set())
+            if row.option_id is not None:
+                option_ids.add(row.option_id)
+
+        return {
+            question_id: QuestionKey(question_type=question_type, points=points, correct_option_ids=frozenset(correct_option_ids[question_id]))
+            for question_id, (question_type, points) in questions.items()
+        }
+
+    @db_error_handler
+    async def get_all_questions(self, *, skip: int = 0, limit: int = 100, projection: bool = False) -> list[Question] | list[Row]:
+        query = self._select_questions(projection).where(Question.deleted_at.is_(None)).offset(skip).limit(limit)
+
+        return await self._fetch_questions(query, projection)
 
     @db_error_handler
     async def update_question(self, *, question: Question, question_in: QuestionInUpdate) -> Question:
@@ -98,3 +164,58 @@ class QuestionsRepository(BaseRepository):
             question.deleted_at = datetime.now(timezone.utc)
 
         await self.connection.commit()
+
+    @db_error_handler
+    async def sync_questions(self, *, quiz_id: int, existing: list[Question], questions_in: list[QuestionInQuizUpdate]) -> list[int]:
+        """
+        Apply questions_in to the quiz as a diff against its existing (non-deleted) questions.
+        Items with an id update that question only if a field changed, items without an id are inserted and
+        existing questions missing from questions_in are soft-deleted. Each kind of change is one statement.
+        Returns the question id of every item in questions_in, in order.
+        """
+        existing_by_id = {question.id: question for question in existing}
+        now = datetime.now(timezone.utc)
+
+        updates = []
+        inserts = []
+        for question_in in questions_in:
+            if question_in.id is None:
+                inserts.append(
+                    {
+                        "quiz_id": quiz_id,
+                        "question_text": question_in.question_text,
+                        "question_type": question_in.question_type,
+                        "points": question_in.points,
+                    }
+                )
+                continue
+
+            question = existing_by_id[question_in.id]
+            if (question.question_text, question.question_type, question.points) != (question_in.question_text, question_in.question_type, question_in.points):
+                updates.append(
+                    {
+                        "id": question.id,
+                        "question_text": question_in.question_text,
+                        "question_type": question_in.question_type,
+                        "points": question_in.points,
+                        "updated_at": now,
+                    }
+                )
+
+        kept_ids = {question_in.id for question_in in questions_in if question_in.id is not None}
+        deleted_ids = [question_id for question_id in existing_by_id if question_id not in kept_ids]
+
+        if deleted_ids:
+            await self.connection.execute(
+                update(Question).where(Question.id.in_(deleted_ids)).values(deleted_at=now).execution_options(synchronize_session=False)
+            )
+        if updates:
+            await self.connection.execute(update(Question), updates)
+
+        inserted_ids = []
+        if inserts:
+            raw_result = await self.connection.scalars(insert(Question).returning(Question.id, sort_by_parameter_order=True), inserts)
+            inserted_ids = list(raw_result.all())
+
+        new_ids = iter(inserted_ids)
+        return [question_in.id if question_in.id is not None else next(new_ids) for question_in in questions_in]
@@ -1,11 +1,35 @@
+from collections.abc import AsyncIterator, Sequence
 from datetime import datetime, timezone
-from sqlalchemy import and_, select, func, desc
+from sqlalchemy import and_, case, select, func, desc, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from typing import Optional
 
 from app.database.repositories.base import BaseRepository, db_error_handler
+from app.database.repositories.projections import attempt_projection
+from app.models.answer import Answer
 from app.models.quiz_attempt import QuizAttempt
+from app.models.user import User
+from app.models.user_quiz_best import UserQuizBest
+
+
+# Columns of quiz result exports, one row per answer
+QUIZ_RESULT_EXPORT_COLUMNS = (
+    QuizAttempt.id.label("attempt_id"),
+    QuizAttempt.user_id,
+    User.username,
+    QuizAttempt.attempt_no,
+    QuizAttempt.score,
+    QuizAttempt.started_at,
+    QuizAttempt.finished_at,
+    Answer.question_id,
+    Answer.selected_option_ids,
+    Answer.text_answer,
+    Answer.is_correct,
+    Answer.submitted_at,
+)
 
 
 class QuizAttemptsRepository(BaseRepository):
@@ -53,9 +77,9 @@ class QuizAttemptsRepository(BaseRepository):
         return result.QuizAttempt if result is not None else None
 
     @db_error_handler
-    async def get_user_attempts_for_quiz(self, *, user_id: int, quiz_id: int) -> list[QuizAttempt]:
-        """Get all attempts by a user for a specific quiz, ordered by attempt_no"""
-        query = select(QuizAttempt).where(
+    async def get_user_attempts_for_quiz(self, *, user_id: int, quiz_id: int, projection: bool = False) -> list[QuizAttempt] | list[Row]:
+        """Get all attempts by a user for a specific quiz, ordered by attempt_no; AttemptOutData rows with projection"""
+        query = select(*(attempt_projection() if projection else (QuizAttempt,))).where(
             and_(
                 QuizAttempt.user_id == user_id,
                 QuizAttempt.quiz_id == quiz_id,
@@ -65,7 +89,9 @@ class QuizAttemptsRepository(BaseRepository):
         
         raw_result = await self.connection.execute(query)
         results = raw_result.fetchall()
-        
+
+        if projection:
+            return list(results)
         return [result.QuizAttempt for result in results]
 
     @db_error_handler
@@ -85,11 +111,59 @@ class QuizAttemptsRepository(BaseRepository):
         return result.QuizAttempt if result is not None else None
 
     @db_error_handler
-    async def finish_attempt(self, *, attempt: QuizAttempt, score: int) -> QuizAttempt:
-        """Mark an attempt as finished with a score"""
+    async def finish_attempt(self, *, attempt: QuizAttempt, score: int) -> QuizAttempt | None:
+        """
+        Mark an attempt as finished with a score, fold it into the user's user_quiz_best row and credit total_score,
+        all in the caller's transaction. total_score is the sum of the user's best score per quiz, so only the
+        improvement over the previous best is added. Returns None if a concurrent request finished the attempt first.
+        """
+        # Lock the user row so concurrent finishes for the same user are serialized
+        await self.connection.execute(select(User.id).where(User.id == attempt.user_id).with_for_update())
+
+        finished_at_query = select(QuizAttempt.finished_at).where(QuizAttempt.id == attempt.id)
+        if (await self.connection.execute(finished_at_query)).scalar() is not None:
+            return None
+
+        previous_best_query = select(UserQuizBest.best_score).where(
+            and_(UserQuizBest.user_id == attempt.user_id, UserQuizBest.quiz_id == attempt.quiz_id)
+        )
+        previous_best = (await self.connection.execute(previous_best_query)).scalar() or 0
+
         attempt.finished_at = datetime.now(timezone.utc)
         attempt.score = score
-        
+
+        # Ties keep the earlier attempt, matching leaderboard order
+        best_insert = insert(UserQuizBest).values(
+            user_id=attempt.user_id,
+            quiz_id=attempt.quiz_id,
+            best_score=score,
+            best_attempt_id=attempt.id,
+            best_finished_at=attempt.finished_at,
+            attempts_count=1,
+            last_finished_at=attempt.finished_at,
+        )
+        improved = best_insert.excluded.best_score > UserQuizBest.best_score
+        await self.connection.execute(
+            best_insert.on_conflict_do_update(
+                index_elements=[UserQuizBest.user_id, UserQuizBest.quiz_id],
+                set_={
+                    "best_score": case((improved, best_insert.excluded.best_score), else_=UserQuizBest.best_score),
+                    "best_attempt_id": case((improved, best_insert.excluded.best_attempt_id), else_=UserQuizBest.best_attempt_id),
+                    "best_finished_at": case((improved, best_insert.excluded.best_finished_at), else_=UserQuizBest.best_finished_at),
+                    "attempts_count": UserQuizBest.attempts_count + 1,
+                    "last_finished_at": best_insert.excluded.last_finished_at,
+                },
+            )
+        )
+
+        if score > previous_best:
+            await self.connection.execute(
+                update(User)
+                .where(User.id == attempt.user_id)
+                .values(total_score=User.total_score + (score - previous_best))
+                .execution_options(synchronize_session=False)
+            )
+
         await self.connection.flush()
         return attempt
 
@@ -111,13 +185,46 @@ class QuizAttemptsRepository(BaseRepository):
         return result.QuizAttempt if result is not None else None
     
     @db_error_handler
-    async def get_user_attempts(self, *, user_id: int) -> list[QuizAttempt]:
-        """Get all attempts made by a user across all quizzes"""
-        query = select(QuizAttempt).where(
+    async def get_user_attempts(self, *, user_id: int, projection: bool = False) -> list[QuizAttempt] | list[Row]:
+        """Get all attempts made by a user across all quizzes; AttemptOutData rows with projection"""
+        query = select(*(attempt_projection() if projection else (QuizAttempt,))).where(
             and_(QuizAttempt.user_id == user_id, QuizAttempt.deleted_at.is_(None))
         ).order_by(QuizAttempt.created_at.desc())
         
         raw_result = await self.connection.execute(query)
         results = raw_result.fetchall()
-        
-        return [result.QuizAttempt for result in results] if results else []
\ No newline at end of file
+
+        if projection:
+            return list(results)
+        return [result.QuizAttempt for result in results] if results else []
+
+    @db_error_handler
+    async def get_user_best_attempts(self, *, user_id: int) -> list[UserQuizBest]:
+        """Get the user's per-quiz summary rows, most recently played quiz first"""
+        query = (
+            select(UserQuizBest)
+            .where(UserQuizBest.user_id == user_id)
+            .order_by(UserQuizBest.last_finished_at.desc())
+        )
+
+        raw_result = await self.connection.execute(query)
+        return list(raw_result.scalars().all())
+
+    async def stream_quiz_results(self, *, quiz_id: int, batch_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+        """
+        Stream a quiz's attempts joined with their answers (QUIZ_RESULT_EXPORT_COLUMNS) through a server-side cursor,
+        batch_size rows at a time. Attempts without answers yield one row with empty answer columns.
+        Not wrapped in db_error_handler: errors surface while the response is already streaming.
+        """
+        query = (
+            select(*QUIZ_RESULT_EXPORT_COLUMNS)
+            .join(User, User.id == QuizAttempt.user_id)
+            .outerjoin(Answer, and_(Answer.attempt_id == QuizAttempt.id, Answer.deleted_at.is_(None)))
+            .where(and_(QuizAttempt.quiz_id == quiz_id, QuizAttempt.deleted_at.is_(None)))
+            .order_by(QuizAttempt.id, Answer.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        raw_result = await self.connection.stream(query)
+        async for rows in raw_result.partitions():
+            yield rows
@@ -1,19 +1,69 @@
-from sqlalchemy import and_, func, or_, select
-from sqlalchemy.sql import text
+from sqlalchemy import Text, and_, cast, func, or_, select
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.database.repositories.base import BaseRepository, db_error_handler
+from app.database.repositories.projections import quiz_document, quiz_projection
 from app.models.quiz import Quiz
 from app.models.quiz_attempt import QuizAttempt
 from app.models.tag import Tag
 from app.models.user import User
+from app.models.user_quiz_best import UserQuizBest
 from app.models.question import Question
-from app.schemas.quiz import QuizInCreate, QuizInUpdate
+from app.schemas.quiz import QuizFieldSelection, QuizInCreate, QuizInUpdate
 from app.schemas.pagination import PaginationMeta
+from app.core import settings
+from app.utils.swr_cache import swr_cache
 from datetime import datetime, timezone
 
 
+# Listing counts and detail documents are served stale-while-revalidate; writes invalidate these namespaces
+QUIZ_COUNTS_CACHE = "quiz_counts"
+QUIZ_DETAIL_CACHE = "quiz_detail"
+
+_cache_quiz_counts = swr_cache(
+    QUIZ_COUNTS_CACHE,
+    soft_ttl=settings.quiz_count_cache_soft_ttl_seconds,
+    hard_ttl=settings.quiz_count_cache_hard_ttl_seconds,
+)
+_cache_quiz_detail = swr_cache(
+    QUIZ_DETAIL_CACHE,
+    soft_ttl=settings.quiz_detail_cache_soft_ttl_seconds,
+    hard_ttl=settings.quiz_detail_cache_hard_ttl_seconds,
+)
+
+
+# Quiz leaderboard order over user_quiz_best, matching ix_user_quiz_best_leaderboard
+_LEADERBOARD_ORDER = (UserQuizBest.best_score.desc(), UserQuizBest.best_finished_at.asc(), UserQuizBest.user_id.asc())
+_LEADERBOARD_ORDER_REVERSED = (UserQuizBest.best_score.asc(), UserQuizBest.best_finished_at.desc(), UserQuizBest.user_id.desc())
+
+
+def _leaderboard_entries(*, quiz_id: int):
+    """Select a quiz's leaderboard rows: user_id, username, score, attempt_no, finished_at."""
+    return (
+        select(
+            UserQuizBest.user_id,
+            User.username,
+            UserQuizBest.best_score.label("score"),
+            QuizAttempt.attempt_no,
+            UserQuizBest.best_finished_at.label("finished_at"),
+        )
+        .join(User, User.id == UserQuizBest.user_id)
+        .join(QuizAttempt, QuizAttempt.id == UserQuizBest.best_attempt_id)
+        .where(UserQuizBest.quiz_id == quiz_id)
+    )
+
+
+def _ranked_ahead(*, score: int, finished_at: datetime, user_id: int):
+    """True for user_quiz_best rows ranked ahead of the given entry in leaderboard order."""
+    return or_(
+        UserQuizBest.best_score > score,
+        and_(UserQuizBest.best_score == score, UserQuizBest.best_finished_at < finished_at),
+        and_(UserQuizBest.best_score == score, UserQuizBest.best_finished_at == finished_at, UserQuizBest.user_id < user_id),
+    )
+
+
 class QuizzesRepository(BaseRepository):
     def __init__(self, conn: AsyncSession) -> None:
         super().__init__(conn)
@@ -34,6 +84,26 @@ class QuizzesRepository(BaseRepository):
             current_page=current_page,
         )
 
+    @staticmethod
+    def _select_quizzes(projection: bool, selection: QuizFieldSelection | None = None):
+        """
+        Quizzes as ORM entities with their tags; with projection, as QuizOutData rows; with a selection, as rows
+        whose `document` column is the sparse quiz JSON rendered by Postgres (nothing else is loaded).
+        """
+        if selection is not None:
+            return select(cast(quiz_document(fields=selection.fields, include=selection.include), Text).label("document"))
+        if projection:
+            return select(*quiz_projection())
+        return select(Quiz).options(selectinload(Quiz.tags))
+
+    async def _fetch_quizzes(self, query, projection: bool) -> list[Quiz] | list[Row]:
+        raw_result = await self.connection.execute(query)
+        results = raw_result.fetchall()
+
+        if projection:
+            return list(results)
+        return [result.Quiz for result in results]
+
     @db_error_handler
     async def create_quiz(self, *, creator: User, quiz_in: QuizInCreate, tags: list[Tag] | None = None) -> Quiz:
         quiz = Quiz(
@@ -52,24 +122,28 @@ class QuizzesRepository(BaseRepository):
 
         return quiz
 
+    @_cache_quiz_counts
     @db_error_handler
     async def count_all_quizzes(self) -> int:
         query = select(func.count(Quiz.id)).where(Quiz.deleted_at.is_(None))
         raw_result = await self.connection.execute(query)
         return raw_result.scalar() or 0
 
+    @_cache_quiz_counts
     @db_error_handler
     async def count_public_quizzes(self) -> int:
         query = select(func.count(Quiz.id)).where(and_(Quiz.is_public, Quiz.deleted_at.is_(None)))
         raw_result = await self.connection.execute(query)
         return raw_result.scalar() or 0
 
+    @_cache_quiz_counts
     @db_error_handler
     async def count_quizzes_by_creator(self, *, creator_id: int) -> int:
         query = select(func.count(Quiz.id)).where(and_(Quiz.creator_id == creator_id, Quiz.deleted_at.is_(None)))
         raw_result = await self.connection.execute(query)
         return raw_result.scalar() or 0
 
+    @_cache_quiz_counts
     @db_error_handler
     async def count_quizzes_by_tag(self, *, tag: str) -> int:
         query = (
@@ -95,77 +169,109 @@ class QuizzesRepository(BaseRepository):
 
         return result.Quiz
 
+    @_cache_quiz_detail
     @db_error_handler
-    async def get_all_quizzes(self, *, skip: int = 0, limit: int = 100) -> list[Quiz]:
-        query = select(Quiz).options(selectinload(Quiz.tags)).where(Quiz.deleted_at.is_(None)).offset(skip).limit(limit)
+    async def get_quiz_detail_json(self, *, quiz_id: int, selection: QuizFieldSelection | None = None) -> str | None:
+        """
+        Render the quiz detail document (quiz, tags, questions and options, or only what `selection` asks for)
+        entirely in Postgres. Soft-deleted questions and options are filtered out.
+        Returns the JSON text, or None if the quiz doesn't exist.
+        """
+        quiz_json = quiz_document() if selection is None else quiz_document(fields=selection.fields, include=selection.include)
+        query = select(cast(quiz_json, Text)).where(and_(Quiz.id == quiz_id, Quiz.deleted_at.is_(None)))
 
         raw_result = await self.connection.execute(query)
-        results = raw_result.fetchall()
-
-        return [result.Quiz for result in results]
+        return raw_result.scalar()
 
     @db_error_handler
-    async def get_public_quizzes(self, *, skip: int = 0, limit: int = 100) -> list[Quiz]:
-        query = select(Quiz).options(selectinload(Quiz.tags)).where(and_(Quiz.is_public, Quiz.deleted_at.is_(None))).offset(skip).limit(limit)
-
-        raw_result = await self.connection.execute(query)
-        results = raw_result.fetchall()
+    async def get_all_quizzes(self, *, skip: int = 0, limit: int = 100, projection: bool = False, selection: QuizFieldSelection | None = None) -> list[Quiz] | list[Row]:
+        query = self._select_quizzes(projection, selection).where(Quiz.deleted_at.is_(None)).offset(skip).limit(limit)
 
-        return [result.Quiz for result in results]
+        return await self._fetch_quizzes(query, projection or selection is not None)
 
     @db_error_handler
-    async def get_quizzes_by_creator(self, *, creator_id: int, skip: int = 0, limit: int = 100) -> list[Quiz]:
-        query = select(Quiz).options(selectinload(Quiz.tags)).where(and_(Quiz.creator_id == creator_id, Quiz.deleted_at.is_(None))).offset(skip).limit(limit)
+    async def get_public_quizzes(self, *, skip: int = 0, limit: int = 100, projection: bool = False, selection: QuizFieldSelection | None = None) -> list[Quiz] | list[Row]:
+        query = self._select_quizzes(projection, selection).where(and_(Quiz.is_public, Quiz.deleted_at.is_(None))).offset(skip).limit(limit)
 
-        raw_result = await self.connection.execute(query)
-        results = raw_result.fetchall()
+        return await self._fetch_quizzes(query, projection or selection is not None)
 
-        return [result.Quiz for result in results]
+    @db_error_handler
+    async def get_quizzes_by_creator(self, *, creator_id: int, skip: int = 0, limit: int = 100, projection: bool = False, selection: QuizFieldSelection | None = None) -> list[Quiz] | list[Row]:
+        query = self._select_quizzes(projection, selection).where(and_(Quiz.creator_id == creator_id, Quiz.deleted_at.is_(None))).offset(skip).limit(limit)
+
+        return await self._fetch_quizzes(query, projection or selection is not None)
 
     @db_error_handler
-    async def search_quizzes_by_tag(self, *, tag: str, skip: int = 0, limit: int = 100) -> list[Quiz]:
+    async def search_quizzes_by_tag(self, *, tag: str, skip: int = 0, limit: int = 100, projection: bool = False, selection: QuizFieldSelection | None = None) -> list[Quiz] | list[Row]:
         query = (
-            select(Quiz)
+            self._select_quizzes(projection, selection)
             .join(Quiz.tags)
-            .options(selectinload(Quiz.tags))
             .where(and_(Tag.name.ilike(f"%{tag}%"), Quiz.is_public, Quiz.deleted_at.is_(None)))
             .offset(skip)
             .limit(limit)
         )
 
-        raw_result = await self.connection.execute(query)
-        results = raw_result.fetchall()
-
-        return [result.Quiz for result in results]
+        return await self._fetch_quizzes(query, projection or selection is not None)
 
     @db_error_handler
-    async def get_all_quizzes_paginated(self, *, skip: int = 0, limit: int = 20) -> tuple[list[Quiz], PaginationMeta]:
+    async def get_all_quizzes_paginated(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 20,
+        projection: bool = False,
+        selection: QuizFieldSelection | None = None,
+    ) -> tuple[list[Quiz] | list[Row], PaginationMeta]:
         total = await self.count_all_quizzes()
-        quizzes = await self.get_all_quizzes(skip=skip, limit=limit)
+        quizzes = await self.get_all_quizzes(skip=skip, limit=limit, projection=projection, selection=selection)
         meta = self._create_pagination_meta(total, skip, limit)
         return quizzes, meta
 
     @db_error_handler
-    async def get_public_quizzes_paginated(self, *, skip: int = 0, limit: int = 20) -> tuple[list[Quiz], PaginationMeta]:
+    async def get_public_quizzes_paginated(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 20,
+        projection: bool = False,
+        selection: QuizFieldSelection | None = None,
+    ) -> tuple[list[Quiz] | list[Row], PaginationMeta]:
         total = await self.count_public_quizzes()
-        quizzes = await self.get_public_quizzes(skip=skip, limit=limit)
+        quizzes = await self.get_public_quizzes(skip=skip, limit=limit, projection=projection, selection=selection)
         meta = self._create_pagination_meta(total, skip, limit)
         return quizzes, meta
 
     @db_error_handler
-    async def get_quizzes_by_creator_paginated(self, *, creator_id: int, skip: int = 0, limit: int = 20) -> tuple[list[Quiz], PaginationMeta]:
+    async def get_quizzes_by_creator_paginated(
+        self,
+        *,
+        creator_id: int,
+        skip: int = 0,
+        limit: int = 20,
+        projection: bool = False,
+        selection: QuizFieldSelection | None = None,
+    ) -> tuple[list[Quiz] | list[Row], PaginationMeta]:
         total = await self.count_quizzes_by_creator(creator_id=creator_id)
-        quizzes = await self.get_quizzes_by_creator(creator_id=creator_id, skip=skip, limit=limit)
+        quizzes = await self.get_quizzes_by_creator(creator_id=creator_id, skip=skip, limit=limit, projection=projection, selection=selection)
         meta = self._create_pagination_meta(total, skip, limit)
         return quizzes, meta
 
     @db_error_handler
-    async def search_quizzes_by_tag_paginated(self, *, tag: str, skip: int = 0, limit: int = 20) -> tuple[list[Quiz], PaginationMeta]:
+    async def search_quizzes_by_tag_paginated(
+        self,
+        *,
+        tag: str,
+        skip: int = 0,
+        limit: int = 20,
+        projection: bool = False,
+        selection: QuizFieldSelection | None = None,
+    ) -> tuple[list[Quiz] | list[Row], PaginationMeta]:
         total = await self.count_quizzes_by_tag(tag=tag)
-        quizzes = await self.search_quizzes_by_tag(tag=tag, skip=skip, limit=limit)
+        quizzes = await self.search_quizzes_by_tag(tag=tag, skip=skip, limit=limit, projection=projection, selection=selection)
         meta = self._create_pagination_meta(total, skip, limit)
         return quizzes, meta
 
+    @_cache_quiz_counts
     @db_error_handler
     async def count_quizzes_by_text_search(self, *, search_text: str, public_only: bool = True) -> int:
         conditions = [
@@ -184,7 +290,16 @@ class QuizzesRepository(BaseRepository):
         return raw_result.scalar() or 0
 
     @db_error_handler
-    async def search_quizzes_by_text(self, *, search_text: str, public_only: bool = True, skip: int = 0, limit: int = 100) -> list[Quiz]:
+    async def search_quizzes_by_text(
+        self,
+        *,
+        search_text: str,
+        public_only: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+        projection: bool = False,
+        selection: QuizFieldSelection | None = None,
+    ) -> list[Quiz] | list[Row]:
         conditions = [
             or_(
                 Quiz.title.ilike(f"%{search_text}%"),
@@ -197,22 +312,27 @@ class QuizzesRepository(BaseRepository):
             conditions.append(Quiz.is_public)
         
         query = (
-            select(Quiz)
-            .options(selectinload(Quiz.tags))
+            self._select_quizzes(projection, selection)
             .where(and_(*conditions))
             .offset(skip)
             .limit(limit)
         )
-        
-        raw_result = await self.connection.execute(query)
-        results = raw_result.fetchall()
-        
-        return [result.Quiz for result in results]
+
+        return await self._fetch_quizzes(query, projection or selection is not None)
 
     @db_error_handler
-    async def search_quizzes_by_text_paginated(self, *, search_text: str, public_only: bool = True, skip: int = 0, limit: int = 20) -> tuple[list[Quiz], PaginationMeta]:
+    async def search_quizzes_by_text_paginated(
+        self,
+        *,
+        search_text: str,
+        public_only: bool = True,
+        skip: int = 0,
+        limit: int = 20,
+        projection: bool = False,
+        selection: QuizFieldSelection | None = None,
+    ) -> tuple[list[Quiz] | list[Row], PaginationMeta]:
         total = await self.count_quizzes_by_text_search(search_text=search_text, public_only=public_only)
-        quizzes = await self.search_quizzes_by_text(search_text=search_text, public_only=public_only, skip=skip, limit=limit)
+        quizzes = await self.search_quizzes_by_text(search_text=search_text, public_only=public_only, skip=skip, limit=limit, projection=projection, selection=selection)
         meta = self._create_pagination_meta(total, skip, limit)
         return quizzes, meta
 
@@ -242,58 +362,66 @@ class QuizzesRepository(BaseRepository):
         return quiz
 
     @db_error_handler
-    async def get_quiz_leaderboard(self, *, quiz_id: int, limit: int = 50) -> list[QuizAttempt]:
+    async def get_quiz_leaderboard(self, *, quiz_id: int, limit: int = 50) -> list[Row]:
         """
         Get the leaderboard for a specific quiz, showing the best attempt from each user.
-        Only returns finished attempts (where finished_at is not null).
-        Uses window function to get highest scoring attempt per user.
+        Reads the user_quiz_best summary in index order; rows carry user_id, username, score, attempt_no and finished_at.
         """
-        # Use a CTE (Common Table Expression) with ROW_NUMBER() to rank attempts per user
-        ranked_attempts = text("""
-            WITH ranked_attempts AS (
-                SELECT 
-                    qa.*,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY qa.user_id 
-                        ORDER BY qa.score DESC, qa.finished_at ASC
-                    ) as rank
-                FROM quiz_attempts qa
-                WHERE qa.quiz_id = :quiz_id 
-                AND qa.finished_at IS NOT NULL
-            )
-            SELECT * FROM ranked_attempts 
-            WHERE rank = 1 
-            ORDER BY score DESC, finished_at ASC
-            LIMIT :limit
-        """)
+        query = (
+            _leaderboard_entries(quiz_id=quiz_id)
+            .order_by(*_LEADERBOARD_ORDER)
+            .limit(limit)
+        )
 
-        raw_result = await self.connection.execute(ranked_attempts, {"quiz_id": quiz_id, "limit": limit})
-        results = raw_result.fetchall()
+        raw_result = await self.connection.execute(query)
+        return list(raw_result.fetchall())
+
+    @db_error_handler
+    async def get_user_leaderboard_entry(self, *, quiz_id: int, user_id: int) -> Row | None:
+        """Get the user's leaderboard entry (best finished attempt) for a quiz."""
+        query = _leaderboard_entries(quiz_id=quiz_id).where(UserQuizBest.user_id == user_id)
+
+        raw_result = await self.connection.execute(query)
+        return raw_result.fetchone()
 
-        # Convert raw results back to QuizAttempt objects
-        quiz_attempts = []
-        for result in results:
-            # Create QuizAttempt object from raw result
-            attempt = QuizAttempt(
-                quiz_id=result.quiz_id,
-                user_id=result.user_id,
-                attempt_no=result.attempt_no
+    @db_error_handler
+    async def get_leaderboard_rank(self, *, quiz_id: int, user_id: int, score: int, finished_at: datetime) -> int:
+        """
+        1-based leaderboard position of an entry: one plus the number of users ranked ahead of it.
+        A single range count on ix_user_quiz_best_leaderboard.
+        """
+        query = select(func.count()).select_from(UserQuizBest).where(
+            and_(
+                UserQuizBest.quiz_id == quiz_id,
+                _ranked_ahead(score=score, finished_at=finished_at, user_id=user_id),
             )
-            attempt.id = result.id
-            attempt.started_at = result.started_at
-            attempt.finished_at = result.finished_at
-            attempt.score = result.score
-            attempt.created_at = result.created_at
-            attempt.updated_at = result.updated_at
-            attempt.deleted_at = result.deleted_at
-            
-            # We need to load the user separately since we're using raw SQL
-            user_query = select(User).where(User.id == result.user_id)
-            user_result = await self.connection.execute(user_query)
-            user = user_result.fetchone()
-            if user:
-                attempt.user = user.User
-            
-            quiz_attempts.append(attempt)
-
-        return quiz_attempts
+        )
+
+        raw_result = await self.connection.execute(query)
+        return raw_result.scalar() + 1
+
+    @db_error_handler
+    async def get_leaderboard_neighbours(
+        self, *, quiz_id: int, user_id: int, score: int, finished_at: datetime, limit: int = 2
+    ) -> tuple[list[Row], list[Row]]:
+        """
+        Get up to `limit` leaderboard entries directly above and below an entry, both in leaderboard order.
+        """
+        entry_position = _ranked_ahead(score=score, finished_at=finished_at, user_id=user_id)
+        above_query = (
+            _leaderboard_entries(quiz_id=quiz_id)
+            .where(entry_position)
+            .order_by(*_LEADERBOARD_ORDER_REVERSED)
+            .limit(limit)
+        )
+        below_query = (
+            _leaderboard_entries(quiz_id=quiz_id)
+            .where(and_(~entry_position, UserQuizBest.user_id != user_id))
+            .order_by(*_LEADERBOARD_ORDER)
+            .limit(limit)
+        )
+
+        above = (await self.connection.execute(above_query)).fetchall()
+        below = (await self.connection.execute(below_query)).fetchall()
+
+        return list(reversed(above)), list(below)
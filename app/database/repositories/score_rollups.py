@@ -0,0 +1,215 @@
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+
+from app.database.repositories.base import BaseRepository, db_error_handler
+from app.models.quiz_attempt import QuizAttempt
+from app.models.score_rollup import LeaderboardPeriod, QuizScoreRollup, UserScoreRollup
+from app.models.user import User
+
+# Advisory lock id so only one worker compacts rollups at a time
+ROLLUP_COMPACTION_LOCK_ID = 3_203_001
+
+
+def rollup_buckets(moment: datetime) -> dict[LeaderboardPeriod, date]:
+    """UTC day and ISO week (starting Monday) buckets that a moment falls into."""
+    day = moment.astimezone(UTC).date()
+    return {
+        LeaderboardPeriod.DAY: day,
+        LeaderboardPeriod.WEEK: day - timedelta(days=day.weekday()),
+    }
+
+
+class ScoreRollupsRepository(BaseRepository):
+    def __init__(self, conn: AsyncSession) -> None:
+        super().__init__(conn)
+
+    @db_error_handler
+    async def record_finished_attempt(self, *, attempt: QuizAttempt) -> None:
+        """
+        Fold a finished attempt into the day and week rollups of its finish time, in the caller's transaction.
+        Callers must hold the user row lock taken by QuizAttemptsRepository.finish_attempt.
+        """
+        buckets = rollup_buckets(attempt.finished_at)
+
+        previous_query = select(QuizScoreRollup.period, QuizScoreRollup.best_score).where(
+            and_(
+                QuizScoreRollup.quiz_id == attempt.quiz_id,
+                QuizScoreRollup.user_id == attempt.user_id,
+                tuple_(QuizScoreRollup.period, QuizScoreRollup.bucket_start).in_(list(buckets.items())),
+            )
+        )
+        previous_best = dict((await self.connection.execute(previous_query)).fetchall())
+
+        for period, bucket_start in buckets.items():
+            if period in previous_best and attempt.score <= previous_best[period]:
+                continue
+
+            best_insert = insert(QuizScoreRollup).values(
+                quiz_id=attempt.quiz_id,
+                period=period,
+                bucket_start=bucket_start,
+                user_id=attempt.user_id,
+                best_score=attempt.score,
+                best_attempt_id=attempt.id,
+                best_finished_at=attempt.finished_at,
+            )
+            await self.connection.execute(
+                best_insert.on_conflict_do_update(
+                    index_elements=[QuizScoreRollup.quiz_id, QuizScoreRollup.period, QuizScoreRollup.bucket_start, QuizScoreRollup.user_id],
+                    set_={
+                        "best_score": best_insert.excluded.best_score,
+                        "best_attempt_id": best_insert.excluded.best_attempt_id,
+                        "best_finished_at": best_insert.excluded.best_finished_at,
+                    },
+                )
+            )
+
+            total_insert = insert(UserScoreRollup).values(
+                user_id=attempt.user_id,
+                period=period,
+                bucket_start=bucket_start,
+                total_score=attempt.score - previous_best.get(period, 0),
+            )
+            await self.connection.execute(
+                total_insert.on_conflict_do_update(
+                    index_elements=[UserScoreRollup.user_id, UserScoreRollup.period, UserScoreRollup.bucket_start],
+                    set_={"total_score": UserScoreRollup.total_score + total_insert.excluded.total_score},
+                )
+            )
+
+    @db_error_handler
+    async def get_quiz_leaderboard(self, *, quiz_id: int, period: LeaderboardPeriod, limit: int = 50) -> list[Row]:
+        """
+        Get the current day / week leaderboard of a quiz; rows carry user_id, username, score, attempt_no and finished_at.
+        """
+        bucket_start = rollup_buckets(datetime.now(UTC))[period]
+        query = (
+            select(
+                QuizScoreRollup.user_id,
+                User.username,
+                QuizScoreRollup.best_score.label("score"),
+                QuizAttempt.attempt_no,
+                QuizScoreRollup.best_finished_at.label("finished_at"),
+            )
+            .join(User, User.id == QuizScoreRollup.user_id)
+            .join(QuizAttempt, QuizAttempt.id == QuizScoreRollup.best_attempt_id)
+            .where(
+                and_(
+                    QuizScoreRollup.quiz_id == quiz_id,
+                    QuizScoreRollup.period == period,
+                    QuizScoreRollup.bucket_start == bucket_start,
+                )
+            )
+            .order_by(QuizScoreRollup.best_score.desc(), QuizScoreRollup.best_finished_at.asc(), QuizScoreRollup.user_id.asc())
+            .limit(limit)
+        )
+
+        raw_result = await self.connection.execute(query)
+        return list(raw_result.fetchall())
+
+    @db_error_handler
+    async def get_user_leaderboard(
+        self,
+        *,
+        period: LeaderboardPeriod,
+        limit: int = 20,
+        after_score: int | None = None,
+        after_id: int | None = None,
+    ) -> list[Row]:
+        """
+        Get the current day / week global leaderboard with keyset pagination; rows carry id, username and total_score
+        like UsersRepository.get_leaderboard.
+        """
+        bucket_start = rollup_buckets(datetime.now(UTC))[period]
+        query = (
+            select(User.id, User.username, UserScoreRollup.total_score)
+            .join(User, User.id == UserScoreRollup.user_id)
+            .where(
+                and_(
+                    UserScoreRollup.period == period,
+                    UserScoreRollup.bucket_start == bucket_start,
+                    UserScoreRollup.total_score > 0,
+                    User.deleted_at.is_(None),
+                )
+            )
+        )
+
+        if after_score is not None and after_id is not None:
+            query = query.where(
+                or_(
+                    UserScoreRollup.total_score < after_score,
+                    and_(UserScoreRollup.total_score == after_score, UserScoreRollup.user_id > after_id),
+                )
+            )
+
+        query = query.order_by(UserScoreRollup.total_score.desc(), UserScoreRollup.user_id.asc()).limit(limit)
+
+        raw_result = await self.connection.execute(query)
+        return list(raw_result.fetchall())
+
+    @db_error_handler
+    async def compact_day_rollups(self, *, before: date) -> int | None:
+        """
+        Fold day rollups older than `before` into their week buckets and delete them.
+        Returns the number of day rows removed, or None if another worker holds the compaction lock.
+        The caller commits.
+        """
+        locked = await self.connection.execute(select(func.pg_try_advisory_xact_lock(ROLLUP_COMPACTION_LOCK_ID)))
+        if not locked.scalar():
+            return None
+
+        # Live finishes only write to the current buckets, so week totals are only rebuilt for closed weeks
+        params = {"before": before, "current_week": rollup_buckets(datetime.now(UTC))[LeaderboardPeriod.WEEK]}
+
+        # Week rows are maintained on finish as well; merging keeps them correct for days recorded before that
+        await self.connection.execute(
+            text("""
+                INSERT INTO quiz_score_rollups (quiz_id, period, bucket_start, user_id, best_score, best_attempt_id, best_finished_at)
+                SELECT DISTINCT ON (d.quiz_id, d.user_id, date_trunc('week', d.bucket_start)::date)
+                    d.quiz_id, 'week', date_trunc('week', d.bucket_start)::date, d.user_id,
+                    d.best_score, d.best_attempt_id, d.best_finished_at
+                FROM quiz_score_rollups d
+                WHERE d.period = 'day' AND d.bucket_start < :before
+                ORDER BY d.quiz_id, d.user_id, date_trunc('week', d.bucket_start)::date, d.best_score DESC, d.best_finished_at ASC
+                ON CONFLICT (quiz_id, period, bucket_start, user_id) DO UPDATE
+                SET best_score = excluded.best_score,
+                    best_attempt_id = excluded.best_attempt_id,
+                    best_finished_at = excluded.best_finished_at
+                WHERE excluded.best_score > quiz_score_rollups.best_score
+                OR (excluded.best_score = quiz_score_rollups.best_score AND excluded.best_finished_at < quiz_score_rollups.best_finished_at)
+            """),
+            params,
+        )
+
+        await self.connection.execute(
+            text("""
+                INSERT INTO user_score_rollups (user_id, period, bucket_start, total_score)
+                SELECT w.user_id, 'week', w.bucket_start, SUM(w.best_score)
+                FROM quiz_score_rollups w
+                WHERE w.period = 'week'
+                AND w.bucket_start < :current_week
+                AND (w.user_id, w.bucket_start) IN (
+                    SELECT DISTINCT d.user_id, date_trunc('week', d.bucket_start)::date
+                    FROM quiz_score_rollups d
+                    WHERE d.period = 'day' AND d.bucket_start < :before
+                )
+                GROUP BY w.user_id, w.bucket_start
+                ON CONFLICT (user_id, period, bucket_start) DO UPDATE
+                SET total_score = excluded.total_score
+            """),
+            params,
+        )
+
+        deleted = await self.connection.execute(
+            text("DELETE FROM quiz_score_rollups WHERE period = 'day' AND bucket_start < :before"), params
+        )
+        await self.connection.execute(
+            text("DELETE FROM user_score_rollups WHERE period = 'day' AND bucket_start < :before"), params
+        )
+
+        return deleted.rowcount
@@ -3,6 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.database.repositories.base import BaseRepository, db_error_handler
+from app.models.quiz import Quiz
+from app.models.quiz_tag import quiz_tags
 from app.models.tag import Tag
 from app.schemas.tag import TagInCreate, TagInUpdate
 from datetime import datetime, timezone
@@ -54,6 +56,21 @@ class TagsRepository(BaseRepository):
 
         return [result.Tag for result in results]
 
+    @db_error_handler
+    async def get_popular_tag_names(self, *, limit: int) -> list[str]:
+        """Names of the tags on the most public quizzes."""
+        query = (
+            select(Tag.name)
+            .join(quiz_tags, quiz_tags.c.tag_id == Tag.id)
+            .join(Quiz, Quiz.id == quiz_tags.c.quiz_id)
+            .where(and_(Tag.deleted_at.is_(None), Quiz.is_public, Quiz.deleted_at.is_(None)))
+            .group_by(Tag.name)
+            .order_by(func.count().desc(), Tag.name)
+            .limit(limit)
+        )
+
+        return list((await self.connection.execute(query)).scalars())
+
     @db_error_handler
     async def get_or_create_tags(self, *, tag_names: list[str]) -> list[Tag]:
         tags = []
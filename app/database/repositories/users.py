@@ -1,6 +1,9 @@
 from sqlalchemy import and_, func, or_, select
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
 
+from app.core.security import run_bcrypt
 from app.database.repositories.base import BaseRepository, db_error_handler
 from app.models.user import User
 from app.schemas.user import UserInCreate, UserInDB, UserInUpdate
@@ -12,7 +15,7 @@ class UsersRepository(BaseRepository):
         super().__init__(conn)
 
     async def get_user_password_validation(self, *, user: User, password: str) -> bool:
-        user_password_checked = user.check_password(password=password)
+        user_password_checked = await run_bcrypt(user.check_password, password=password)
         return user_password_checked
 
     @db_error_handler
@@ -65,7 +68,7 @@ class UsersRepository(BaseRepository):
             email=user_in.email,
             role=user_in.role,
         )
-        user_in_db_obj.change_password(user_in.password)
+        await run_bcrypt(user_in_db_obj.change_password, user_in.password)
 
         created_user = User(**user_in_db_obj.model_dump(exclude_none=True))
         self.connection.add(created_user)
@@ -77,7 +80,7 @@ class UsersRepository(BaseRepository):
     async def update_user(self, *, user: User, user_in: UserInUpdate) -> User:
         user_in_obj = user_in.model_dump(exclude_unset=True)
         if user_in.password:
-            user.change_password(user_in.password)
+            await run_bcrypt(user.change_password, user_in.password)
 
         for key, val in user_in_obj.items():
             setattr(user, key, val)
@@ -95,3 +98,61 @@ class UsersRepository(BaseRepository):
         await self.connection.commit()
         await self.connection.refresh(user)
         return user
+
+    @db_error_handler
+    async def get_leaderboard(self, *, limit: int = 20, after_score: int | None = None, after_id: int | None = None) -> list[Row]:
+        """
+        Global ranking by the maintained users.total_score, walked with keyset pagination over
+        (total_score DESC, id ASC) so every page is a range scan on ix_users_total_score_id.
+        """
+        query = select(User.id, User.username, User.total_score).where(and_(User.deleted_at.is_(None), User.total_score > 0))
+
+        if after_score is not None and after_id is not None:
+            query = query.where(
+                or_(
+                    User.total_score < after_score,
+                    and_(User.total_score == after_score, User.id > after_id),
+                )
+            )
+
+        query = query.order_by(User.total_score.desc(), User.id.asc()).limit(limit)
+
+        raw_result = await self.connection.execute(query)
+        return list(raw_result.fetchall())
+
+    @db_error_handler
+    async def recompute_total_scores(self, *, first_id: int, last_id: int) -> int:
+        """
+        Recompute total_score (sum of the best finished attempt per quiz) for users with ids in [first_id, last_id].
+        Used for backfills; the per-request path keeps total_score up to date incrementally.
+        Returns the number of users whose score changed.
+        """
+        recompute = text("""
+            UPDATE users u
+            SET total_score = totals.total_score
+            FROM (
+                SELECT u2.id, COALESCE(SUM(best.score), 0) AS total_score
+                FROM users u2
+                LEFT JOIN (
+                    SELECT qa.user_id, qa.quiz_id, MAX(qa.score) AS score
+                    FROM quiz_attempts qa
+                    WHERE qa.user_id BETWEEN :first_id AND :last_id
+                    AND qa.finished_at IS NOT NULL
+                    AND qa.deleted_at IS NULL
+                    GROUP BY qa.user_id, qa.quiz_id
+                ) best ON best.user_id = u2.id
+                WHERE u2.id BETWEEN :first_id AND :last_id
+                GROUP BY u2.id
+            ) totals
+            WHERE u.id = totals.id
+            AND u.total_score IS DISTINCT FROM totals.total_score
+        """)
+
+        raw_result = await self.connection.execute(recompute, {"first_id": first_id, "last_id": last_id})
+        return raw_result.rowcount
+
+    @db_error_handler
+    async def get_user_id_range(self) -> tuple[int, int] | None:
+        raw_result = await self.connection.execute(select(func.min(User.id), func.max(User.id)))
+        first_id, last_id = raw_result.one()
+        return (first_id, last_id) if first_id is not None else None
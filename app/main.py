@@ -1,19 +1,21 @@
 from pathlib import Path
 
 from asgi_correlation_id import CorrelationIdMiddleware
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.exceptions import HTTPException, RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from fastapi.openapi.docs import (
     get_redoc_html,
     get_swagger_ui_html,
     get_swagger_ui_oauth2_redirect_html,
 )
-from starlette.staticfiles import StaticFiles
+from starlette.status import HTTP_404_NOT_FOUND
 
 from app.api.v1 import api_router
 from app.core import settings
 from app.core.events import create_start_app_handler, create_stop_app_handler
+from app.core.metrics import metrics_access_allowed, render_metrics
 from app.utils import (
     AppExceptionCase,
     CustomizeLogger,
@@ -21,13 +23,17 @@ from app.utils import (
     http_exception_handler,
     request_validation_exception_handler,
 )
+from app.utils.compression import CompressionMiddleware, PrecompressedStaticFiles
+from app.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware
+from app.utils.responses import FastJSONResponse
+from app.utils.tracing import TracingMiddleware
 from logging import Logger
 
 config_path = Path(__file__).with_name("logging_conf.json")
 
 
 def create_app() -> FastAPI:
-    _app = FastAPI(**settings.fastapi_kwargs)
+    _app = FastAPI(**settings.fastapi_kwargs, default_response_class=FastJSONResponse)
 
     _app.add_middleware(
         CORSMiddleware,
@@ -37,10 +43,32 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if settings.tracing_enabled:
+        # Inside CorrelationIdMiddleware, so traces are tagged with the request's correlation id
+        _app.add_middleware(TracingMiddleware)
     _app.add_middleware(CorrelationIdMiddleware)
+    if settings.compression_enabled:
+        _app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            content_types=settings.compression_content_types,
+            gzip_level=settings.compression_gzip_level,
+            zstd_level=settings.compression_zstd_level,
+        )
+    if settings.metrics_enabled:
+        # Outermost, so the time spent compressing and in the other middleware is measured too
+        _app.add_middleware(MetricsMiddleware)
     _app.state.logger = CustomizeLogger.make_logger(config_path)
     _app.include_router(api_router, prefix=settings.api_v1_prefix)
-    _app.mount("/static", StaticFiles(directory="app/static"))
+    _app.mount(
+        "/static",
+        PrecompressedStaticFiles(
+            directory="app/static",
+            max_age=settings.static_max_age_seconds,
+            precompress=settings.static_precompress,
+            minimum_size=settings.compression_minimum_size,
+        ),
+    )
 
     @_app.get("/docs", include_in_schema=False)
     async def custom_swagger_ui_html():
@@ -64,6 +92,13 @@ def create_app() -> FastAPI:
             redoc_js_url=f"{settings.openapi_prefix}/static/redoc.standalone.js",
         )
 
+    if settings.metrics_enabled:
+        @_app.get("/metrics", include_in_schema=False)
+        async def metrics(request: Request):
+            if not metrics_access_allowed(request, settings):
+                raise HTTPException(status_code=HTTP_404_NOT_FOUND)
+            return Response(content=render_metrics(_app), media_type=METRICS_CONTENT_TYPE)
+
     @_app.exception_handler(HTTPException)
     async def custom_http_exception_handler(request, e):
         return await http_exception_handler(request, e)
@@ -1,3 +1,8 @@
 from .user import User
 from .tag import Tag
 from .quiz_tag import quiz_tags
+from .user_quiz_best import UserQuizBest
+from .score_rollup import QuizScoreRollup, UserScoreRollup
+from .generation_job import GenerationJobStatus, QuizGenerationJob
+from .generation_cache import QuizGenerationCacheEntry
+from .generation_pool import QuizPoolEntry
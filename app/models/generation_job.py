@@ -0,0 +1,55 @@
+"""Quiz Generation Job Model - AI quiz generation requests processed in the background"""
+
+from __future__ import annotations
+
+import enum
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Text, text
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.rwmodel import RWModel
+
+
+class GenerationJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class QuizGenerationJob(RWModel):
+    """
+    One POST /quizzes/generate request. A worker claims a pending job by setting it running with a lease;
+    a running job whose lease expired (its worker died or restarted) is claimed again until max attempts.
+    """
+    __tablename__: str = "quiz_generation_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    creator_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    status: Mapped[GenerationJobStatus] = mapped_column(
+        SQLEnum(GenerationJobStatus, name="generationjobstatus", values_callable=lambda x: [e.value for e in x]),
+        nullable=False,
+        server_default=text("'pending'"),
+    )
+    request: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    quiz_id: Mapped[int | None] = mapped_column(ForeignKey("quizzes.id", ondelete="SET NULL"), nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Claim order for workers; finished jobs are not indexed
+        Index(
+            "ix_quiz_generation_jobs_claim",
+            "status",
+            "created_at",
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
@@ -0,0 +1,31 @@
+"""Quiz Generation Pool Model - AI quizzes generated ahead of time for popular topics"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.rwmodel import RWModel
+
+
+class QuizPoolEntry(RWModel):
+    """
+    Generated quiz data waiting to answer a generation request for its topic (a normalized prompt).
+    Unlike generation cache entries, each one is handed out once and deleted when claimed.
+    """
+    __tablename__: str = "quiz_generation_pool"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    topic: Mapped[str] = mapped_column(Text, nullable=False)
+    model: Mapped[str] = mapped_column(String, nullable=False)
+    num_questions: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=text("now()"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_quiz_generation_pool_claim", "topic", "model", "num_questions", "created_at"),
+    )
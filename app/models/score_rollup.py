@@ -0,0 +1,63 @@
+"""Score Rollup Models - per-bucket leaderboard rollups for windowed (daily / weekly) leaderboards"""
+
+from __future__ import annotations
+
+import enum
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, text
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.rwmodel import RWModel
+
+
+class LeaderboardPeriod(str, enum.Enum):
+    DAY = "day"
+    WEEK = "week"
+
+
+def _period_column():
+    return mapped_column(
+        SQLEnum(LeaderboardPeriod, name="leaderboardperiod", values_callable=lambda x: [e.value for e in x]),
+        primary_key=True,
+    )
+
+
+class QuizScoreRollup(RWModel):
+    """Best attempt of a user on a quiz within one UTC day or ISO week (bucket_start is the day / the Monday)."""
+    __tablename__: str = "quiz_score_rollups"
+
+    quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    period: Mapped[LeaderboardPeriod] = _period_column()
+    bucket_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    best_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    best_attempt_id: Mapped[int] = mapped_column(ForeignKey("quiz_attempts.id", ondelete="CASCADE"), nullable=False)
+    best_finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_quiz_score_rollups_leaderboard",
+            "quiz_id",
+            "period",
+            "bucket_start",
+            text("best_score DESC"),
+            "best_finished_at",
+            "user_id",
+        ),
+    )
+
+
+class UserScoreRollup(RWModel):
+    """Sum of a user's best score per quiz within one UTC day or ISO week."""
+    __tablename__: str = "user_score_rollups"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    period: Mapped[LeaderboardPeriod] = _period_column()
+    bucket_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    total_score: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_score_rollups_leaderboard", "period", "bucket_start", text("total_score DESC"), "user_id"),
+    )
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 import enum
 
-from sqlalchemy import Integer, String, text
+from sqlalchemy import Index, Integer, String, text
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.core import security
@@ -19,6 +19,10 @@ class UserRole(str, enum.Enum):
 
 class User(RWModel, DateTimeModelMixin):
     __tablename__: str = "users"
+    __table_args__ = (
+        # Global leaderboard: keyset pagination over (total_score DESC, id ASC)
+        Index("ix_users_total_score_id", text("total_score DESC"), "id", postgresql_where=text("deleted_at IS NULL")),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer,
@@ -0,0 +1,29 @@
+"""User Quiz Best Model - one row per user and quiz summarising their finished attempts"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.rwmodel import RWModel
+
+
+class UserQuizBest(RWModel):
+    __tablename__: str = "user_quiz_best"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    best_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    best_attempt_id: Mapped[int] = mapped_column(ForeignKey("quiz_attempts.id", ondelete="CASCADE"), nullable=False)
+    best_finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    attempts_count: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+    last_finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Quiz leaderboard order: (best_score DESC, best_finished_at ASC, user_id ASC)
+        Index("ix_user_quiz_best_leaderboard", "quiz_id", text("best_score DESC"), "best_finished_at", "user_id"),
+        # Per-user dashboard, most recently played first
+        Index("ix_user_quiz_best_user_recent", "user_id", text("last_finished_at DESC")),
+    )
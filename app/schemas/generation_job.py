@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+from app.models.generation_job import GenerationJobStatus
+from app.schemas.message import ApiResponse
+
+
+class GenerationJobOutData(BaseModel):
+    model_config = ConfigDict(
+        from_attributes=True,
+    )
+
+    id: int
+    status: GenerationJobStatus
+    quiz_id: int | None = None
+    error: str | None = None
+    attempts: int = 0
+    created_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class GenerationJobResponse(ApiResponse):
+    message: str = "Quiz Generation Job API Response"
+    data: GenerationJobOutData | None = None
+    detail: dict[str, Any] | None = {"key": "val"}
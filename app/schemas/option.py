@@ -25,6 +25,11 @@ class OptionInCreate(BaseModel):
     is_correct: bool = False
 
 
+class OptionInQuestionUpdate(OptionInCreate):
+    # Options carrying an id are matched against the question's existing options; the rest are inserted.
+    id: int | None = None
+
+
 class OptionInUpdate(BaseModel):
     option_text: str | None = None
     is_correct: bool | None = None
@@ -4,7 +4,7 @@ from typing import Any, Literal
 from pydantic import BaseModel, ConfigDict
 
 from app.schemas.message import ApiResponse
-from app.schemas.option import OptionInCreate, OptionOutData
+from app.schemas.option import OptionInCreate, OptionInQuestionUpdate, OptionOutData
 
 
 class QuestionBase(BaseModel):
@@ -38,11 +38,17 @@ class QuestionInQuizCreate(BaseModel):
     options: list[OptionInCreate] = []
 
 
+class QuestionInQuizUpdate(QuestionInQuizCreate):
+    # Questions carrying an id are matched against the quiz's existing questions; the rest are inserted.
+    id: int | None = None
+    options: list[OptionInQuestionUpdate] = []
+
+
 class QuestionInUpdate(BaseModel):
     question_text: str | None = None
     question_type: Literal["single", "multiple", "text"] | None = None
     points: int | None = None
-    options: list[OptionInCreate] | None = None
+    options: list[OptionInQuestionUpdate] | None = None
 
 
 class QuestionFilters(BaseModel):
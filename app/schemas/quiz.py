@@ -1,12 +1,13 @@
+import enum
 from datetime import datetime
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict
 
 from app.schemas.message import ApiResponse
-from app.schemas.pagination import PaginationParams, PaginatedResponse
+from app.schemas.pagination import PaginatedResponse, PaginationParams
+from app.schemas.question import QuestionInQuizCreate, QuestionInQuizUpdate, QuestionOutData
 from app.schemas.tag import TagOutData
-from app.schemas.question import QuestionOutData, QuestionInQuizCreate
 
 
 class QuizBase(BaseModel):
@@ -38,7 +39,7 @@ class QuizInUpdate(BaseModel):
     description: str | None = None
     is_public: bool | None = None
     tag_names: list[str] | None = None
-    questions: list[QuestionInQuizCreate] | None = None
+    questions: list[QuestionInQuizUpdate] | None = None
 
 
 class QuizGenerateRequest(BaseModel):
@@ -46,6 +47,8 @@ class QuizGenerateRequest(BaseModel):
     num_questions: int = 5
     is_public: bool = True
     tag_names: list[str] = []
+    # Skip the generation cache and call the model even if this prompt was generated recently
+    force_fresh: bool = False
 
 
 class QuizFilters(PaginationParams):
@@ -53,6 +56,23 @@ class QuizFilters(PaginationParams):
     search: str | None = None
 
 
+QUIZ_SCALAR_FIELDS = ("id", "title", "description", "creator_id", "is_public", "created_at", "updated_at", "deleted_at")
+
+
+class QuizInclude(str, enum.Enum):
+    TAGS = "tags"
+    QUESTIONS = "questions"
+    OPTIONS = "options"
+
+
+class QuizFieldSelection(BaseModel):
+    """Sparse fieldset for quiz endpoints: the scalar fields to return and the related lists to embed."""
+    model_config = ConfigDict(frozen=True)
+
+    fields: tuple[str, ...] = QUIZ_SCALAR_FIELDS
+    include: tuple[QuizInclude, ...] = ()
+
+
 class QuizOutData(QuizBase):
     pass
 
@@ -73,6 +93,12 @@ class QuizDetailResponse(ApiResponse):
     detail: dict[str, Any] | None = {"key": "val"}
 
 
+class LeaderboardWindow(str, enum.Enum):
+    DAY = "day"
+    WEEK = "week"
+    ALL = "all"
+
+
 class LeaderboardEntry(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
@@ -81,6 +107,7 @@ class LeaderboardEntry(BaseModel):
     score: int
     attempt_number: int
     finished_at: datetime | None = None
+    rank: int | None = None
 
 
 class LeaderboardData(BaseModel):
@@ -88,6 +115,7 @@ class LeaderboardData(BaseModel):
     
     quiz_id: int
     quiz_title: str
+    window: LeaderboardWindow = LeaderboardWindow.ALL
     entries: list[LeaderboardEntry] = []
 
 
@@ -97,6 +125,20 @@ class LeaderboardResponse(ApiResponse):
     detail: dict[str, Any] | None = None
 
 
+class LeaderboardPositionData(BaseModel):
+    quiz_id: int
+    quiz_title: str
+    entry: LeaderboardEntry
+    above: list[LeaderboardEntry] = []
+    below: list[LeaderboardEntry] = []
+
+
+class LeaderboardPositionResponse(ApiResponse):
+    message: str = "Quiz Leaderboard Position Response"
+    data: LeaderboardPositionData | None = None
+    detail: dict[str, Any] | None = None
+
+
 class QuizPaginatedResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
@@ -185,4 +185,31 @@ class AttemptDetailResponse(ApiResponse):
     detail: dict[str, Any] | None = Field(
         None,
         description="Additional details about the response"
-    )
\ No newline at end of file
+    )
+
+class BestAttemptOutData(BaseModel):
+    """Per-quiz summary of a user's finished attempts"""
+    model_config = ConfigDict(from_attributes=True)
+
+    quiz_id: int = Field(..., description="ID of the quiz", example=1)
+    best_score: int = Field(..., description="Highest score reached on this quiz", example=85)
+    best_attempt_id: int = Field(..., description="ID of the attempt that reached best_score first", example=3)
+    best_finished_at: datetime = Field(..., description="When the best attempt was finished", example="2025-08-01T12:15:30Z")
+    attempts_count: int = Field(..., description="Number of finished attempts on this quiz", example=2)
+    last_finished_at: datetime = Field(..., description="When the latest attempt was finished", example="2025-08-02T09:40:00Z")
+
+
+class BestAttemptResponse(ApiResponse):
+    """API response for a user's best attempts per quiz"""
+    message: str = Field(
+        default="Best attempts retrieved successfully",
+        description="Response message describing the operation result"
+    )
+    data: list[BestAttemptOutData] = Field(
+        default_factory=list,
+        description="One entry per quiz the user has finished, most recently played first"
+    )
+    detail: dict[str, Any] | None = Field(
+        None,
+        description="Additional details about the response"
+    )
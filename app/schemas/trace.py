@@ -0,0 +1,68 @@
+from datetime import UTC, datetime
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+from app.schemas.message import ApiResponse
+from app.utils.tracing import Span
+
+
+class TraceFilters(BaseModel):
+    limit: int | None = 50
+    min_duration_ms: float | None = 0.0
+
+
+class SpanOutData(BaseModel):
+    model_config = ConfigDict(
+        from_attributes=True,
+    )
+
+    span_id: str
+    parent_id: str | None = None
+    name: str
+    kind: str
+    start_time: datetime
+    duration_ms: float
+    attributes: dict[str, Any] = {}
+    error: str | None = None
+
+    @classmethod
+    def from_span(cls, span: Span) -> "SpanOutData":
+        return cls(
+            span_id=span.span_id,
+            parent_id=span.parent_id,
+            name=span.name,
+            kind=span.kind,
+            start_time=datetime.fromtimestamp(span.start_ns / 1e9, tz=UTC),
+            duration_ms=span.duration_ms,
+            attributes=span.attributes,
+            error=span.error,
+        )
+
+
+class TraceOutData(BaseModel):
+    trace_id: str
+    name: str
+    correlation_id: str | None = None
+    start_time: datetime
+    duration_ms: float
+    spans: list[SpanOutData]
+
+    @classmethod
+    def from_spans(cls, spans: list[Span]) -> "TraceOutData":
+        """`spans` as exported, with the root last; listed in start order."""
+        root = spans[-1]
+        return cls(
+            trace_id=root.trace_id,
+            name=root.name,
+            correlation_id=root.attributes.get("correlation_id"),
+            start_time=datetime.fromtimestamp(root.start_ns / 1e9, tz=UTC),
+            duration_ms=root.duration_ms,
+            spans=[SpanOutData.from_span(span) for span in sorted(spans, key=lambda span: span.start_ns)],
+        )
+
+
+class TraceResponse(ApiResponse):
+    message: str = "Trace API Response"
+    data: list[TraceOutData] | None = None
+    detail: dict[str, Any] | None = {"key": "val"}
@@ -6,6 +6,7 @@ from pydantic import BaseModel, ConfigDict
 from app.core import security
 from app.models.user import UserRole
 from app.schemas.message import ApiResponse
+from app.schemas.quiz import LeaderboardWindow
 
 
 class UserBase(BaseModel):
@@ -59,6 +60,13 @@ class UsersFilters(BaseModel):
     limit: int | None = 100
 
 
+class UserLeaderboardFilters(BaseModel):
+    window: LeaderboardWindow = LeaderboardWindow.ALL
+    limit: int = 20
+    after_score: int | None = None
+    after_id: int | None = None
+
+
 class UserTokenData(BaseModel):
     access_token: str | None = None
     token_type: str | None = None
@@ -76,3 +84,24 @@ class UserResponse(ApiResponse):
     message: str = "User API Response"
     data: UserOutData | list[UserOutData] | UserAuthOutData
     detail: dict[str, Any] | None = {"key": "val"}
+
+
+class UserLeaderboardEntry(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: int
+    username: str
+    total_score: int
+
+
+class UserLeaderboardData(BaseModel):
+    window: LeaderboardWindow = LeaderboardWindow.ALL
+    entries: list[UserLeaderboardEntry] = []
+    next_after_score: int | None = None
+    next_after_id: int | None = None
+
+
+class UserLeaderboardResponse(ApiResponse):
+    message: str = "Global Leaderboard Response"
+    data: UserLeaderboardData | None = None
+    detail: dict[str, Any] | None = None
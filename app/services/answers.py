@@ -6,7 +6,6 @@ from starlette.status import (
 )
 
 from app.database.repositories.answers import AnswersRepository
-from app.database.repositories.options import OptionsRepository
 from app.database.repositories.questions import QuestionsRepository
 from app.database.repositories.quizzes import QuizzesRepository
 from app.models.user import User
@@ -20,10 +19,41 @@ from app.schemas.answer import (
 )
 from app.services.base import BaseService
 from app.utils import response_4xx, return_service
+from app.utils.answer_keys import AnswerKey, QuestionKey, answer_keys
 
 logger = logging.getLogger(__name__)
 
 
+async def get_answer_key(*, quiz_id: int, questions_repo: QuestionsRepository) -> AnswerKey:
+    """Get the quiz answer key from the worker cache, compiling it from the database on a miss."""
+    answer_key = answer_keys.get(quiz_id)
+    if answer_key is None:
+        answer_key = await compile_answer_key(quiz_id=quiz_id, questions_repo=questions_repo)
+
+    return answer_key
+
+
+async def compile_answer_key(*, quiz_id: int, questions_repo: QuestionsRepository) -> AnswerKey:
+    generation = answer_keys.generation
+    return answer_keys.store(quiz_id, await questions_repo.get_answer_key(quiz_id=quiz_id), generation)
+
+
+async def get_question_key(*, question_id: int, questions_repo: QuestionsRepository) -> QuestionKey | None:
+    quiz_id = answer_keys.quiz_id_for_question(question_id)
+    if quiz_id is not None:
+        return (await get_answer_key(quiz_id=quiz_id, questions_repo=questions_repo)).get(question_id)
+
+    quiz_id = await questions_repo.get_quiz_id_by_question_id(question_id=question_id)
+    if quiz_id is None:
+        return None
+
+    answer_key = await get_answer_key(quiz_id=quiz_id, questions_repo=questions_repo)
+    if question_id not in answer_key:
+        # The question was added on another worker after this one cached the key
+        answer_key = await compile_answer_key(quiz_id=quiz_id, questions_repo=questions_repo)
+    return answer_key.get(question_id)
+
+
 class AnswersService(BaseService):
     @return_service
     async def submit_answers_to_attempt(
@@ -33,13 +63,12 @@ class AnswersService(BaseService):
         answers: list[AnswerSubmit],
         answers_repo: AnswersRepository,
         questions_repo: QuestionsRepository,
-        options_repo: OptionsRepository,
 ):
         created_answers = []
 
         for answer_submit in answers:
-            question = await questions_repo.get_question_by_id(question_id=answer_submit.question_id)
-            if not question:
+            question_key = await get_question_key(question_id=answer_submit.question_id, questions_repo=questions_repo)
+            if not question_key:
                 return response_4xx(
                     status_code=HTTP_404_NOT_FOUND,
                     context={"reason": f"Question {answer_submit.question_id} not found"},
@@ -47,23 +76,16 @@ class AnswersService(BaseService):
 
             is_correct = None
 
-            if question.question_type in ["single", "multiple"]:
+            if question_key.question_type in ["single", "multiple"]:
                 if not answer_submit.selected_option_ids:
                     return response_4xx(
                         status_code=HTTP_400_BAD_REQUEST,
                         context={"reason": f"Selected options required for question {answer_submit.question_id}"},
                     )
 
-                question_options = await options_repo.get_options_by_question_id(question_id=answer_submit.question_id)
-                correct_option_ids = {opt.id for opt in question_options if opt.is_correct}
-                selected_option_ids = set(answer_submit.selected_option_ids)
-
-                if question.question_type == "single":
-                    is_correct = len(selected_option_ids) == 1 and selected_option_ids == correct_option_ids
-                else:  # multiple
-                    is_correct = selected_option_ids == correct_option_ids
+                is_correct = question_key.grade(answer_submit.selected_option_ids)
 
-            elif question.question_type == "text":
+            elif question_key.question_type == "text":
                 if not answer_submit.text_answer:
                     return response_4xx(
                         status_code=HTTP_400_BAD_REQUEST,
@@ -1,9 +1,23 @@
-import json
 import asyncio
-from typing import Dict, List, Any, Optional
+import hashlib
+import json
+import re
+import unicodedata
+from collections.abc import AsyncIterator, Sequence
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from time import monotonic
+from typing import Any, Dict, List, Optional
+
 from pydantic import BaseModel
 
-from app.core.config import get_app_settings
+from app.core import settings
+from app.core.settings.app import AppSettings
+from app.services.llm_providers import LLMProvider, create_llm_provider
+from app.utils.json_stream import JsonObjectStream
+from app.utils.metrics import registry
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, TokenBucket
 
 
 class QuestionData(BaseModel):
@@ -18,70 +32,218 @@ class QuizGenerationData(BaseModel):
     questions: List[QuestionData]
 
 
+@dataclass
+class GeminiStats:
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    waiting: int = 0
+    rate_limited_seconds: float = 0.0
+    call_seconds: float = 0.0
+
+
+gemini_stats = GeminiStats()
+
+gemini_call_duration = registry.histogram(
+    "gemini_call_duration_seconds",
+    "Duration of model calls (whole streams for streamed calls), excluding time waiting for a slot.",
+    ("outcome",),
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+
+# Opened by consecutive timeouts or API errors (not by unparsable answers); shared by every GeminiAIService
+gemini_circuit = CircuitBreaker(
+    "Gemini",
+    failure_threshold=settings.gemini_circuit_failure_threshold,
+    reset_timeout=settings.gemini_circuit_reset_seconds,
+)
+
+
+# Angles that parts of a large quiz are asked to focus on, so parallel calls do not write the same questions
+PART_ANGLES = (
+    "core concepts and definitions",
+    "practical usage and worked examples",
+    "common mistakes and misconceptions",
+    "advanced details and edge cases",
+    "comparisons, trade-offs and best practices",
+    "history, context and real-world applications",
+)
+
+
+def split_question_counts(num_questions: int, per_call: int) -> list[int]:
+    """Split a question count into as few calls of at most per_call questions as possible, sized evenly."""
+    if num_questions <= 0:
+        return []
+    calls = -(-num_questions // per_call)
+    return [num_questions // calls + (1 if i < num_questions % calls else 0) for i in range(calls)]
+
+
+def part_hints(parts: int, *, avoid: Sequence[str] = ()) -> list[str]:
+    """Extra prompt lines for each of `parts` parallel calls; `avoid` lists questions that already exist."""
+    avoid_hint = ""
+    if avoid:
+        avoid_hint = "Do not repeat or rephrase any of these existing questions: " + "; ".join(avoid)
+    if parts == 1:
+        return [avoid_hint]
+    return [
+        f"This is part {i + 1} of {parts} of a larger quiz; focus on {PART_ANGLES[i % len(PART_ANGLES)]}. {avoid_hint}".strip()
+        for i in range(parts)
+    ]
+
+
+def question_fingerprint(question_text: str) -> str:
+    """Hash of a question's case-folded words, ignoring punctuation and spacing."""
+    words = re.findall(r"\w+", unicodedata.normalize("NFKC", question_text).casefold())
+    return hashlib.sha1(" ".join(words).encode()).hexdigest()
+
+
+class GeneratedQuiz:
+    """Merges the parts of a generated quiz, keeping the first title and description and distinct questions."""
+
+    def __init__(self, num_questions: int) -> None:
+        self.num_questions = num_questions
+        self.title: str | None = None
+        self.description: str | None = None
+        self.questions: list[QuestionData] = []
+        self._fingerprints: set[str] = set()
+
+    def add_fields(self, *, title: str | None = None, description: str | None = None) -> None:
+        self.title = self.title or title
+        self.description = self.description or description
+
+    def add_question(self, question: QuestionData) -> bool:
+        """Keep the question unless it duplicates one already kept or the quiz is full."""
+        fingerprint = question_fingerprint(question.question_text)
+        if fingerprint in self._fingerprints or len(self.questions) >= self.num_questions:
+            return False
+        self._fingerprints.add(fingerprint)
+        self.questions.append(question)
+        return True
+
+    def question_texts(self) -> list[str]:
+        return [question.question_text for question in self.questions]
+
+    def result(self) -> QuizGenerationData:
+        return QuizGenerationData(title=self.title, description=self.description, questions=self.questions)
+
+
 class GeminiAIService:
-    def __init__(self):
+    """
+    Quiz generation client over the LLM provider selected by settings.llm_provider (see app.services.llm_providers);
+    use the process-wide instance from get_gemini_service().
+    At most gemini_max_concurrency calls run at once, spaced out by a token bucket for the API quota.
+    """
+
+    def __init__(self, settings: AppSettings, provider: LLMProvider | None = None):
+        self.provider = provider or create_llm_provider(settings)
+        self.timeout = settings.gemini_timeout_seconds
+        self.questions_per_call = settings.gemini_questions_per_call
+        self.concurrency = asyncio.Semaphore(settings.gemini_max_concurrency)
+        self.rate_limiter = TokenBucket(
+            rate=settings.gemini_requests_per_minute / 60,
+            capacity=settings.gemini_burst,
+        )
+
+    @asynccontextmanager
+    async def _call_slot(self) -> AsyncIterator[None]:
+        """Wait for a concurrency slot and a rate limit token, then run one call through the circuit breaker."""
+        gemini_stats.waiting += 1
         try:
-            import google.generativeai as genai
-            self.genai = genai
-        except ImportError:
-            raise ImportError("google-generativeai package is required. Install it with: poetry add google-generativeai")
-        
-        settings = get_app_settings()
-        self.genai.configure(api_key=settings.gemini_api_key.get_secret_value())
-        self.model = self.genai.GenerativeModel('gemini-1.5-flash')
-    
+            await self.concurrency.acquire()
+        finally:
+            gemini_stats.waiting -= 1
+
+        try:
+            gemini_stats.rate_limited_seconds += await self.rate_limiter.acquire()
+            # Checked after waiting so calls queued while the circuit opened fail fast too
+            try:
+                gemini_circuit.before_call()
+            except CircuitOpenError:
+                gemini_stats.rejected += 1
+                raise
+
+            gemini_stats.calls += 1
+            gemini_stats.in_flight += 1
+            started_at = monotonic()
+            outcome = "success"
+            try:
+                yield
+            except TimeoutError:
+                outcome = "timeout"
+                gemini_stats.timeouts += 1
+                gemini_circuit.record_failure()
+                raise
+            except Exception:
+                outcome = "failure"
+                gemini_stats.failures += 1
+                gemini_circuit.record_failure()
+                raise
+            except (asyncio.CancelledError, GeneratorExit):
+                # A client disconnecting, a sibling part failing or a shutdown cannot be judged either way, so
+                # this only frees a half-open trial and leaves the failure count alone
+                outcome = "cancelled"
+                gemini_circuit.record_abandoned()
+                raise
+            finally:
+                elapsed = monotonic() - started_at
+                gemini_stats.in_flight -= 1
+                gemini_stats.call_seconds += elapsed
+                gemini_call_duration.observe(elapsed, outcome)
+
+            gemini_stats.successes += 1
+            gemini_circuit.record_success()
+        finally:
+            self.concurrency.release()
+
+    def close(self) -> None:
+        self.provider.close()
+
     async def generate_quiz_from_prompt(self, prompt: str, num_questions: int = 5) -> QuizGenerationData:
         """
-        Generate a quiz based on the given prompt using Gemini AI
-        """
-        generation_prompt = f"""
-        Create a quiz about: {prompt}
-        
-        Generate exactly {num_questions} multiple choice questions.
-        
-        Return ONLY a valid JSON response in this exact format:
-        {{
-            "title": "Quiz Title",
-            "description": "Brief quiz description",
-            "questions": [
-                {{
-                    "question_text": "The question text",
-                    "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
-                    "correct_answer": 0
-                }}
-            ]
-        }}
-        
-        Requirements:
-        - Each question must have exactly 4 options
-        - correct_answer must be the index (0-3) of the correct option
-        - Make questions challenging but fair
-        - Ensure all JSON is properly formatted
-        - Do not include any text before or after the JSON
+        Generate a quiz based on the given prompt using the configured LLM provider.
+        Requests for more than gemini_questions_per_call questions are split into parallel calls (bounded by the
+        concurrency cap) that each cover a different angle of the topic, so no answer is long enough to be cut off.
+        Questions are merged and deduplicated; parts that failed or came back with duplicates are topped up once.
         """
-        
-        try:
-            # Configure generation with timeout
-            generation_config = self.genai.types.GenerationConfig(
-                temperature=0.7,
-                max_output_tokens=2048,
+        quiz = GeneratedQuiz(num_questions)
+        errors: list[Exception] = []
+        for top_up in (False, True):
+            sizes = split_question_counts(num_questions - len(quiz.questions), self.questions_per_call)
+            if not sizes:
+                break
+
+            hints = part_hints(len(sizes), avoid=quiz.question_texts() if top_up else ())
+            parts = await asyncio.gather(
+                *(self._generate_part(prompt, size, hint) for size, hint in zip(sizes, hints)),
+                return_exceptions=True,
             )
-            
-            # Run with asyncio timeout to handle hanging requests
-            async def generate_with_timeout():
-                return await asyncio.wait_for(
-                    asyncio.get_event_loop().run_in_executor(
-                        None,
-                        lambda: self.model.generate_content(
-                            generation_prompt,
-                            generation_config=generation_config
-                        )
-                    ),
-                    timeout=60.0  # 60 seconds timeout
+            for part in parts:
+                if isinstance(part, CircuitOpenError):
+                    raise part
+                if isinstance(part, Exception):
+                    errors.append(part)
+                    continue
+                quiz.add_fields(title=part.title, description=part.description)
+                for question in part.questions:
+                    quiz.add_question(question)
+
+        if len(quiz.questions) < num_questions:
+            if errors:
+                raise errors[0]
+            raise ValueError(f"Failed to generate quiz: only {len(quiz.questions)} of {num_questions} questions were distinct")
+        return quiz.result()
+
+    async def _generate_part(self, prompt: str, num_questions: int, hint: str = "") -> QuizGenerationData:
+        try:
+            async with self._call_slot():
+                response_text = await asyncio.wait_for(
+                    self.provider.generate(prompt, num_questions, hint),
+                    timeout=self.timeout,
                 )
-            
-            response = await generate_with_timeout()
-            response_text = response.text.strip()
+            response_text = response_text.strip()
             
             # Remove any markdown formatting if present
             if response_text.startswith('```json'):
@@ -97,16 +259,111 @@ class GeminiAIService:
             # Validate and return the data
             return QuizGenerationData(**quiz_data)
             
-        except asyncio.TimeoutError:
-            raise ValueError("Quiz generation request timed out after 60 seconds. Please try again.")
+        except CircuitOpenError:
+            raise
+        except TimeoutError:
+            raise ValueError(f"Quiz generation request timed out after {self.timeout:.0f} seconds. Please try again.")
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse AI response as JSON: {e}")
         except Exception as e:
             raise ValueError(f"Failed to generate quiz: {e}")
     
+    async def stream_quiz(self, prompt: str, num_questions: int = 5) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Like generate_quiz_from_prompt, but yield ("title", str), ("description", str) and ("question", QuestionData)
+        as soon as any of the parallel parts has written them. Parts are streamed and parsed incrementally.
+        """
+        quiz = GeneratedQuiz(num_questions)
+        errors: list[Exception] = []
+        for top_up in (False, True):
+            sizes = split_question_counts(num_questions - len(quiz.questions), self.questions_per_call)
+            if not sizes:
+                break
+
+            hints = part_hints(len(sizes), avoid=quiz.question_texts() if top_up else ())
+            async with aclosing(self._stream_parts(prompt, sizes, hints)) as events:
+                async for kind, name, value in events:
+                    if kind == "error":
+                        errors.append(value)
+                    elif kind == "value" and name in ("title", "description") and getattr(quiz, name) is None:
+                        quiz.add_fields(**{name: value})
+                        yield name, value
+                    elif kind == "item" and name == "questions":
+                        try:
+                            question = QuestionData.model_validate(value)
+                        except ValueError:
+                            continue
+                        if quiz.add_question(question):
+                            yield "question", question
+
+        if len(quiz.questions) < num_questions:
+            if errors:
+                raise errors[0]
+            raise ValueError(f"Failed to generate quiz: only {len(quiz.questions)} of {num_questions} questions were distinct")
+
+    async def _stream_parts(self, prompt: str, sizes: list[int], hints: list[str]) -> AsyncIterator[tuple[str, str | None, Any]]:
+        """Parse parts streamed concurrently; yields JsonObjectStream events, and ("error", None, exception) per failed part."""
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def stream_part(size: int, hint: str) -> None:
+            document = JsonObjectStream()
+            try:
+                async with aclosing(self.stream_quiz_text(prompt, size, hint)) as texts:
+                    async for text in texts:
+                        for event in document.feed(text):
+                            events.put_nowait(event)
+            except Exception as e:
+                events.put_nowait(("error", None, e))
+            finally:
+                events.put_nowait(None)
+
+        tasks = [asyncio.create_task(stream_part(size, hint)) for size, hint in zip(sizes, hints)]
+        try:
+            running = len(tasks)
+            while running:
+                event = await events.get()
+                if event is None:
+                    running -= 1
+                elif event[0] == "error" and isinstance(event[2], CircuitOpenError):
+                    raise event[2]
+                else:
+                    yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stream_quiz_text(self, prompt: str, num_questions: int = 5, hint: str = "") -> AsyncIterator[str]:
+        """
+        Yield the model's answer (the JSON document generate_quiz_from_prompt parses) piece by piece as it is generated.
+        The whole stream counts as one call for the concurrency cap, rate limit and circuit breaker.
+        """
+        try:
+            async with self._call_slot(), aclosing(self.provider.stream(prompt, num_questions, hint)) as texts:
+                while True:
+                    try:
+                        text = await asyncio.wait_for(anext(texts), timeout=self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    yield text
+        except TimeoutError:
+            raise ValueError(f"Quiz generation stalled for {self.timeout:.0f} seconds. Please try again.")
+
     async def generate_quiz_questions_only(self, topic: str, num_questions: int = 5) -> List[QuestionData]:
         """
         Generate only questions for an existing quiz topic
         """
         quiz_data = await self.generate_quiz_from_prompt(topic, num_questions)
-        return quiz_data.questions
\ No newline at end of file
+        return quiz_data.questions
+
+
+@lru_cache
+def get_gemini_service() -> GeminiAIService:
+    """The process-wide generation client, created on first use."""
+    return GeminiAIService(settings)
+
+
+def close_gemini_service() -> None:
+    if get_gemini_service.cache_info().currsize:
+        get_gemini_service().close()
+        get_gemini_service.cache_clear()
@@ -0,0 +1,187 @@
+"""
+Language model backends for quiz generation.
+
+A provider turns a topic, a question count and an optional hint into the model's answer: the quiz as a JSON document
+(see GeminiAIService for the format), either whole (`generate`) or piece by piece as it is written (`stream`).
+Chunking, parsing, the concurrency cap, rate limiting, timeouts and the circuit breaker all live in GeminiAIService,
+so they are exercised the same way whichever provider `settings.llm_provider` selects:
+
+- "gemini": Google Gemini through google-generativeai;
+- "fake": deterministic quizzes generated locally with configurable latency and error injection, for load tests
+  and benchmarks that must not depend on the network or an API key.
+"""
+import asyncio
+import hashlib
+import json
+import random
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+from app.core.settings.app import AppSettings
+
+
+def quiz_prompt(prompt: str, num_questions: int, hint: str = "") -> str:
+    return f"""
+        Create a quiz about: {prompt}
+
+        Generate exactly {num_questions} multiple choice questions.
+        {hint}
+
+        Return ONLY a valid JSON response in this exact format:
+        {{
+            "title": "Quiz Title",
+            "description": "Brief quiz description",
+            "questions": [
+                {{
+                    "question_text": "The question text",
+                    "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
+                    "correct_answer": 0
+                }}
+            ]
+        }}
+
+        Requirements:
+        - Each question must have exactly 4 options
+        - correct_answer must be the index (0-3) of the correct option
+        - Make questions challenging but fair
+        - Ensure all JSON is properly formatted
+        - Do not include any text before or after the JSON
+        """
+
+
+class LLMProvider(ABC):
+    """Base class for providers; `model_name` identifies the model in the generation cache."""
+
+    model_name: str
+
+    @abstractmethod
+    async def generate(self, prompt: str, num_questions: int, hint: str = "") -> str:
+        ...
+
+    @abstractmethod
+    def stream(self, prompt: str, num_questions: int, hint: str = "") -> AsyncIterator[str]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class GeminiProvider(LLMProvider):
+    """Blocking SDK calls run on a dedicated thread pool so a slow API never starves the loop's default executor."""
+
+    def __init__(self, settings: AppSettings):
+        try:
+            import google.generativeai as genai
+            self.genai = genai
+        except ImportError:
+            raise ImportError("google-generativeai package is required. Install it with: poetry add google-generativeai")
+        if settings.gemini_api_key is None:
+            raise ValueError("GEMINI_API_KEY must be set to generate quizzes with Gemini (or set LLM_PROVIDER=fake)")
+
+        self.genai.configure(api_key=settings.gemini_api_key.get_secret_value())
+        self.model_name = settings.gemini_model
+        self.model = self.genai.GenerativeModel(settings.gemini_model)
+        self.max_output_tokens = settings.gemini_max_output_tokens
+        # Threads of timed-out calls keep running until the SDK returns, so the pool is larger than the concurrency cap
+        self.executor = ThreadPoolExecutor(max_workers=settings.gemini_executor_workers, thread_name_prefix="gemini")
+
+    async def _run_blocking(self, func, *args, **kwargs) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    def _generation_config(self):
+        return self.genai.types.GenerationConfig(
+            temperature=0.7,
+            max_output_tokens=self.max_output_tokens,
+        )
+
+    async def generate(self, prompt: str, num_questions: int, hint: str = "") -> str:
+        response = await self._run_blocking(
+            self.model.generate_content,
+            quiz_prompt(prompt, num_questions, hint),
+            generation_config=self._generation_config(),
+        )
+        return response.text
+
+    async def stream(self, prompt: str, num_questions: int, hint: str = "") -> AsyncIterator[str]:
+        response = await self._run_blocking(
+            self.model.generate_content,
+            quiz_prompt(prompt, num_questions, hint),
+            generation_config=self._generation_config(),
+            stream=True,
+        )
+        chunks = iter(response)
+        while (chunk := await self._run_blocking(next, chunks, None)) is not None:
+            yield chunk.text
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class FakeLLMProvider(LLMProvider):
+    """
+    Answers depend only on the topic, question count and hint, so parts of a chunked quiz and repeated runs agree.
+    Every call takes fake_llm_latency_seconds (spread over the chunks when streamed) and fails with probability
+    fake_llm_error_rate, drawn from a generator seeded with fake_llm_seed; streams fail part-way through.
+    """
+
+    model_name = "fake"
+    chunk_size = 64
+
+    def __init__(self, settings: AppSettings):
+        self.latency = settings.fake_llm_latency_seconds
+        self.error_rate = settings.fake_llm_error_rate
+        self.random = random.Random(settings.fake_llm_seed)
+
+    @staticmethod
+    def answer(prompt: str, num_questions: int, hint: str = "") -> str:
+        digest = hashlib.sha256(f"{prompt}\n{num_questions}\n{hint}".encode()).hexdigest()
+        questions = [
+            {
+                "question_text": f"Question {digest[:8]}-{i + 1} about {prompt}?",
+                "options": [f"Answer {option + 1}" for option in range(4)],
+                "correct_answer": (int(digest[:8], 16) + i) % 4,
+            }
+            for i in range(num_questions)
+        ]
+        return json.dumps({
+            "title": f"Quiz about {prompt}",
+            "description": f"{num_questions} generated questions about {prompt}.",
+            "questions": questions,
+        })
+
+    def _fails(self) -> bool:
+        return self.random.random() < self.error_rate
+
+    async def generate(self, prompt: str, num_questions: int, hint: str = "") -> str:
+        await asyncio.sleep(self.latency)
+        if self._fails():
+            raise ConnectionError("Injected fake LLM failure")
+        return self.answer(prompt, num_questions, hint)
+
+    async def stream(self, prompt: str, num_questions: int, hint: str = "") -> AsyncIterator[str]:
+        text = self.answer(prompt, num_questions, hint)
+        chunks = [text[start:start + self.chunk_size] for start in range(0, len(text), self.chunk_size)]
+        fail_at = self.random.randrange(len(chunks)) if self._fails() else None
+        for index, chunk in enumerate(chunks):
+            await asyncio.sleep(self.latency / len(chunks))
+            if index == fail_at:
+                raise ConnectionError("Injected fake LLM failure")
+            yield chunk
+
+
+LLM_PROVIDERS: dict[str, type[LLMProvider]] = {
+    "gemini": GeminiProvider,
+    "fake": FakeLLMProvider,
+}
+
+
+def llm_model_name(settings: AppSettings) -> str:
+    """Model name of the configured provider, without creating it."""
+    return FakeLLMProvider.model_name if settings.llm_provider == "fake" else settings.gemini_model
+
+
+def create_llm_provider(settings: AppSettings) -> LLMProvider:
+    return LLM_PROVIDERS[settings.llm_provider](settings)
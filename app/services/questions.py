@@ -1,12 +1,14 @@
 import logging
+from collections import Counter
 
 from starlette.status import (
+    HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND,
 )
 
 from app.database.repositories.options import OptionsRepository
 from app.database.repositories.questions import QuestionsRepository
-from app.database.repositories.quizzes import QuizzesRepository
+from app.database.repositories.quizzes import QUIZ_DETAIL_CACHE, QuizzesRepository
 from app.schemas.question import (
     QuestionFilters,
     QuestionInCreate,
@@ -16,10 +18,19 @@ from app.schemas.question import (
 )
 from app.services.base import BaseService
 from app.utils import response_4xx, return_service
+from app.utils.answer_keys import answer_keys
+from app.utils.projection import validate_rows
+from app.utils.swr_cache import invalidate_swr_cache
 
 logger = logging.getLogger(__name__)
 
 
+def invalid_item_ids(existing_ids: set[int], items_in: list) -> list[int]:
+    """Ids in items_in that don't match an existing row or appear more than once."""
+    counts = Counter(item_in.id for item_in in items_in if item_in.id is not None)
+    return sorted(item_id for item_id, count in counts.items() if item_id not in existing_ids or count > 1)
+
+
 class QuestionsService(BaseService):
     @return_service
     async def create_question(
@@ -42,6 +53,8 @@ class QuestionsService(BaseService):
             await options_repo.create_options_for_question(options_in=question_in.options, question_id=created_question.id)
 
         await questions_repo.connection.commit()
+        answer_keys.invalidate(question_in.quiz_id)
+        invalidate_swr_cache(QUIZ_DETAIL_CACHE)
         question_with_options = await questions_repo.get_question_by_id(question_id=created_question.id)
 
         return QuestionResponse(
@@ -82,11 +95,11 @@ class QuestionsService(BaseService):
                 context={"reason": "Quiz not found"},
             )
 
-        questions = await questions_repo.get_questions_by_quiz_id(quiz_id=quiz_id, skip=question_filters.skip, limit=question_filters.limit)
+        questions = await questions_repo.get_questions_by_quiz_id(quiz_id=quiz_id, skip=question_filters.skip, limit=question_filters.limit, projection=True)
 
         return QuestionResponse(
             message="Questions retrieved successfully.",
-            data=[QuestionOutData.model_validate(question) for question in questions],
+            data=validate_rows(QuestionOutData, questions),
         )
 
     @return_service
@@ -95,11 +108,11 @@ class QuestionsService(BaseService):
         question_filters: QuestionFilters,
         questions_repo: QuestionsRepository,
     ):
-        questions = await questions_repo.get_all_questions(skip=question_filters.skip, limit=question_filters.limit)
+        questions = await questions_repo.get_all_questions(skip=question_filters.skip, limit=question_filters.limit, projection=True)
 
         return QuestionResponse(
             message="Questions retrieved successfully.",
-            data=[QuestionOutData.model_validate(question) for question in questions],
+            data=validate_rows(QuestionOutData, questions),
         )
 
     @return_service
@@ -117,14 +130,24 @@ class QuestionsService(BaseService):
                 context={"reason": "Question not found"},
             )
 
+        existing_options = list(question.options)
+        if question_in.options is not None:
+            invalid_ids = invalid_item_ids({option.id for option in existing_options}, question_in.options)
+            if invalid_ids:
+                return response_4xx(
+                    status_code=HTTP_400_BAD_REQUEST,
+                    context={"reason": f"Options {invalid_ids} do not belong to question {question_id}"},
+                )
+
         await questions_repo.update_question(question=question, question_in=question_in)
 
         if question_in.options is not None:
-            await options_repo.delete_options_by_question_id(question_id=question_id)
-            if question_in.options:
-                await options_repo.create_options_for_question(options_in=question_in.options, question_id=question_id)
+            await options_repo.sync_options(existing={question_id: existing_options}, options_in={question_id: question_in.options})
+            await questions_repo.connection.commit()
 
-        question_with_options = await questions_repo.get_question_by_id(question_id=question_id)
+        answer_keys.invalidate(question.quiz_id)
+        invalidate_swr_cache(QUIZ_DETAIL_CACHE)
+        question_with_options = await questions_repo.get_question_by_id(question_id=question_id, refresh=True)
 
         return QuestionResponse(
             message="Question updated successfully.",
@@ -145,6 +168,8 @@ class QuestionsService(BaseService):
             )
 
         await questions_repo.delete_question(question=question)
+        answer_keys.invalidate(question.quiz_id)
+        invalidate_swr_cache(QUIZ_DETAIL_CACHE)
 
         return QuestionResponse(
             message="Question deleted successfully.",
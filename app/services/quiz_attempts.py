@@ -1,17 +1,26 @@
 import logging
+from collections.abc import AsyncIterator
 
+import anyio
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
 
+from app.core import settings
 from app.database.repositories.answers import AnswersRepository
 from app.database.repositories.questions import QuestionsRepository
-from app.database.repositories.quiz_attempts import QuizAttemptsRepository
+from app.database.repositories.quiz_attempts import QUIZ_RESULT_EXPORT_COLUMNS, QuizAttemptsRepository
 from app.database.repositories.quizzes import QuizzesRepository
+from app.database.repositories.score_rollups import ScoreRollupsRepository
 from app.models.user import User
 from app.schemas.answer import AnswerOutData, QuizResult, QuizResultResponse
-from app.schemas.quiz_attempt import AttemptOutData, AttemptResponse, AttemptDetailData, AttemptDetailResponse
 from app.schemas.question import QuestionOutData
+from app.schemas.quiz_attempt import AttemptDetailData, AttemptDetailResponse, AttemptOutData, AttemptResponse, BestAttemptOutData, BestAttemptResponse
+from app.services.answers import get_answer_key
 from app.services.base import BaseService
 from app.utils import response_4xx, return_service
+from app.utils.export import ExportFormat, encode_export
+from app.utils.leaderboard_cache import LeaderboardCacheEntry, quiz_leaderboards
+from app.utils.projection import construct_rows
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +74,7 @@ class QuizAttemptsService(BaseService):
         attempts_repo: QuizAttemptsRepository,
         questions_repo: QuestionsRepository,
         answers_repo: AnswersRepository,
+        rollups_repo: ScoreRollupsRepository,
     ):
         """Submit/finish a quiz attempt and calculate score"""
 
@@ -90,10 +100,10 @@ class QuizAttemptsService(BaseService):
                 context={"reason": "This attempt has already been submitted"},
             )
 
-        # Get all questions for this quiz
-        quiz_questions = await questions_repo.get_questions_by_quiz_id(quiz_id=attempt.quiz_id)
-        total_questions = len(quiz_questions)
-        total_points = sum(q.points for q in quiz_questions)
+        # Points per question come from the cached answer key
+        answer_key = await get_answer_key(quiz_id=attempt.quiz_id, questions_repo=questions_repo)
+        total_questions = len(answer_key)
+        total_points = sum(question_key.points for question_key in answer_key.values())
 
         # Get all answers for this attempt
         answers = await answers_repo.get_answers_by_attempt(attempt_id=attempt_id)
@@ -101,14 +111,32 @@ class QuizAttemptsService(BaseService):
         # Calculate score
         correct_answers = sum(1 for answer in answers if answer.is_correct)
         earned_points = sum(
-            next((q.points for q in quiz_questions if q.id == answer.question_id), 0)
-            for answer in answers if answer.is_correct
+            answer_key[answer.question_id].points
+            for answer in answers if answer.is_correct and answer.question_id in answer_key
         )
 
-        # Finish the attempt
-        await attempts_repo.finish_attempt(attempt=attempt, score=earned_points)
+        # Finish the attempt and credit the user's total score in the same transaction
+        finished_attempt = await attempts_repo.finish_attempt(attempt=attempt, score=earned_points)
+        if finished_attempt is None:
+            await attempts_repo.connection.rollback()
+            return response_4xx(
+                status_code=HTTP_400_BAD_REQUEST,
+                context={"reason": "This attempt has already been submitted"},
+            )
+        await rollups_repo.record_finished_attempt(attempt=finished_attempt)
         await attempts_repo.connection.commit()
 
+        quiz_leaderboards.record(
+            finished_attempt.quiz_id,
+            LeaderboardCacheEntry(
+                user_id=user.id,
+                username=user.username,
+                score=earned_points,
+                attempt_no=finished_attempt.attempt_no,
+                finished_at=finished_attempt.finished_at,
+            ),
+        )
+
         # Prepare quiz result
         quiz_result = QuizResult(
             attempt_id=attempt.id,
@@ -157,12 +185,12 @@ class QuizAttemptsService(BaseService):
         """Get all attempts by user for a specific quiz"""
 
         attempts = await attempts_repo.get_user_attempts_for_quiz(
-            user_id=user.id, quiz_id=quiz_id
+            user_id=user.id, quiz_id=quiz_id, projection=True
         )
 
         return AttemptResponse(
             message="User attempts retrieved successfully",
-            data=[AttemptOutData.model_validate(attempt) for attempt in attempts],
+            data=construct_rows(AttemptOutData, attempts),
         )
 
 
@@ -174,11 +202,26 @@ class QuizAttemptsService(BaseService):
     ):
         """Get all attempts by user across all quizzes"""
 
-        attempts = await attempts_repo.get_user_attempts(user_id=user.id)
+        attempts = await attempts_repo.get_user_attempts(user_id=user.id, projection=True)
 
         return AttemptResponse(
             message="User attempts retrieved successfully",
-            data=[AttemptOutData.model_validate(attempt) for attempt in attempts],
+            data=construct_rows(AttemptOutData, attempts),
+        )
+
+    @return_service
+    async def get_user_best_attempts(
+        self,
+        user: User,
+        attempts_repo: QuizAttemptsRepository,
+    ):
+        """Get the user's best attempt summary for every quiz they have finished"""
+
+        best_attempts = await attempts_repo.get_user_best_attempts(user_id=user.id)
+
+        return BestAttemptResponse(
+            message="Best attempts retrieved successfully",
+            data=[BestAttemptOutData.model_validate(best_attempt) for best_attempt in best_attempts],
         )
 
     @return_service
@@ -201,7 +244,7 @@ class QuizAttemptsService(BaseService):
 
         # Get all questions for this quiz with their options
         quiz_questions = await questions_repo.get_questions_by_quiz_id(quiz_id=attempt.quiz_id)
-        
+
         # Get all user answers for this attempt
         user_answers = await answers_repo.get_answers_by_attempt(attempt_id=attempt_id)
 
@@ -220,6 +263,38 @@ class QuizAttemptsService(BaseService):
             message="Attempt details retrieved successfully",
             data=attempt_detail,
         )
-    
 
-    
\ No newline at end of file
+
+
+
+    @return_service
+    async def export_quiz_results(
+        self,
+        quiz_id: int,
+        export_format: ExportFormat,
+        quizzes_repo: QuizzesRepository,
+    ):
+        """Check the quiz exists and return an iterator of encoded export chunks for a StreamingResponse"""
+
+        quiz = await quizzes_repo.get_quiz_by_id(quiz_id=quiz_id)
+        if not quiz:
+            return response_4xx(
+                status_code=HTTP_404_NOT_FOUND,
+                context={"reason": "Quiz not found"},
+            )
+
+        # The request's session is closed before the body streams, so the export reads on its own session
+        return self._stream_quiz_results(bind=self.db.bind, quiz_id=quiz_id, export_format=export_format)
+
+    @staticmethod
+    async def _stream_quiz_results(*, bind, quiz_id: int, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        session = AsyncSession(bind=bind)
+        try:
+            batches = QuizAttemptsRepository(session).stream_quiz_results(quiz_id=quiz_id, batch_size=settings.export_batch_size)
+            columns = [column.key for column in QUIZ_RESULT_EXPORT_COLUMNS]
+            async for chunk in encode_export(batches, export_format, columns):
+                yield chunk
+        finally:
+            # A client disconnect cancels the stream; closing must still release the cursor and connection
+            with anyio.CancelScope(shield=True):
+                await session.close()
@@ -0,0 +1,381 @@
+import hashlib
+import logging
+import re
+import unicodedata
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from dataclasses import dataclass
+from itertools import chain, zip_longest
+
+import anyio
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.status import HTTP_404_NOT_FOUND
+
+from app.core import settings
+from app.database.repositories.generation_cache import GenerationCacheRepository
+from app.database.repositories.generation_jobs import GenerationJobsRepository
+from app.database.repositories.generation_pool import GenerationPoolRepository
+from app.database.repositories.options import OptionsRepository
+from app.database.repositories.questions import QuestionsRepository
+from app.database.repositories.quizzes import QUIZ_COUNTS_CACHE, QUIZ_DETAIL_CACHE, QuizzesRepository
+from app.database.repositories.tags import TagsRepository
+from app.database.repositories.users import UsersRepository
+from app.models.generation_job import QuizGenerationJob
+from app.models.user import User
+from app.schemas.generation_job import GenerationJobOutData, GenerationJobResponse
+from app.schemas.option import OptionInCreate
+from app.schemas.question import QuestionInQuizCreate
+from app.schemas.quiz import QuizGenerateRequest, QuizInCreate, QuizOutData
+from app.services.base import BaseService
+from app.services.gemini_ai import QuizGenerationData, get_gemini_service
+from app.services.llm_providers import llm_model_name
+from app.services.quizzes import QuizzesService
+from app.utils import response_4xx, return_service
+from app.utils.popularity import search_terms
+from app.utils.resilience import CircuitOpenError
+from app.utils.response_cache import listing_responses
+from app.utils.sse import encode_event
+from app.utils.swr_cache import invalidate_swr_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LookupStats:
+    hits: int = 0
+    misses: int = 0
+
+
+# Lookups of the generation cache (unless force_fresh) and of the pre-generated pool (when enabled)
+generation_cache_stats = LookupStats()
+generation_pool_stats = LookupStats()
+
+# "10 questions" in a prompt is redundant with num_questions, which is keyed on its own
+_QUESTION_COUNT = re.compile(r"\b\d+\s+questions?\b")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Prompt as compared by the generation cache: case-folded, single-spaced, without question counts or end punctuation."""
+    prompt = _QUESTION_COUNT.sub(" ", unicodedata.normalize("NFKC", prompt).casefold())
+    return " ".join(prompt.split()).strip(" .,;:!?")
+
+
+def generation_cache_key(prompt: str, num_questions: int, model: str) -> str:
+    return hashlib.sha256(f"{model}\n{num_questions}\n{normalize_prompt(prompt)}".encode()).hexdigest()
+
+
+def quiz_in_from_generation(generated: QuizGenerationData, request: QuizGenerateRequest) -> QuizInCreate:
+    """Turn generated quiz data into a quiz with single-choice questions."""
+    questions = [
+        QuestionInQuizCreate(
+            question_text=question_data.question_text,
+            question_type="single",
+            options=[
+                OptionInCreate(option_text=option_text, is_correct=(i == question_data.correct_answer))
+                for i, option_text in enumerate(question_data.options)
+            ],
+        )
+        for question_data in generated.questions
+    ]
+
+    return QuizInCreate(
+        title=generated.title,
+        description=generated.description,
+        is_public=request.is_public,
+        tag_names=request.tag_names,
+        questions=questions,
+    )
+
+
+class QuizGenerationService(BaseService):
+    @return_service
+    async def submit_generation(
+        self,
+        creator: User,
+        request: QuizGenerateRequest,
+        jobs_repo: GenerationJobsRepository,
+    ):
+        """Queue a generation job, or finish it right away when the pool or the generation cache has the quiz."""
+        generated = await self.ready_quiz_data(request=request)
+        if generated is not None:
+            quiz = await self.create_generated_quiz(creator=creator, request=request, generated=generated)
+            job = await jobs_repo.create_job(creator_id=creator.id, request=request.model_dump(), quiz_id=quiz.id)
+            return GenerationJobResponse(
+                message="Quiz generation succeeded.",
+                data=GenerationJobOutData.model_validate(job),
+            )
+
+        job = await jobs_repo.create_job(creator_id=creator.id, request=request.model_dump())
+
+        return GenerationJobResponse(
+            message="Quiz generation queued.",
+            data=GenerationJobOutData.model_validate(job),
+        )
+
+    @return_service
+    async def get_generation_job(
+        self,
+        job_id: int,
+        user: User,
+        jobs_repo: GenerationJobsRepository,
+    ):
+        job = await jobs_repo.get_job(job_id=job_id)
+        if not job or job.creator_id != user.id:
+            return response_4xx(
+                status_code=HTTP_404_NOT_FOUND,
+                context={"reason": f"Generation job {job_id} not found"},
+            )
+
+        return GenerationJobResponse(
+            message=f"Quiz generation {job.status.value}.",
+            data=GenerationJobOutData.model_validate(job),
+        )
+
+    async def cached_quiz_data(self, *, request: QuizGenerateRequest) -> QuizGenerationData | None:
+        """Quiz data generated for the same prompt within the cache TTL, unless force_fresh is set."""
+        if request.force_fresh:
+            return None
+
+        data = await GenerationCacheRepository(self.db).get_fresh_data(
+            key=generation_cache_key(request.prompt, request.num_questions, llm_model_name(settings)),
+            ttl_seconds=settings.generation_cache_ttl_seconds,
+        )
+        if data is None:
+            generation_cache_stats.misses += 1
+            return None
+
+        generation_cache_stats.hits += 1
+        return QuizGenerationData.model_validate(data)
+
+    async def cache_quiz_data(self, *, request: QuizGenerateRequest, generated: QuizGenerationData) -> None:
+        await GenerationCacheRepository(self.db).store_data(
+            key=generation_cache_key(request.prompt, request.num_questions, llm_model_name(settings)),
+            model=llm_model_name(settings),
+            prompt=normalize_prompt(request.prompt),
+            num_questions=request.num_questions,
+            data=generated.model_dump(),
+        )
+
+    async def pooled_quiz_data(self, *, request: QuizGenerateRequest) -> QuizGenerationData | None:
+        """A quiz generated ahead of time for the prompt's topic, claimed so that no other request gets it."""
+        if not settings.generation_pool_enabled:
+            return None
+
+        data = await GenerationPoolRepository(self.db).claim_data(
+            topic=normalize_prompt(request.prompt),
+            model=llm_model_name(settings),
+            num_questions=request.num_questions,
+        )
+        if data is None:
+            generation_pool_stats.misses += 1
+            return None
+
+        generation_pool_stats.hits += 1
+        generated = QuizGenerationData.model_validate(data)
+        return generated.model_copy(update={"questions": generated.questions[:request.num_questions]})
+
+    async def ready_quiz_data(self, *, request: QuizGenerateRequest) -> QuizGenerationData | None:
+        """
+        Quiz data available without calling the model. The pool comes first: its quizzes were never handed out,
+        so they also answer force_fresh requests and do not repeat a cached quiz for the same topic.
+        """
+        return await self.pooled_quiz_data(request=request) or await self.cached_quiz_data(request=request)
+
+    async def generate_quiz_data(self, *, request: QuizGenerateRequest) -> QuizGenerationData:
+        """Quiz data for a request, from the pool or the generation cache if they have it, else from the model."""
+        generated = await self.ready_quiz_data(request=request)
+        if generated is None:
+            generated = await get_gemini_service().generate_quiz_from_prompt(
+                prompt=request.prompt,
+                num_questions=request.num_questions,
+            )
+            await self.cache_quiz_data(request=request, generated=generated)
+
+        return generated
+
+    async def create_generated_quiz(self, *, creator: User, request: QuizGenerateRequest, generated: QuizGenerationData) -> QuizOutData:
+        result = await QuizzesService(self.db).create_quiz(
+            creator=creator,
+            quiz_in=quiz_in_from_generation(generated, request),
+            quizzes_repo=QuizzesRepository(self.db),
+            tags_repo=TagsRepository(self.db),
+            questions_repo=QuestionsRepository(self.db),
+            options_repo=OptionsRepository(self.db),
+        )
+        return (await result.unwrap()).data
+
+    @return_service
+    async def stream_generation(
+        self,
+        creator: User,
+        request: QuizGenerateRequest,
+    ):
+        """Return an iterator of server-sent events for a StreamingResponse (see _generation_events)"""
+
+        # The request's session is closed before the body streams, so the quiz is stored on a session of its own
+        return self._stream_generation(bind=self.db.bind, creator=creator, request=request)
+
+    @classmethod
+    async def _stream_generation(cls, *, bind, creator: User, request: QuizGenerateRequest) -> AsyncIterator[bytes]:
+        session = AsyncSession(bind=bind)
+        try:
+            async for event in cls(db=session)._generation_events(creator=creator, request=request):
+                yield event
+        finally:
+            with anyio.CancelScope(shield=True):
+                await session.close()
+
+    async def _generation_events(self, *, creator: User, request: QuizGenerateRequest) -> AsyncIterator[bytes]:
+        """
+        `field` events ({"name", "value"}) for the title and description and a `question` event ({"index", "question"})
+        for each distinct question as soon as any part of the generation has written it, then `done` with the stored quiz, or `error`.
+        The quiz is stored once generation has finished, with one INSERT each for its questions and options.
+        """
+        try:
+            generated = await self.ready_quiz_data(request=request)
+            if generated is not None:
+                yield encode_event("field", {"name": "title", "value": generated.title})
+                yield encode_event("field", {"name": "description", "value": generated.description})
+                for index, question in enumerate(generated.questions):
+                    yield encode_event("question", {"index": index, "question": question.model_dump()})
+            else:
+                fields, questions = {}, []
+                # aclosing frees the model's concurrency slots right away if the client goes away mid-stream
+                async with aclosing(get_gemini_service().stream_quiz(request.prompt, request.num_questions)) as parts:
+                    async for name, value in parts:
+                        if name == "question":
+                            yield encode_event("question", {"index": len(questions), "question": value.model_dump()})
+                            questions.append(value)
+                        else:
+                            fields[name] = value
+                            yield encode_event("field", {"name": name, "value": value})
+
+                generated = QuizGenerationData(**fields, questions=questions)
+                await self.cache_quiz_data(request=request, generated=generated)
+
+            quiz = await self.create_generated_quiz(creator=creator, request=request, generated=generated)
+        except Exception as e:
+            logger.warning("Streamed quiz generation failed: %s", e)
+            await self.db.rollback()
+            yield encode_event("error", {"reason": str(getattr(e, "detail", e))})
+            return
+
+        yield encode_event("done", {"quiz": quiz.model_dump(mode="json")})
+
+    async def run_generation_job(self, *, job: QuizGenerationJob) -> None:
+        """
+        Generate and store the quiz of a claimed job, recording the outcome on the job. Called by the worker pool.
+        While the model's circuit is open the job is handed back uncounted and CircuitOpenError is raised.
+        """
+        jobs_repo = GenerationJobsRepository(self.db)
+        try:
+            request = QuizGenerateRequest.model_validate(job.request)
+            creator = await UsersRepository(self.db).get_user_by_id(user_id=job.creator_id)
+            if creator is None:
+                await jobs_repo.fail_job(job=job, error="Creator no longer exists", retry=False)
+                return
+
+            generated = await self.generate_quiz_data(request=request)
+            stored = await self._store_generated_quiz(job=job, request=request, generated=generated)
+        except CircuitOpenError:
+            await self.db.rollback()
+            await jobs_repo.release_job(job=job)
+            raise
+        except Exception as e:
+            logger.warning("Quiz generation job %s attempt %s failed: %s", job.id, job.attempts, e)
+            await self.db.rollback()
+            await jobs_repo.fail_job(
+                job=job,
+                error=str(getattr(e, "detail", e)),
+                retry=job.attempts < settings.generation_job_max_attempts,
+            )
+            return
+
+        if not stored:
+            logger.warning("Quiz generation job %s attempt %s lost its lease, dropping its quiz", job.id, job.attempts)
+
+    async def _store_generated_quiz(self, *, job: QuizGenerationJob, request: QuizGenerateRequest, generated: QuizGenerationData) -> bool:
+        """
+        Store the job's quiz and complete the job in one transaction, holding the job's row so a worker whose lease
+        expired and whose job was claimed again rolls back instead of storing a second quiz; returns False then.
+        The repositories commit as they go, so they run on a session whose commits only release savepoints.
+        """
+        async with self.db.bind.connect() as connection:
+            transaction = await connection.begin()
+            session = AsyncSession(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+            try:
+                jobs_repo = GenerationJobsRepository(session)
+                if not await jobs_repo.lock_running_job(job=job):
+                    await transaction.rollback()
+                    return False
+
+                creator = await UsersRepository(session).get_user_by_id(user_id=job.creator_id)
+                if creator is None:
+                    await jobs_repo.fail_job(job=job, error="Creator no longer exists", retry=False)
+                else:
+                    quiz = await QuizGenerationService(session).create_generated_quiz(creator=creator, request=request, generated=generated)
+                    await jobs_repo.complete_job(job=job, quiz_id=quiz.id)
+                await transaction.commit()
+            finally:
+                await session.close()
+
+        # Caches were invalidated before the quiz was visible, so a read in between may have cached it without it
+        listing_responses.invalidate()
+        invalidate_swr_cache(QUIZ_COUNTS_CACHE)
+        invalidate_swr_cache(QUIZ_DETAIL_CACHE)
+        return True
+
+    async def pool_topics(self) -> list[str]:
+        """
+        Topics the pool is stocked for, normalized like prompts: every configured topic, then up to
+        generation_pool_popular_topics of the tags on the most public quizzes and the most searched terms, alternately.
+        """
+        configured = list(dict.fromkeys(filter(None, map(normalize_prompt, settings.generation_pool_topics))))
+        limit = settings.generation_pool_popular_topics
+        tags = await TagsRepository(self.db).get_popular_tag_names(limit=limit)
+
+        popular: list[str] = []
+        for candidate in chain.from_iterable(zip_longest(tags, search_terms.most_common(limit))):
+            topic = normalize_prompt(candidate or "")
+            if topic and topic not in configured and topic not in popular and len(popular) < limit:
+                popular.append(topic)
+
+        return configured + popular
+
+    async def refill_pool_topic(self, *, topic: str, size: int, num_questions: int) -> int:
+        """
+        Generate quizzes for a topic until the pool holds `size` of them, returning how many were added.
+        The whole refill holds the topic's advisory lock, so workers refilling at once never overfill; if another
+        worker holds the lock, it is left to that worker. The lock is held by a connection of its own, on which
+        no transaction stays open while the model generates.
+        """
+        model = llm_model_name(settings)
+        added = 0
+        async with self.db.bind.connect() as connection:
+            session = AsyncSession(bind=connection, expire_on_commit=False)
+            pool_repo = GenerationPoolRepository(session)
+            try:
+                if not await pool_repo.lock_topic(topic=topic):
+                    return 0
+                try:
+                    while True:
+                        count = await pool_repo.count_data(topic=topic, model=model, num_questions=num_questions)
+                        await session.commit()
+                        if count >= size:
+                            break
+
+                        generated = await get_gemini_service().generate_quiz_from_prompt(prompt=topic, num_questions=num_questions)
+                        await pool_repo.add_data(topic=topic, model=model, num_questions=num_questions, data=generated.model_dump())
+                        added += 1
+                finally:
+                    try:
+                        await session.rollback()
+                        await pool_repo.unlock_topic(topic=topic)
+                    except Exception:
+                        # A pooled connection would keep holding the lock, so it is discarded instead
+                        await connection.invalidate()
+                        raise
+            finally:
+                await session.close()
+
+        return added
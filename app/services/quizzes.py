@@ -1,16 +1,22 @@
 import logging
+from typing import Any
 
+from sqlalchemy.engine import Row
 from starlette.status import (
+    HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND,
 )
 
-from app.database.repositories.quizzes import QuizzesRepository
+from app.database.repositories.quizzes import QUIZ_COUNTS_CACHE, QUIZ_DETAIL_CACHE, QuizzesRepository
 from app.database.repositories.tags import TagsRepository
 from app.database.repositories.questions import QuestionsRepository
 from app.database.repositories.options import OptionsRepository
-from app.schemas.question import QuestionInCreate
+from app.database.repositories.score_rollups import ScoreRollupsRepository
+from app.models.score_rollup import LeaderboardPeriod
+from app.schemas.pagination import PaginationMeta
 from app.models.user import User
 from app.schemas.quiz import (
+    QuizFieldSelection,
     QuizFilters,
     QuizInCreate,
     QuizInUpdate,
@@ -22,13 +28,30 @@ from app.schemas.quiz import (
     LeaderboardResponse,
     LeaderboardData,
     LeaderboardEntry,
+    LeaderboardPositionData,
+    LeaderboardPositionResponse,
+    LeaderboardWindow,
 )
 from app.services.base import BaseService
+from app.services.questions import invalid_item_ids
 from app.utils import response_4xx, return_service
+from app.utils.answer_keys import answer_keys
+from app.utils.leaderboard_cache import LeaderboardCacheEntry, quiz_leaderboards
+from app.utils.projection import validate_rows
+from app.utils.response_cache import listing_responses
+from app.utils.responses import json_envelope
+from app.utils.singleflight import single_flight
+from app.utils.swr_cache import invalidate_swr_cache
 
 logger = logging.getLogger(__name__)
 
 
+def sparse_page(*, message: str, documents: list[Row], meta: PaginationMeta, detail: dict[str, Any] | None = None) -> bytes:
+    """Encode a page of Postgres-rendered sparse quiz documents in the usual {"data": [...], "meta": {...}} shape."""
+    data = b'{"data":[' + b",".join(row.document.encode() for row in documents) + b'],"meta":' + meta.model_dump_json().encode() + b"}"
+    return json_envelope(message=message, data=data, detail=detail)
+
+
 class QuizzesService(BaseService):
     @return_service
     async def create_quiz(
@@ -44,30 +67,25 @@ class QuizzesService(BaseService):
         created_quiz = await quizzes_repo.create_quiz(creator=creator, quiz_in=quiz_in, tags=tags)
 
         if quiz_in.questions and questions_repo and options_repo:
-            for question_data in quiz_in.questions:
-                question_in_create = QuestionInCreate(
-                    quiz_id=created_quiz.id,
-                    question_text=question_data.question_text,
-                    question_type=question_data.question_type,
-                    points=question_data.points,
-                    options=question_data.options
-                )
-                created_question = await questions_repo.create_question(question_in=question_in_create)
-                
-                if question_data.options:
-                    await options_repo.create_options_for_question(
-                        options_in=question_data.options, 
-                        question_id=created_question.id
-                    )
-            
+            # One INSERT for all questions and one for all their options
+            question_ids = await questions_repo.create_questions(quiz_id=created_quiz.id, questions_in=quiz_in.questions)
+            await options_repo.create_options(
+                options_in={question_id: question_data.options for question_id, question_data in zip(question_ids, quiz_in.questions)},
+            )
+
             await quizzes_repo.connection.commit()
             created_quiz = await quizzes_repo.get_quiz_by_id(quiz_id=created_quiz.id)
 
+        listing_responses.invalidate()
+        invalidate_swr_cache(QUIZ_COUNTS_CACHE)
+        invalidate_swr_cache(QUIZ_DETAIL_CACHE)
+
         return QuizResponse(
             message="Quiz created successfully.",
             data=QuizOutData.model_validate(created_quiz),
         )
 
+    @single_flight
     @return_service
     async def get_quiz_by_id(
         self,
@@ -86,18 +104,47 @@ class QuizzesService(BaseService):
             data=QuizDetailData.model_validate(quiz),
         )
 
+    @single_flight
+    @return_service
+    async def get_quiz_document(
+        self,
+        quiz_id: int,
+        quizzes_repo: QuizzesRepository,
+        selection: QuizFieldSelection | None = None,
+    ):
+        """
+        Same response as get_quiz_by_id, but the document is assembled by Postgres and returned as
+        encoded JSON bytes, skipping ORM hydration and Pydantic validation entirely.
+        With a selection, only the requested fields and related lists are queried and returned.
+        """
+        document = await quizzes_repo.get_quiz_detail_json(quiz_id=quiz_id, selection=selection)
+        if document is None:
+            return response_4xx(
+                status_code=HTTP_404_NOT_FOUND,
+                context={"reason": "Quiz not found"},
+            )
+
+        return json_envelope(message="Quiz retrieved successfully.", data=document, detail={"key": "val"})
+
+    @single_flight
     @return_service
     async def get_all_quizzes(
         self,
         quiz_filters: QuizFilters,
         quizzes_repo: QuizzesRepository,
+        selection: QuizFieldSelection | None = None,
     ):
-        quizzes, meta = await quizzes_repo.get_public_quizzes_paginated(skip=quiz_filters.skip, limit=quiz_filters.limit)
+        """Public quizzes; with a selection, a sparse page encoded as JSON bytes."""
+        quizzes, meta = await quizzes_repo.get_public_quizzes_paginated(
+            skip=quiz_filters.skip, limit=quiz_filters.limit, projection=True, selection=selection
+        )
+        if selection is not None:
+            return sparse_page(message="Quizzes retrieved successfully.", documents=quizzes, meta=meta, detail={"key": "val"})
 
         return QuizResponse(
             message="Quizzes retrieved successfully.",
             data={
-                "data": [QuizOutData.model_validate(quiz) for quiz in quizzes],
+                "data": validate_rows(QuizOutData, quizzes),
                 "meta": meta.model_dump()
             },
         )
@@ -107,21 +154,27 @@ class QuizzesService(BaseService):
         self,
         quiz_filters: QuizFilters,
         quizzes_repo: QuizzesRepository,
+        selection: QuizFieldSelection | None = None,
     ):
+        """Search quizzes; with a selection, a sparse page encoded as JSON bytes."""
+        page = {"skip": quiz_filters.skip, "limit": quiz_filters.limit, "projection": True, "selection": selection}
         if quiz_filters.search:
-            quizzes, meta = await quizzes_repo.search_quizzes_by_text_paginated(search_text=quiz_filters.search, skip=quiz_filters.skip, limit=quiz_filters.limit)
+            quizzes, meta = await quizzes_repo.search_quizzes_by_text_paginated(search_text=quiz_filters.search, **page)
             message = f"Quizzes searched successfully for '{quiz_filters.search}'."
         elif quiz_filters.tag:
-            quizzes, meta = await quizzes_repo.search_quizzes_by_tag_paginated(tag=quiz_filters.tag, skip=quiz_filters.skip, limit=quiz_filters.limit)
+            quizzes, meta = await quizzes_repo.search_quizzes_by_tag_paginated(tag=quiz_filters.tag, **page)
             message = f"Quizzes searched successfully for tag '{quiz_filters.tag}'."
         else:
-            quizzes, meta = await quizzes_repo.get_all_quizzes_paginated(skip=quiz_filters.skip, limit=quiz_filters.limit)
+            quizzes, meta = await quizzes_repo.get_all_quizzes_paginated(**page)
             message = "All public quizzes retrieved successfully."
 
+        if selection is not None:
+            return sparse_page(message=message, documents=quizzes, meta=meta)
+
         return QuizPaginatedResponse(
             message=message,
             data={
-                "data": [QuizOutData.model_validate(quiz) for quiz in quizzes],
+                "data": validate_rows(QuizOutData, quizzes),
                 "meta": meta.model_dump()
             },
         )
@@ -132,13 +185,19 @@ class QuizzesService(BaseService):
         user_id: int,
         quiz_filters: QuizFilters,
         quizzes_repo: QuizzesRepository,
+        selection: QuizFieldSelection | None = None,
     ):
-        quizzes, meta = await quizzes_repo.get_quizzes_by_creator_paginated(creator_id=user_id, skip=quiz_filters.skip, limit=quiz_filters.limit)
+        """Quizzes created by a user; with a selection, a sparse page encoded as JSON bytes."""
+        quizzes, meta = await quizzes_repo.get_quizzes_by_creator_paginated(
+            creator_id=user_id, skip=quiz_filters.skip, limit=quiz_filters.limit, projection=True, selection=selection
+        )
+        if selection is not None:
+            return sparse_page(message="User quizzes retrieved successfully.", documents=quizzes, meta=meta)
 
         return QuizPaginatedResponse(
             message="User quizzes retrieved successfully.",
             data={
-                "data": [QuizOutData.model_validate(quiz) for quiz in quizzes],
+                "data": validate_rows(QuizOutData, quizzes),
                 "meta": meta.model_dump()
             },
         )
@@ -160,34 +219,54 @@ class QuizzesService(BaseService):
                 context={"reason": "Quiz not found"},
             )
 
+        sync_questions = quiz_in.questions is not None and questions_repo and options_repo
+        existing_questions = [question for question in quiz.questions if question.deleted_at is None]
+        existing_options = {
+            question.id: [option for option in question.options if option.deleted_at is None]
+            for question in existing_questions
+        }
+
+        if sync_questions:
+            invalid_ids = invalid_item_ids(set(existing_options), quiz_in.questions)
+            if invalid_ids:
+                return response_4xx(
+                    status_code=HTTP_400_BAD_REQUEST,
+                    context={"reason": f"Questions {invalid_ids} do not belong to this quiz"},
+                )
+
+            for question_data in quiz_in.questions:
+                if question_data.id is None:
+                    continue
+                invalid_ids = invalid_item_ids({option.id for option in existing_options[question_data.id]}, question_data.options)
+                if invalid_ids:
+                    return response_4xx(
+                        status_code=HTTP_400_BAD_REQUEST,
+                        context={"reason": f"Options {invalid_ids} do not belong to question {question_data.id}"},
+                    )
+
         tags = None
         if quiz_in.tag_names is not None:
             tags = await tags_repo.get_or_create_tags(tag_names=quiz_in.tag_names)
 
         updated_quiz = await quizzes_repo.update_quiz(quiz=quiz, quiz_in=quiz_in, tags=tags)
 
-        if quiz_in.questions is not None and questions_repo and options_repo:
-            await questions_repo.delete_questions_by_quiz_id(quiz_id=quiz_id)
-            
-            for question_data in quiz_in.questions:
-                question_in_create = QuestionInCreate(
-                    quiz_id=quiz_id,
-                    question_text=question_data.question_text,
-                    question_type=question_data.question_type,
-                    points=question_data.points,
-                    options=question_data.options
-                )
-                created_question = await questions_repo.create_question(question_in=question_in_create)
-                
-                if question_data.options:
-                    await options_repo.create_options_for_question(
-                        options_in=question_data.options, 
-                        question_id=created_question.id
-                    )
-            
+        if sync_questions:
+            # Questions and options are matched by id so unchanged rows (and the answers pointing at them) are untouched
+            question_ids = await questions_repo.sync_questions(quiz_id=quiz_id, existing=existing_questions, questions_in=quiz_in.questions)
+            await options_repo.sync_options(
+                existing=existing_options,
+                options_in={question_id: question_data.options for question_id, question_data in zip(question_ids, quiz_in.questions)},
+            )
+
             await quizzes_repo.connection.commit()
             updated_quiz = await quizzes_repo.get_quiz_by_id(quiz_id=quiz_id)
 
+        quiz_leaderboards.invalidate(quiz_id)
+        answer_keys.invalidate(quiz_id)
+        listing_responses.invalidate()
+        invalidate_swr_cache(QUIZ_COUNTS_CACHE)
+        invalidate_swr_cache(QUIZ_DETAIL_CACHE)
+
         return QuizResponse(
             message="Quiz updated successfully.",
             data=QuizOutData.model_validate(updated_quiz),
@@ -207,41 +286,73 @@ class QuizzesService(BaseService):
             )
 
         await quizzes_repo.delete_quiz(quiz=quiz)
+        quiz_leaderboards.invalidate(quiz_id)
+        answer_keys.invalidate(quiz_id)
+        listing_responses.invalidate()
+        invalidate_swr_cache(QUIZ_COUNTS_CACHE)
+        invalidate_swr_cache(QUIZ_DETAIL_CACHE)
 
         return QuizResponse(
             message="Quiz deleted successfully.",
             data=None,
         )
 
+    @single_flight
     @return_service
     async def get_quiz_leaderboard(
         self,
         quiz_id: int,
         quizzes_repo: QuizzesRepository,
+        rollups_repo: ScoreRollupsRepository | None = None,
+        window: LeaderboardWindow = LeaderboardWindow.ALL,
     ):
-        quiz = await quizzes_repo.get_quiz_by_id(quiz_id=quiz_id)
-        if not quiz:
-            return response_4xx(
-                status_code=HTTP_404_NOT_FOUND,
-                context={"reason": "Quiz not found"},
+        if window != LeaderboardWindow.ALL:
+            quiz = await quizzes_repo.get_quiz_by_id(quiz_id=quiz_id)
+            if not quiz:
+                return response_4xx(
+                    status_code=HTTP_404_NOT_FOUND,
+                    context={"reason": "Quiz not found"},
+                )
+
+            leaderboard_entries = await rollups_repo.get_quiz_leaderboard(
+                quiz_id=quiz_id, period=LeaderboardPeriod(window.value), limit=quiz_leaderboards.top_k
             )
+            cached = (quiz.title, leaderboard_entries)
+        else:
+            cached = quiz_leaderboards.get(quiz_id)
+
+        if cached is None:
+            quiz = await quizzes_repo.get_quiz_by_id(quiz_id=quiz_id)
+            if not quiz:
+                return response_4xx(
+                    status_code=HTTP_404_NOT_FOUND,
+                    context={"reason": "Quiz not found"},
+                )
+
+            # After the existence check, so lookups of missing quizzes leave no warm marker behind
+            quiz_leaderboards.begin_warm(quiz_id)
+
+            leaderboard_entries = await quizzes_repo.get_quiz_leaderboard(quiz_id=quiz_id, limit=quiz_leaderboards.top_k)
+            cached = (quiz.title, [LeaderboardCacheEntry(**entry._mapping) for entry in leaderboard_entries])
+            quiz_leaderboards.warm(quiz_id, *cached)
 
-        leaderboard_entries = await quizzes_repo.get_quiz_leaderboard(quiz_id=quiz_id)
-        
+        quiz_title, leaderboard_entries = cached
         entries = [
             LeaderboardEntry(
                 user_id=entry.user_id,
-                username=entry.user.username,
+                username=entry.username,
                 score=entry.score,
                 attempt_number=entry.attempt_no,
                 finished_at=entry.finished_at,
+                rank=position,
             )
-            for entry in leaderboard_entries
+            for position, entry in enumerate(leaderboard_entries, start=1)
         ]
 
         leaderboard_data = LeaderboardData(
-            quiz_id=quiz.id,
-            quiz_title=quiz.title,
+            quiz_id=quiz_id,
+            quiz_title=quiz_title,
+            window=window,
             entries=entries,
         )
 
@@ -249,3 +360,52 @@ class QuizzesService(BaseService):
             message="Quiz leaderboard retrieved successfully.",
             data=leaderboard_data,
         )
+
+    @return_service
+    async def get_leaderboard_position(
+        self,
+        quiz_id: int,
+        user: User,
+        quizzes_repo: QuizzesRepository,
+        neighbours: int = 2,
+    ):
+        quiz = await quizzes_repo.get_quiz_by_id(quiz_id=quiz_id)
+        if not quiz:
+            return response_4xx(
+                status_code=HTTP_404_NOT_FOUND,
+                context={"reason": "Quiz not found"},
+            )
+
+        user_entry = await quizzes_repo.get_user_leaderboard_entry(quiz_id=quiz_id, user_id=user.id)
+        if not user_entry:
+            return response_4xx(
+                status_code=HTTP_404_NOT_FOUND,
+                context={"reason": "You have no finished attempts for this quiz"},
+            )
+
+        position = dict(quiz_id=quiz_id, user_id=user.id, score=user_entry.score, finished_at=user_entry.finished_at)
+        rank = await quizzes_repo.get_leaderboard_rank(**position)
+        above, below = await quizzes_repo.get_leaderboard_neighbours(**position, limit=neighbours)
+
+        def to_entry(row, entry_rank: int) -> LeaderboardEntry:
+            return LeaderboardEntry(
+                user_id=row.user_id,
+                username=row.username,
+                score=row.score,
+                attempt_number=row.attempt_no,
+                finished_at=row.finished_at,
+                rank=entry_rank,
+            )
+
+        position_data = LeaderboardPositionData(
+            quiz_id=quiz.id,
+            quiz_title=quiz.title,
+            entry=to_entry(user_entry, rank),
+            above=[to_entry(row, rank - len(above) + index) for index, row in enumerate(above)],
+            below=[to_entry(row, rank + 1 + index) for index, row in enumerate(below)],
+        )
+
+        return LeaderboardPositionResponse(
+            message="Quiz leaderboard position retrieved successfully.",
+            data=position_data,
+        )
@@ -4,6 +4,7 @@ from starlette.status import (
     HTTP_404_NOT_FOUND,
 )
 
+from app.database.repositories.quizzes import QUIZ_COUNTS_CACHE, QUIZ_DETAIL_CACHE
 from app.database.repositories.tags import TagsRepository
 from app.schemas.tag import (
     TagFilters,
@@ -14,6 +15,8 @@ from app.schemas.tag import (
 )
 from app.services.base import BaseService
 from app.utils import response_4xx, return_service
+from app.utils.response_cache import listing_responses
+from app.utils.swr_cache import invalidate_swr_cache
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +81,9 @@ class TagsService(BaseService):
             )
 
         updated_tag = await tags_repo.update_tag(tag=tag, tag_in=tag_in)
+        listing_responses.invalidate()
+        invalidate_swr_cache(QUIZ_COUNTS_CACHE)
+        invalidate_swr_cache(QUIZ_DETAIL_CACHE)
 
         return TagResponse(
             message="Tag updated successfully.",
@@ -98,6 +104,9 @@ class TagsService(BaseService):
             )
 
         await tags_repo.delete_tag(tag=tag)
+        listing_responses.invalidate()
+        invalidate_swr_cache(QUIZ_COUNTS_CACHE)
+        invalidate_swr_cache(QUIZ_DETAIL_CACHE)
 
         return TagResponse(
             message="Tag deleted successfully.",
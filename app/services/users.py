@@ -7,15 +7,22 @@ from starlette.status import (
 )
 
 from app.api.dependencies.database import get_repository
-from app.api.dependencies.users import get_users_filters
+from app.api.dependencies.users import get_leaderboard_filters, get_users_filters
 from app.core import constant, token
+from app.database.repositories.score_rollups import ScoreRollupsRepository
 from app.database.repositories.users import UsersRepository
+from app.models.score_rollup import LeaderboardPeriod
 from app.models.user import User
+from app.schemas.quiz import LeaderboardWindow
 from app.schemas.user import (
     UserAuthOutData,
     UserInCreate,
     UserInSignIn,
     UserInUpdate,
+    UserLeaderboardData,
+    UserLeaderboardEntry,
+    UserLeaderboardFilters,
+    UserLeaderboardResponse,
     UserOutData,
     UserResponse,
     UsersFilters,
@@ -80,6 +87,35 @@ class UsersService(BaseService):
             data=[UserOutData.model_validate(user) for user in users],
         )
 
+    @return_service
+    async def get_leaderboard(
+        self,
+        leaderboard_filters: UserLeaderboardFilters = Depends(get_leaderboard_filters),
+        users_repo: UsersRepository = Depends(get_repository(UsersRepository)),
+        rollups_repo: ScoreRollupsRepository = Depends(get_repository(ScoreRollupsRepository)),
+    ):
+        page = dict(
+            limit=leaderboard_filters.limit,
+            after_score=leaderboard_filters.after_score,
+            after_id=leaderboard_filters.after_id,
+        )
+        if leaderboard_filters.window == LeaderboardWindow.ALL:
+            rows = await users_repo.get_leaderboard(**page)
+        else:
+            rows = await rollups_repo.get_user_leaderboard(period=LeaderboardPeriod(leaderboard_filters.window.value), **page)
+
+        entries = [UserLeaderboardEntry(user_id=row.id, username=row.username, total_score=row.total_score) for row in rows]
+
+        leaderboard_data = UserLeaderboardData(window=leaderboard_filters.window, entries=entries)
+        if len(rows) == leaderboard_filters.limit:
+            leaderboard_data.next_after_score = rows[-1].total_score
+            leaderboard_data.next_after_id = rows[-1].id
+
+        return UserLeaderboardResponse(
+            message=constant.SUCCESS_GET_LEADERBOARD,
+            data=leaderboard_data,
+        )
+
     @return_service
     async def signup_user(
         self,
@@ -0,0 +1,98 @@
+"""
+Per-worker cache of compiled quiz answer keys.
+
+A quiz answer key maps question_id to the question type, its points and the ids of its correct options, so answers
+can be graded without reading options back from the database. Keys are built from the database on a miss, dropped
+whenever a question or option of the quiz is written on this worker, and expire after `ttl_seconds` so writes
+handled by other workers are picked up. A key compiled while a write was in flight is not stored (see
+`generation`). At most `capacity` quizzes are held, least-recently-used first out.
+
+With several workers, a question added elsewhere is found by rebuilding the key once (see
+`app.services.answers.get_question_key`), but changed correct options and deleted questions are only seen once the
+key expires, so `ttl_seconds` bounds how long another worker may grade against the old key.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+
+from app.core import settings
+
+
+@dataclass(frozen=True)
+class QuestionKey:
+    question_type: str
+    points: int
+    correct_option_ids: frozenset[int]
+
+    def grade(self, selected_option_ids: list[int] | None) -> bool | None:
+        """Whether the selected options answer the question; None for text questions, which are not auto-graded."""
+        if self.question_type not in ("single", "multiple"):
+            return None
+
+        selected = frozenset(selected_option_ids or ())
+        if self.question_type == "single" and len(selected) != 1:
+            return False
+        return selected == self.correct_option_ids
+
+
+AnswerKey = dict[int, QuestionKey]
+
+
+class AnswerKeyCache:
+    def __init__(self, *, capacity: int, ttl_seconds: float) -> None:
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._keys: OrderedDict[int, tuple[float, AnswerKey]] = OrderedDict()
+        self._question_quiz: dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, quiz_id: int) -> AnswerKey | None:
+        cached = self._keys.get(quiz_id)
+        if cached is None:
+            self.misses += 1
+            return None
+
+        built_at, answer_key = cached
+        if monotonic() - built_at > self.ttl_seconds:
+            self._drop(quiz_id)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._keys.move_to_end(quiz_id)
+        return answer_key
+
+    def store(self, quiz_id: int, answer_key: AnswerKey, generation: int) -> AnswerKey:
+        """Cache a key compiled from data read while `generation` was current, and return it either way."""
+        if generation != self.generation:
+            return answer_key
+
+        self._drop(quiz_id)
+        self._keys[quiz_id] = (monotonic(), answer_key)
+        self._question_quiz.update((question_id, quiz_id) for question_id in answer_key)
+
+        while len(self._keys) > self.capacity:
+            self._drop(next(iter(self._keys)))
+
+        return answer_key
+
+    def quiz_id_for_question(self, question_id: int) -> int | None:
+        return self._question_quiz.get(question_id)
+
+    def invalidate(self, quiz_id: int) -> None:
+        self.generation += 1
+        self._drop(quiz_id)
+
+    def _drop(self, quiz_id: int) -> None:
+        cached = self._keys.pop(quiz_id, None)
+        if cached is not None:
+            for question_id in cached[1]:
+                self._question_quiz.pop(question_id, None)
+
+
+answer_keys = AnswerKeyCache(
+    capacity=settings.answer_key_cache_quizzes,
+    ttl_seconds=settings.answer_key_cache_ttl_seconds,
+)
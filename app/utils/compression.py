@@ -0,0 +1,256 @@
+"""
+HTTP response compression.
+
+`CompressionMiddleware` compresses responses whose content type is in an allowlist (the app passes
+`settings.compression_content_types`) with zstd (when the `zstandard` package is installed and the client accepts
+it) or gzip. Complete bodies below `minimum_size` are left alone; streamed bodies are compressed chunk by chunk and
+flushed after every chunk so clients still see each one as it is produced. Responses that already carry a
+Content-Encoding pass through untouched.
+
+`PrecompressedStaticFiles` serves `<file>.zst` / `<file>.gz` siblings written by `precompress_directory` (at startup
+or at build time with `python -m app.commands.compress_static`) and marks static responses cacheable.
+"""
+import gzip
+import logging
+import os
+import zlib
+from pathlib import Path
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional speedup
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# File suffixes worth precompressing; everything else (images, archives) is already compressed or tiny
+PRECOMPRESS_SUFFIXES = (".js", ".css", ".html", ".json", ".map", ".svg", ".txt")
+
+# Extension of the precompressed sibling file for each encoding
+SIDECAR_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+
+
+class GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, *, final: bool) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class ZstdEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, *, final: bool) -> bytes:
+        flush_mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._compressor.compress(data) + self._compressor.flush(flush_mode)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Supported encodings, most preferred first."""
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str, encodings: tuple[str, ...]) -> str | None:
+    """Pick the first of `encodings` the Accept-Encoding header allows, or None for identity."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        content_types: tuple[str, ...] | list[str],
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        zstd_level: int = 3,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = frozenset(content_types)
+        self.levels = {"gzip": gzip_level, "zstd": zstd_level}
+        self.encodings = available_encodings()
+
+    def encoder(self, encoding: str) -> GzipEncoder | ZstdEncoder:
+        if encoding == "zstd":
+            return ZstdEncoder(self.levels["zstd"])
+        return GzipEncoder(self.levels["gzip"])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        await self.app(scope, receive, _CompressingSend(self, encoding, send))
+
+
+class _CompressingSend:
+    """Per-response send wrapper; holds the start message back until the first body chunk decides the encoding."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str | None, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Message | None = None
+        self.encoder: GzipEncoder | ZstdEncoder | None = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+        if self.encoder is not None:
+            await self.send_compressed(message)
+            return
+
+        await self.start(message)
+
+    async def start(self, message: Message) -> None:
+        start_message = self.start_message
+        headers = MutableHeaders(scope=start_message)
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        compressible = content_type in self.middleware.content_types
+        if compressible and "accept-encoding" not in headers.get("vary", "").lower():
+            headers.add_vary_header("Accept-Encoding")
+
+        if (
+            not compressible
+            or self.encoding is None
+            or "content-encoding" in headers
+            or start_message["status"] < 200
+            or start_message["status"] in (204, 206, 304)
+            or (not more_body and len(body) < self.middleware.minimum_size)
+        ):
+            self.passthrough = True
+            await self.send(start_message)
+            await self.send(message)
+            return
+
+        self.encoder = self.middleware.encoder(self.encoding)
+        headers["Content-Encoding"] = self.encoding
+        if more_body:
+            # The compressed length is unknown until the last chunk, so the body is sent chunked
+            del headers["Content-Length"]
+            await self.send(start_message)
+            await self.send_compressed(message)
+            return
+
+        compressed = self.encoder.compress(body, final=True)
+        headers["Content-Length"] = str(len(compressed))
+        await self.send(start_message)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    async def send_compressed(self, message: Message) -> None:
+        more_body = message.get("more_body", False)
+        body = self.encoder.compress(message.get("body", b""), final=not more_body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+
+def precompress_file(path: Path, encodings: tuple[str, ...]) -> None:
+    """Write `<path>.gz` / `<path>.zst` at maximum compression unless they are already newer than the source."""
+    data = None
+    for encoding in encodings:
+        target = path.with_name(path.name + SIDECAR_SUFFIXES[encoding])
+        if target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+            continue
+
+        if data is None:
+            data = path.read_bytes()
+        if encoding == "zstd":
+            compressed = zstandard.ZstdCompressor(level=19).compress(data)
+        else:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(compressed)
+        os.replace(tmp, target)
+
+
+def precompress_directory(directory: str | os.PathLike, *, minimum_size: int = 1024) -> int:
+    """Precompress every eligible file under `directory`; returns how many files were considered."""
+    encodings = available_encodings()
+    count = 0
+    for path in Path(directory).rglob("*"):
+        if not path.is_file() or path.suffix not in PRECOMPRESS_SUFFIXES or path.stat().st_size < minimum_size:
+            continue
+        precompress_file(path, encodings)
+        count += 1
+    return count
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    def __init__(self, *args, max_age: int = 0, precompress: bool = False, minimum_size: int = 1024, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={max_age}" if max_age else None
+        self.encodings = available_encodings()
+
+        if precompress and self.directory is not None:
+            try:
+                precompress_directory(self.directory, minimum_size=minimum_size)
+            except OSError:
+                # e.g. a read-only image; the compression middleware still compresses these on the fly
+                logger.warning("Could not precompress static files in %s", self.directory, exc_info=True)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if isinstance(response, FileResponse) and response.status_code == 200 and Path(response.path).suffix in PRECOMPRESS_SUFFIXES:
+            response = self.compressed_response(response, scope) or response
+            response.headers["Vary"] = "Accept-Encoding"
+        if self.cache_control and response.status_code in (200, 304):
+            response.headers["Cache-Control"] = self.cache_control
+        return response
+
+    def compressed_response(self, response: FileResponse, scope: Scope) -> Response | None:
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            return None
+
+        sidecar = f"{response.path}{SIDECAR_SUFFIXES[encoding]}"
+        try:
+            stat_result = os.stat(sidecar)
+        except OSError:
+            return None
+        if stat_result.st_mtime < os.stat(response.path).st_mtime:
+            return None
+
+        compressed = FileResponse(
+            sidecar,
+            stat_result=stat_result,
+            media_type=response.media_type,
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
+        # The sidecar has its own ETag, which the parent class cannot match against If-None-Match
+        if self.is_not_modified(compressed.headers, request_headers):
+            return NotModifiedResponse(compressed.headers)
+        return compressed
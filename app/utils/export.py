@@ -0,0 +1,66 @@
+"""
+Encoders for streamed exports.
+
+Each batch of rows from a server-side cursor becomes one chunk of bytes, so memory use is bounded by the batch size
+and the next batch is fetched only after the previous chunk has been sent (ASGI `send` waits for the client).
+"""
+import csv
+import enum
+import io
+from collections.abc import AsyncIterator, Sequence
+from datetime import date
+from typing import Any
+
+from sqlalchemy.engine import Row
+
+from app.utils.responses import dumps
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, list | tuple):
+        return ";".join(str(item) for item in value)
+    return value
+
+
+async def encode_ndjson(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield b"".join(dumps(dict(row._mapping)) + b"\n" for row in rows)
+
+
+async def encode_csv(batches: AsyncIterator[Sequence[Row]], columns: Sequence[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    async for rows in batches:
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Header only, for exports without rows
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def encode_export(batches: AsyncIterator[Sequence[Row]], export_format: ExportFormat, columns: Sequence[str]) -> AsyncIterator[bytes]:
+    if export_format == ExportFormat.CSV:
+        return encode_csv(batches, columns)
+    return encode_ndjson(batches)
@@ -0,0 +1,107 @@
+"""
+Incremental parsing of one JSON object that arrives in pieces, e.g. a model's streamed answer.
+
+`JsonObjectStream.feed` returns events as soon as they are complete:
+
+- ("value", key, value) for each member of the top-level object that is not an array;
+- ("item", key, value) for each element of a top-level array member, e.g. every question of {"questions": [...]}.
+
+Anything before the opening brace (such as a ```json fence) and after the closing one is ignored. Each piece is
+scanned once; values are decoded with `json.loads` when they complete.
+"""
+import json
+from typing import Any
+
+JsonStreamEvent = tuple[str, str, Any]
+
+
+class JsonObjectStream:
+    def __init__(self) -> None:
+        self._text = ""
+        self._scanned = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key: str | None = None
+        self._value_start: int | None = None
+        self._item_start: int | None = None
+        self.done = False
+
+    def feed(self, chunk: str) -> list[JsonStreamEvent]:
+        self._text += chunk
+        events: list[JsonStreamEvent] = []
+        text, stack = self._text, self._stack
+
+        for index in range(self._scanned, len(text)):
+            if self.done:
+                break
+            char = text[index]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(stack) == 1 and self._expect_key:
+                        self._key = json.loads(text[self._string_start:index + 1])
+                continue
+
+            if not stack:
+                if char == "{":
+                    stack.append(char)
+                    self._expect_key = True
+                continue
+            if char.isspace():
+                continue
+
+            depth = len(stack)
+            if depth == 1 and not self._expect_key and self._value_start is None and char not in ",:}":
+                self._value_start = index
+            elif depth == 2 and stack[-1] == "[" and self._item_start is None and char not in ",]":
+                self._item_start = index
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char in "{[":
+                stack.append(char)
+            elif char == ":":
+                if depth == 1:
+                    self._expect_key = False
+            elif char == ",":
+                if depth == 1:
+                    self._emit_value(events, index)
+                    self._expect_key = True
+                elif depth == 2 and stack[-1] == "[":
+                    self._emit_item(events, index)
+            elif char in "}]":
+                closed = stack.pop()
+                if depth == 1:
+                    self._emit_value(events, index)
+                    self.done = True
+                elif depth == 2:
+                    if closed == "[":
+                        # A scalar last element; the array itself was reported item by item
+                        self._emit_item(events, index)
+                        self._value_start = None
+                    else:
+                        self._emit_value(events, index + 1)
+                elif depth == 3 and stack[-1] == "[":
+                    self._emit_item(events, index + 1)
+
+        self._scanned = len(text)
+        return events
+
+    def _emit_value(self, events: list[JsonStreamEvent], end: int) -> None:
+        if self._value_start is not None:
+            events.append(("value", self._key, json.loads(self._text[self._value_start:end])))
+            self._value_start = None
+
+    def _emit_item(self, events: list[JsonStreamEvent], end: int) -> None:
+        if self._item_start is not None:
+            events.append(("item", self._key, json.loads(self._text[self._item_start:end])))
+            self._item_start = None
@@ -0,0 +1,120 @@
+"""
+Per-worker top-K cache of quiz leaderboards.
+
+Each quiz board keeps the best finished attempt of at most `top_k` users, sorted in leaderboard order
+(score DESC, finished_at ASC, user_id ASC). Boards are warmed from the database on a miss, updated in place
+when an attempt is submitted on this worker, and re-warmed after `ttl_seconds` so submissions handled by
+other workers show up. Boards are evicted least-recently-used once more than `capacity` quizzes are held.
+"""
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from time import monotonic
+
+from app.core import settings
+
+
+@dataclass(frozen=True)
+class LeaderboardCacheEntry:
+    user_id: int
+    username: str
+    score: int
+    attempt_no: int
+    finished_at: datetime
+
+    @property
+    def sort_key(self) -> tuple[int, datetime, int]:
+        return (-self.score, self.finished_at, self.user_id)
+
+
+@dataclass
+class _QuizBoard:
+    quiz_title: str
+    warmed_at: float
+    keys: list[tuple[int, datetime, int]] = field(default_factory=list)
+    entries: dict[int, LeaderboardCacheEntry] = field(default_factory=dict)
+
+
+class QuizLeaderboardCache:
+    def __init__(self, *, capacity: int, top_k: int, ttl_seconds: float) -> None:
+        self.capacity = capacity
+        self.top_k = top_k
+        self.ttl_seconds = ttl_seconds
+        self._boards: OrderedDict[int, _QuizBoard] = OrderedDict()
+        # quiz_id -> True while a warm is in flight, flipped to False if the board changed meanwhile
+        self._warming: dict[int, bool] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, quiz_id: int) -> tuple[str, list[LeaderboardCacheEntry]] | None:
+        """Return (quiz_title, entries in leaderboard order), or None if the quiz has to be read from the database."""
+        board = self._boards.get(quiz_id)
+        if board is None:
+            self.misses += 1
+            return None
+
+        if monotonic() - board.warmed_at > self.ttl_seconds:
+            del self._boards[quiz_id]
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._boards.move_to_end(quiz_id)
+        return board.quiz_title, [board.entries[key[2]] for key in board.keys]
+
+    def begin_warm(self, quiz_id: int) -> None:
+        """Call before reading the leaderboard from the database, so writes racing the read can be detected."""
+        self._warming[quiz_id] = True
+
+    def warm(self, quiz_id: int, quiz_title: str, entries: list[LeaderboardCacheEntry]) -> None:
+        """Store a board read from the database, unless a submission or invalidation raced the read."""
+        if not self._warming.pop(quiz_id, False):
+            return
+
+        board = _QuizBoard(quiz_title=quiz_title, warmed_at=monotonic())
+        for entry in entries[: self.top_k]:
+            insort(board.keys, entry.sort_key)
+            board.entries[entry.user_id] = entry
+
+        self._boards[quiz_id] = board
+        self._boards.move_to_end(quiz_id)
+        while len(self._boards) > self.capacity:
+            self._boards.popitem(last=False)
+
+    def record(self, quiz_id: int, entry: LeaderboardCacheEntry) -> None:
+        """Apply a finished attempt to the quiz board, if the board is held and the attempt can change it."""
+        if quiz_id in self._warming:
+            self._warming[quiz_id] = False
+
+        board = self._boards.get(quiz_id)
+        if board is None:
+            return
+
+        current = board.entries.get(entry.user_id)
+        if current is not None:
+            if current.sort_key <= entry.sort_key:
+                return
+            del board.keys[bisect_left(board.keys, current.sort_key)]
+        elif len(board.keys) >= self.top_k and entry.sort_key >= board.keys[-1]:
+            # Users outside a full board have a best below the last entry, so this attempt cannot make the top K
+            return
+
+        insort(board.keys, entry.sort_key)
+        board.entries[entry.user_id] = entry
+
+        if len(board.keys) > self.top_k:
+            dropped = board.keys.pop()
+            del board.entries[dropped[2]]
+
+    def invalidate(self, quiz_id: int) -> None:
+        self._boards.pop(quiz_id, None)
+        if quiz_id in self._warming:
+            self._warming[quiz_id] = False
+
+
+quiz_leaderboards = QuizLeaderboardCache(
+    capacity=settings.leaderboard_cache_quizzes,
+    top_k=settings.leaderboard_top_k,
+    ttl_seconds=settings.leaderboard_cache_ttl_seconds,
+)
@@ -0,0 +1,217 @@
+"""
+Prometheus metrics in the text exposition format, without a client library.
+
+Counters, gauges and histograms are created on `registry` and updated in place; there is no locking, since every
+update happens on the event loop. Values that already live elsewhere (pool status, cache and client statistics)
+are read at scrape time by collectors registered with `registry.add_collector`. `MetricsMiddleware` times every
+HTTP request, labelled with the route template (not the raw path) and the method (non-standard methods as "other")
+so label cardinality stays bounded.
+"""
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+@dataclass
+class MetricFamily:
+    """Samples of one metric as (name suffix, label values, value); label names are shared by the family."""
+
+    name: str
+    kind: str
+    help: str
+    label_names: tuple[str, ...] = ()
+    samples: list[tuple[str, Labels, float]] = field(default_factory=list)
+
+    def add(self, value: float, *labels: str, suffix: str = "") -> None:
+        self.samples.append((suffix, labels, value))
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples:
+            names = self.label_names + (("le",) if suffix == "_bucket" else ())
+            lines.append(f"{self.name}{suffix}{_format_labels(names, labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "counter", self.help, self.label_names)
+        for labels, value in self._values.items():
+            family.add(value, *labels)
+        return family
+
+
+class Gauge(Counter):
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def collect(self) -> MetricFamily:
+        family = super().collect()
+        family.kind = "gauge"
+        return family
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (not cumulative, last one is +Inf), sum]
+        self._series: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "histogram", self.help, self.label_names)
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                family.add(cumulative, *labels, _format_value(bound), suffix="_bucket")
+            family.add(total[0], *labels, suffix="_sum")
+            family.add(cumulative, *labels, suffix="_count")
+        return family
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._collectors: list[Callable[[], Iterable[MetricFamily]]] = []
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, label_names))
+
+    def gauge(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, label_names, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """Register a function returning metric families read at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self, extra: Iterable[MetricFamily] = ()) -> str:
+        families = [metric.collect() for metric in self._metrics.values()]
+        for collector in self._collectors:
+            families.extend(collector())
+        families.extend(extra)
+        return "\n".join(family.render() for family in families) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time until the last byte of the response was sent.", ("method", "route")
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being handled.", ("method",))
+
+
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"})
+
+
+def method_label(method: str) -> str:
+    """The request method, or "other" for anything a client made up."""
+    return method if method in HTTP_METHODS else "other"
+
+
+def route_label(scope: Scope, root_path: str) -> str:
+    """Path template of the matched route, the mount path for mounted apps (e.g. static files), else "unmatched"."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    mount_path = scope.get("root_path", "")[len(root_path):]
+    return f"{mount_path}/*" if mount_path else "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = method_label(scope["method"])
+        root_path = scope.get("root_path", "")
+        status = 500
+        started_at = perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec(method)
+            route = route_label(scope, root_path)
+            http_requests.inc(method, route, str(status))
+            http_request_duration.observe(perf_counter() - started_at, method, route)
@@ -0,0 +1,34 @@
+"""
+Per-worker counts of what users search for, one of the signals for which topics the generation pool keeps stocked.
+
+Terms are case-folded and single-spaced. Counts are halved by `decay()` after every pool refill run so interest
+fades over time, and only the `capacity` most searched terms are kept.
+"""
+from collections import Counter
+
+from app.core import settings
+
+
+class SearchTermCounter:
+    def __init__(self, *, capacity: int) -> None:
+        self.capacity = capacity
+        self._counts: Counter[str] = Counter()
+
+    def record(self, term: str) -> None:
+        term = " ".join(term.casefold().split())
+        if not term:
+            return
+
+        self._counts[term] += 1
+        # Trimmed in batches so recording stays O(1) on average
+        if len(self._counts) > 2 * self.capacity:
+            self._counts = Counter(dict(self._counts.most_common(self.capacity)))
+
+    def most_common(self, n: int) -> list[str]:
+        return [term for term, _ in self._counts.most_common(n)]
+
+    def decay(self) -> None:
+        self._counts = Counter({term: count // 2 for term, count in self._counts.items() if count > 1})
+
+
+search_terms = SearchTermCounter(capacity=settings.search_term_counter_capacity)
@@ -0,0 +1,32 @@
+"""
+Bulk conversion of projected rows into output schemas.
+
+`validate_rows` runs a whole result through one cached `TypeAdapter(list[Schema])` call, so nested JSON (ISO
+timestamps, option and tag objects) is still validated, but in a single pass in pydantic-core. `construct_rows`
+skips validation for flat rows whose column types already match the schema exactly; only use it for those.
+"""
+from collections.abc import Iterable, Mapping
+from functools import cache
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.engine import Row
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+@cache
+def _list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+def _mapping(row: Row | Mapping[str, Any]) -> Mapping[str, Any]:
+    return row._mapping if isinstance(row, Row) else row
+
+
+def validate_rows(schema: type[SchemaT], rows: Iterable[Row | Mapping[str, Any]]) -> list[SchemaT]:
+    return _list_adapter(schema).validate_python([dict(_mapping(row)) for row in rows])
+
+
+def construct_rows(schema: type[SchemaT], rows: Iterable[Row | Mapping[str, Any]]) -> list[SchemaT]:
+    return [schema.model_construct(**_mapping(row)) for row in rows]
@@ -0,0 +1,100 @@
+"""
+Guards for calls to slow or rate-limited external services.
+
+`TokenBucket` spaces calls out to stay within a request quota; `CircuitBreaker` stops calling a service after
+`failure_threshold` consecutive failures and lets a single trial call through once `reset_timeout` has passed.
+Both are per worker process.
+"""
+import asyncio
+import enum
+from time import monotonic
+
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"{name} is unavailable after repeated failures; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, *, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_running = False
+
+    def retry_after(self) -> float:
+        """Seconds until a call would be let through; 0 if it would be now."""
+        if self.state is CircuitState.OPEN:
+            return max(0.0, self.opened_at + self.reset_timeout - monotonic())
+        if self.state is CircuitState.HALF_OPEN and self._trial_running:
+            return self.reset_timeout
+        return 0.0
+
+    def before_call(self) -> None:
+        """
+        Raise CircuitOpenError unless a call may go ahead; must be followed by record_success, record_failure or
+        record_abandoned.
+        """
+        retry_after = self.retry_after()
+        if retry_after > 0:
+            raise CircuitOpenError(self.name, retry_after)
+
+        if self.state is not CircuitState.CLOSED:
+            self.state = CircuitState.HALF_OPEN
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_running = False
+        if self.state is CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = CircuitState.OPEN
+            self.opened_at = monotonic()
+            self.times_opened += 1
+
+    def record_abandoned(self) -> None:
+        """A call was cancelled or closed before it finished; it says nothing about the backend, so only free the trial slot."""
+        self._trial_running = False
+
+
+class TokenBucket:
+    def __init__(self, *, rate: float, capacity: float) -> None:
+        """`rate` tokens are added per second, up to `capacity` (the allowed burst)."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> float:
+        """Take one token, waiting for it if needed; returns the seconds waited."""
+        async with self._lock:
+            self._refill()
+            waited = 0.0
+            if self.tokens < 1:
+                waited = (1 - self.tokens) / self.rate
+                await asyncio.sleep(waited)
+                self._refill()
+            self.tokens -= 1
+            return waited
@@ -0,0 +1,73 @@
+"""
+Per-worker cache of encoded JSON response bodies for public listings.
+
+Entries are keyed by route name and normalized query parameters and live for `ttl_seconds`. Any write that can
+change a listing calls `invalidate()`, which drops every entry; a body rendered while a write was in flight is not
+stored (see `generation`).
+"""
+from collections import OrderedDict
+from time import monotonic
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.core import settings
+
+
+class ResponseCache:
+    def __init__(self, *, capacity: int, ttl_seconds: float) -> None:
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._entries: OrderedDict[tuple, tuple[float, bytes]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(route_name: str, **params) -> tuple:
+        return (route_name, *sorted(params.items()))
+
+    def get(self, key: tuple) -> bytes | None:
+        cached = self._entries.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+
+        expires_at, body = cached
+        if monotonic() > expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: tuple, body: bytes, generation: int) -> None:
+        """Store a body rendered from data read while `generation` was current."""
+        if generation != self.generation:
+            return
+
+        self._entries[key] = (monotonic() + self.ttl_seconds, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+def encoded_body(value: BaseModel | bytes) -> bytes:
+    """Body of a service result that is either a response model or JSON already encoded (e.g. a sparse listing)."""
+    return value if isinstance(value, bytes) else value.model_dump_json().encode()
+
+
+listing_responses = ResponseCache(
+    capacity=settings.response_cache_entries,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+)
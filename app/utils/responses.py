@@ -0,0 +1,47 @@
+"""
+Project-wide JSON response class.
+
+Pydantic models are rendered with their own compiled serializer (`model_dump_json`), so a response built by a service
+is encoded in one pass. Everything else goes through orjson when it is installed and the standard library otherwise.
+"""
+import json
+from datetime import date
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.utils.tracing import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # orjson encodes dates natively; match its RFC 3339 output in the fallback
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode()
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode()
+
+
+def json_envelope(*, message: str, data: bytes | str, detail: Any = None) -> bytes:
+    """Encode an ApiResponse-shaped body around `data`, which is already encoded JSON (e.g. rendered by Postgres)."""
+    if isinstance(data, str):
+        data = data.encode()
+    return b'{"message":' + dumps(message) + b',"data":' + data + b',"detail":' + dumps(detail) + b"}"
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        with span("serialize response", "serialization"):
+            return dumps(content)
@@ -4,6 +4,7 @@ from loguru import logger
 from typing import Any, Callable
 from functools import wraps
 from app.utils import AppExceptionCase, response_5xx
+from app.utils.tracing import span
 
 class ServiceResult:
     def __init__(self, payload: Any):
@@ -42,7 +43,8 @@ def return_service(func: Callable) -> Callable:
     @wraps(func)
     async def wrapper(*args, **kwargs) -> ServiceResult:
         try:
-            result = await func(*args, **kwargs)
+            with span(func.__qualname__, "service"):
+                result = await func(*args, **kwargs)
             return ServiceResult(result)
         except Exception as e:
             if isinstance(e, AppExceptionCase):
@@ -0,0 +1,101 @@
+"""
+Single-flight coalescing for read-only service methods.
+
+Concurrent calls with the same key share one in-flight call instead of each querying the database. The key is the
+method's qualified name plus its arguments; repositories and services are left out (every request gets its own),
+pydantic models are keyed by their JSON dump. Apply it above `@return_service` so every caller receives the same
+`ServiceResult`, whose value must therefore be treated as read-only.
+
+The shared call runs on the leader's session, so an uncontended call costs nothing extra. That session is closed
+when the leader's request ends, so a leader that is cancelled while followers are waiting holds on until the call
+finishes; without followers the call is cancelled with it.
+"""
+import asyncio
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.database.repositories.base import BaseRepository
+from app.services.base import BaseService
+
+
+@dataclass
+class SingleFlightStats:
+    leaders: int = 0
+    coalesced: int = 0
+
+
+single_flight_stats: defaultdict[str, SingleFlightStats] = defaultdict(SingleFlightStats)
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    followers: int = 0
+
+
+_in_flight: dict[tuple, _Flight] = {}
+
+
+def _key_part(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return (type(value).__name__, value.model_dump_json())
+    return value
+
+
+def single_flight_key(name: str, args: tuple, kwargs: dict[str, Any]) -> tuple | None:
+    """Build the coalescing key, or None if an argument is unhashable and the call must run on its own."""
+    key = (
+        name,
+        tuple(_key_part(arg) for arg in args if not isinstance(arg, BaseRepository | BaseService)),
+        tuple(sorted((k, _key_part(v)) for k, v in kwargs.items() if not isinstance(v, BaseRepository | BaseService))),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def single_flight(func: Callable) -> Callable:
+    name = func.__qualname__
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = single_flight_key(name, args, kwargs)
+        if key is None:
+            return await func(*args, **kwargs)
+
+        flight = _in_flight.get(key)
+        if flight is not None:
+            single_flight_stats[name].coalesced += 1
+            flight.followers += 1
+            # A follower going away must not cancel the shared call for everyone else
+            return await asyncio.shield(flight.task)
+
+        single_flight_stats[name].leaders += 1
+        task = asyncio.ensure_future(func(*args, **kwargs))
+        flight = _in_flight[key] = _Flight(task)
+
+        def forget(_: asyncio.Task) -> None:
+            if _in_flight.get(key) is flight:
+                del _in_flight[key]
+
+        task.add_done_callback(forget)
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                if flight.followers:
+                    # The call runs on this request's session, which must stay open until the followers have their result
+                    await asyncio.wait([task])
+                else:
+                    _in_flight.pop(key, None)
+                    task.cancel()
+            raise
+
+    return wrapper
@@ -0,0 +1,14 @@
+"""Server-Sent Events framing for StreamingResponse bodies."""
+from typing import Any
+
+from app.utils.responses import dumps
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Keep proxies (e.g. nginx) from buffering or caching the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def encode_event(event: str, data: Any) -> bytes:
+    """One event whose data is `data` as single-line JSON."""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
@@ -0,0 +1,171 @@
+"""
+Stale-while-revalidate caching for read-only repository and service methods.
+
+Each decorated method gets a namespace with a soft and a hard TTL:
+
+- before the soft TTL a value is a hit, except that XFetch probabilistic early expiration (weighted by how long
+  the value took to compute) occasionally refreshes it ahead of time so keys do not all expire at once;
+- between the soft and hard TTL the stale value is returned immediately and one background task refreshes it;
+- after the hard TTL (or on first use) the caller computes the value, and concurrent callers for the same key
+  wait for that one computation.
+
+Background refreshes outlive the request and a miss is awaited by every concurrent caller, any of which may go away
+first, so both run with the repositories and services among the arguments (including `self`) rebuilt on a fresh
+session bound to the same engine. Refresh tasks are kept in `_refresh_tasks` until they finish so they are not
+garbage collected mid-flight. Keys follow `single_flight_key`; several methods may share a namespace,
+which is then invalidated and reported together.
+
+Caches are per worker and `invalidate_swr_cache` only clears the worker that handled the write: other workers keep
+serving the previous value until it passes the hard TTL, which bounds how stale a value can get.
+"""
+import asyncio
+import logging
+import math
+import random
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import wraps
+from time import monotonic
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.repositories.base import BaseRepository
+from app.services.base import BaseService
+from app.utils.singleflight import single_flight_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SWRStats:
+    hits: int = 0
+    stale: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    computed_at: float
+    compute_seconds: float
+
+
+swr_cache_stats: defaultdict[str, SWRStats] = defaultdict(SWRStats)
+
+_namespaces: dict[str, "OrderedDict[tuple, _Entry]"] = {}
+# Bumped on invalidation so values computed from data read before a write are not stored
+_generations: defaultdict[str, int] = defaultdict(int)
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+def _caller_session(args: tuple, kwargs: dict[str, Any]) -> AsyncSession | None:
+    """Session of the first repository or service among a call's arguments."""
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, BaseRepository):
+            return value.connection
+        if isinstance(value, BaseService):
+            return value.db
+    return None
+
+
+def _rebind_to_session(value: Any, session: AsyncSession) -> Any:
+    """A copy of a repository or service working on `session`; other values are returned as they are."""
+    if isinstance(value, BaseRepository):
+        return type(value)(session)
+    if isinstance(value, BaseService):
+        return type(value)(db=session)
+    return value
+
+
+async def _call_on_own_session(func: Callable, args: tuple, kwargs: dict[str, Any]) -> Any:
+    request_session = _caller_session(args, kwargs)
+    if request_session is None:
+        return await func(*args, **kwargs)
+
+    async with AsyncSession(bind=request_session.bind, expire_on_commit=False) as session:
+        return await func(
+            *(_rebind_to_session(arg, session) for arg in args),
+            **{name: _rebind_to_session(value, session) for name, value in kwargs.items()},
+        )
+
+
+def invalidate_swr_cache(namespace: str) -> None:
+    """Drop every cached value of a namespace, e.g. after a write that changes it."""
+    _generations[namespace] += 1
+    entries = _namespaces.get(namespace)
+    if entries is not None:
+        entries.clear()
+
+
+def swr_cache(namespace: str, *, soft_ttl: float, hard_ttl: float, beta: float = 1.0, capacity: int = 1024) -> Callable:
+    entries: OrderedDict[tuple, _Entry] = _namespaces.setdefault(namespace, OrderedDict())
+    loading: dict[tuple, asyncio.Task] = {}
+    refreshing: set[tuple] = set()
+    stats = swr_cache_stats[namespace]
+
+    def store(key: tuple, value: Any, started_at: float, generation: int) -> None:
+        if generation != _generations[namespace]:
+            return
+
+        now = monotonic()
+        entries[key] = _Entry(value=value, computed_at=now, compute_seconds=now - started_at)
+        entries.move_to_end(key)
+        while len(entries) > capacity:
+            entries.popitem(last=False)
+
+    def decorator(func: Callable) -> Callable:
+        async def compute(key: tuple, args: tuple, kwargs: dict[str, Any]) -> Any:
+            started_at, generation = monotonic(), _generations[namespace]
+            value = await _call_on_own_session(func, args, kwargs)
+            store(key, value, started_at, generation)
+            return value
+
+        async def refresh(key: tuple, args: tuple, kwargs: dict[str, Any]) -> None:
+            stats.refreshes += 1
+            try:
+                await compute(key, args, kwargs)
+            except Exception:
+                stats.refresh_errors += 1
+                logger.exception("Background refresh of %s failed", namespace)
+            finally:
+                refreshing.discard(key)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = single_flight_key(func.__qualname__, args, kwargs)
+            if key is None:
+                return await func(*args, **kwargs)
+
+            entry = entries.get(key)
+            if entry is not None:
+                age = monotonic() - entry.computed_at
+                if age < hard_ttl:
+                    entries.move_to_end(key)
+                    # XFetch: -log(U) is exponentially distributed, so expensive values refresh a bit earlier
+                    early = entry.compute_seconds * beta * -math.log(1.0 - random.random())
+                    if age + early < soft_ttl:
+                        stats.hits += 1
+                    else:
+                        stats.stale += 1
+                        if key not in refreshing:
+                            refreshing.add(key)
+                            task = asyncio.ensure_future(refresh(key, args, kwargs))
+                            _refresh_tasks.add(task)
+                            task.add_done_callback(_refresh_tasks.discard)
+                    return entry.value
+
+            stats.misses += 1
+            task = loading.get(key)
+            if task is None:
+                task = asyncio.ensure_future(compute(key, args, kwargs))
+                loading[key] = task
+                task.add_done_callback(lambda _: loading.pop(key, None))
+            return await asyncio.shield(task)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,420 @@
+"""
+Minimal request tracing.
+
+`TracingMiddleware` opens a root span for every sampled HTTP request, named after the route template and tagged
+with the request's correlation id (which is also used as the trace id when it is a 32-digit hex id). Inside it
+`span()` opens child spans: `return_service` and `db_error_handler` open one per service and repository call,
+`FastJSONResponse` one for serialization and `instrument_engine` one per SQL statement. Outside a sampled request
+`span()` returns a shared no-op context manager, so instrumented code costs a context variable lookup.
+
+When the root span ends, the whole trace is handed to the exporters configured on `tracer`: `RingBufferExporter`
+keeps the latest traces in memory for the admin endpoint, `JsonLinesExporter` appends spans to a file and
+`OTLPHttpExporter` posts them to an OpenTelemetry collector as OTLP/HTTP JSON. The last two write from a background
+thread, so a slow disk or collector never blocks the event loop; traces that do not fit in their queue are dropped.
+"""
+import json
+import logging
+import queue
+import random
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import time_ns
+from typing import Any
+
+import httpx
+from asgi_correlation_id.context import correlation_id
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import route_label
+
+logger = logging.getLogger(__name__)
+
+_HEX_TRACE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time_ns()) - self.start_ns) / 1e6
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _Trace:
+    """Spans of one trace collected while its root is open; spans ending after the root (e.g. tasks it spawned) are dropped."""
+
+    __slots__ = ("spans", "finished")
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self.finished = False
+
+
+_current: ContextVar[tuple[_Trace, Span] | None] = ContextVar("current_span", default=None)
+
+_NO_SPAN = nullcontext()
+
+
+def current_span() -> Span | None:
+    current = _current.get()
+    return current[1] if current is not None else None
+
+
+def _open(name: str, kind: str, attributes: dict[str, Any]) -> tuple[_Trace, Span] | None:
+    current = _current.get()
+    if current is None:
+        return None
+    trace, parent = current
+    return trace, Span(name, kind, parent.trace_id, _new_span_id(), parent.span_id, time_ns(), attributes=attributes)
+
+
+def _close(trace: _Trace, span: Span, exc: BaseException | None) -> None:
+    span.end_ns = time_ns()
+    if exc is not None:
+        span.error = f"{type(exc).__name__}: {exc}"
+    if not trace.finished:
+        trace.spans.append(span)
+
+
+class _SpanScope:
+    __slots__ = ("trace", "span", "token")
+
+    def __init__(self, trace: _Trace, span: Span) -> None:
+        self.trace = trace
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.token = _current.set((self.trace, self.span))
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self.token)
+        _close(self.trace, self.span, exc)
+
+
+def span(name: str, kind: str = "internal", **attributes: Any) -> _SpanScope | nullcontext:
+    """Context manager timing a child of the current span; does nothing (and yields None) outside a trace."""
+    opened = _open(name, kind, attributes)
+    if opened is None:
+        return _NO_SPAN
+    return _SpanScope(*opened)
+
+
+class _RootScope:
+    def __init__(self, tracer: "Tracer", root: Span) -> None:
+        self.tracer = tracer
+        self.trace = _Trace()
+        self.root = root
+
+    def __enter__(self) -> Span:
+        self.token = _current.set((self.trace, self.root))
+        return self.root
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self.token)
+        _close(self.trace, self.root, exc)
+        self.trace.finished = True
+        self.tracer.export(self.trace.spans)
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.sample_rate = 1.0
+        self.exporters: list[RingBufferExporter | BackgroundExporter] = []
+        self.buffer: RingBufferExporter | None = None
+
+    def configure(self, exporters: list, *, sample_rate: float = 1.0) -> None:
+        self.sample_rate = sample_rate
+        self.exporters = list(exporters)
+        self.buffer = next((exporter for exporter in exporters if isinstance(exporter, RingBufferExporter)), None)
+
+    def shutdown(self) -> None:
+        exporters, self.exporters, self.buffer = self.exporters, [], None
+        for exporter in exporters:
+            exporter.shutdown()
+
+    def start_trace(
+        self, name: str, kind: str = "server", *, trace_id: str | None = None, **attributes: Any
+    ) -> _RootScope | nullcontext:
+        """Open a root span unless tracing is off or the trace is not sampled; nested calls open a child span instead."""
+        if _current.get() is not None:
+            return span(name, kind, **attributes)
+        if not self.exporters or random.random() >= self.sample_rate:
+            return _NO_SPAN
+
+        root = Span(name, kind, trace_id or _new_trace_id(), _new_span_id(), None, time_ns(), attributes=attributes)
+        return _RootScope(self, root)
+
+    def export(self, spans: list[Span]) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception:
+                logger.exception("Trace exporter %s failed", type(exporter).__name__)
+
+
+tracer = Tracer()
+
+
+class RingBufferExporter:
+    """The most recent `capacity` traces, each a list of spans with the root last."""
+
+    def __init__(self, capacity: int) -> None:
+        self.traces: deque[list[Span]] = deque(maxlen=capacity)
+
+    def export(self, spans: list[Span]) -> None:
+        self.traces.append(spans)
+
+    def recent(self, limit: int | None = None, *, min_duration_ms: float = 0.0) -> list[list[Span]]:
+        """Newest first."""
+        found = []
+        for spans in reversed(self.traces):
+            if spans[-1].duration_ms >= min_duration_ms:
+                found.append(spans)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def shutdown(self) -> None:
+        pass
+
+
+class BackgroundExporter(ABC):
+    """Queues finished traces and hands them to `write` in batches of up to `batch_size` spans on a daemon thread."""
+
+    def __init__(self, *, max_queue: int = 10_000, batch_size: int = 512) -> None:
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue: queue.Queue[list[Span] | None] = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def export(self, spans: list[Span]) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += len(spans)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = list(item)
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.extend(item)
+            try:
+                self.write(batch)
+            except Exception:
+                logger.warning("%s could not export %s spans", type(self).__name__, len(batch), exc_info=True)
+        self.close()
+
+    @abstractmethod
+    def write(self, spans: list[Span]) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Export what is queued, then stop the thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+class JsonLinesExporter(BackgroundExporter):
+    """Appends one JSON object per span to `path`."""
+
+    def __init__(self, path: str, **kwargs) -> None:
+        self._file = open(path, "a", encoding="utf-8")
+        super().__init__(**kwargs)
+
+    def write(self, spans: list[Span]) -> None:
+        self._file.writelines(json.dumps(span.as_dict(), default=str) + "\n" for span in spans)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+# OTLP span kinds and status codes (opentelemetry/proto/trace/v1/trace.proto)
+OTLP_SPAN_KINDS = {"internal": 1, "server": 2, "client": 3, "sql": 3}
+OTLP_STATUS_UNSET = 0
+OTLP_STATUS_ERROR = 2
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def otlp_payload(spans: list[Span], service_name: str) -> dict[str, Any]:
+    """An ExportTraceServiceRequest in the OTLP/JSON encoding (hex ids, 64-bit integers as strings)."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [
+                    {
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        "parentSpanId": span.parent_id or "",
+                        "name": span.name,
+                        "kind": OTLP_SPAN_KINDS.get(span.kind, 1),
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": _otlp_attributes({"span.kind": span.kind, **span.attributes}),
+                        "status": (
+                            {"code": OTLP_STATUS_ERROR, "message": span.error}
+                            if span.error else {"code": OTLP_STATUS_UNSET}
+                        ),
+                    }
+                    for span in spans
+                ],
+            }],
+        }],
+    }
+
+
+class OTLPHttpExporter(BackgroundExporter):
+    """Posts batches to an OTLP/HTTP traces endpoint, e.g. http://localhost:4318/v1/traces of a collector."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        *,
+        service_name: str,
+        headers: dict[str, str] | None = None,
+        timeout: float = 10.0,
+        **kwargs,
+    ) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._client = httpx.Client(headers=headers, timeout=timeout)
+        super().__init__(**kwargs)
+
+    def write(self, spans: list[Span]) -> None:
+        response = self._client.post(self.endpoint, json=otlp_payload(spans, self.service_name))
+        response.raise_for_status()
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        request_id = correlation_id.get()
+        trace_id = request_id if request_id and _HEX_TRACE_ID.match(request_id) else None
+        trace_scope = tracer.start_trace(
+            f"{method} {scope['path']}", trace_id=trace_id, correlation_id=request_id, **{"http.method": method}
+        )
+        if trace_scope is _NO_SPAN:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with trace_scope as root:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = route_label(scope, root_path)
+                root.name = f"{method} {route}"
+                root.attributes["http.route"] = route
+                root.attributes["http.status_code"] = status
+
+
+def instrument_engine(engine, *, max_statement_length: int = 1000) -> None:
+    """Record every statement run on `engine` (sync or async) inside a trace as a "sql" span; parameters are not kept."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        opened = _open("SQL", "sql", {"db.statement": statement[:max_statement_length], "db.executemany": executemany})
+        if opened is not None and context is not None:
+            context._trace_span = opened
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        opened = getattr(context, "_trace_span", None)
+        if opened is not None:
+            context._trace_span = None
+            _close(*opened, None)
+
+    def handle_error(exception_context):
+        opened = getattr(exception_context.execution_context, "_trace_span", None)
+        if opened is not None:
+            exception_context.execution_context._trace_span = None
+            _close(*opened, exception_context.original_exception)
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(sync_engine, "handle_error", handle_error)
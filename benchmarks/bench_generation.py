@@ -0,0 +1,70 @@
+"""
+Measure quiz generation latency and throughput offline, through the same chunking, concurrency cap, rate limiter
+and circuit breaker as production, with the fake LLM provider standing in for the model.
+
+    python -m benchmarks.bench_generation --latency 1.0 --concurrency 8 --requests 40 --error-rate 0.05
+
+The rate limit defaults to unlimited so the cap and chunking are what is measured; pass --requests-per-minute to
+include it.
+"""
+import argparse
+import asyncio
+from statistics import median
+from time import perf_counter
+
+from app.core import settings
+from app.services.gemini_ai import GeminiAIService, gemini_circuit, gemini_stats
+
+
+async def generate(service: GeminiAIService, num_questions: int, index: int) -> float | None:
+    started = perf_counter()
+    try:
+        await service.generate_quiz_from_prompt(f"benchmark topic {index}", num_questions)
+    except Exception:
+        return None
+    return perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    bench_settings = settings.model_copy(update={
+        "llm_provider": "fake",
+        "fake_llm_latency_seconds": args.latency,
+        "fake_llm_error_rate": args.error_rate,
+        "gemini_max_concurrency": args.max_concurrency,
+        "gemini_requests_per_minute": args.requests_per_minute,
+        "gemini_burst": args.max_concurrency,
+    })
+
+    for num_questions in args.questions:
+        service = GeminiAIService(bench_settings)
+        gemini_circuit.record_success()
+        calls_before = gemini_stats.calls
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def bounded(index: int) -> float | None:
+            async with semaphore:
+                return await generate(service, num_questions, index)
+
+        started = perf_counter()
+        results = await asyncio.gather(*(bounded(index) for index in range(args.requests)))
+        elapsed = perf_counter() - started
+
+        latencies = sorted(seconds for seconds in results if seconds is not None)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else float("nan")
+        print(
+            f"{num_questions:>3} questions  {len(latencies)}/{args.requests} ok  "
+            f"p50 {median(latencies) if latencies else float('nan'):6.2f}s  p95 {p95:6.2f}s  "
+            f"{args.requests / elapsed:6.2f} quizzes/s  {gemini_stats.calls - calls_before} model calls"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4, help="quizzes generated at once")
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds per fake model call")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=settings.gemini_max_concurrency)
+    parser.add_argument("--requests-per-minute", type=float, default=1e9)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,127 @@
+"""
+Compare the regular FastAPI response path with PrevalidatedRoute + FastJSONResponse on the largest payloads:
+a quiz detail and an attempt detail with many questions, options and answers.
+
+    python -m benchmarks.bench_responses --questions 100 --options 6 --requests 300
+"""
+import argparse
+import asyncio
+from datetime import UTC, datetime
+from time import perf_counter
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from httpx import ASGITransport, AsyncClient
+
+from app.api.routing import PrevalidatedRoute
+from app.schemas.quiz import QuizDetailResponse
+from app.schemas.quiz_attempt import AttemptDetailResponse
+from app.utils.responses import FastJSONResponse
+
+
+def build_payloads(questions: int, options: int) -> tuple[QuizDetailResponse, AttemptDetailResponse]:
+    now = datetime.now(UTC).isoformat()
+    question_rows = [
+        {
+            "id": q,
+            "quiz_id": 1,
+            "question_text": f"Question {q} " + "lorem ipsum " * 8,
+            "question_type": "single",
+            "points": 1,
+            "options": [
+                {"id": q * options + o, "question_id": q, "option_text": f"Option {o} of {q}", "is_correct": o == 0}
+                for o in range(options)
+            ],
+        }
+        for q in range(1, questions + 1)
+    ]
+    quiz = QuizDetailResponse.model_validate(
+        {
+            "message": "Quiz retrieved successfully",
+            "data": {
+                "id": 1,
+                "title": "Benchmark quiz",
+                "description": "A large quiz",
+                "creator_id": 1,
+                "tags": [{"id": 1, "name": "bench"}],
+                "created_at": now,
+                "updated_at": now,
+                "questions": question_rows,
+            },
+        }
+    )
+    attempt = AttemptDetailResponse.model_validate(
+        {
+            "message": "Attempt details retrieved successfully",
+            "data": {
+                "id": 1,
+                "quiz_id": 1,
+                "user_id": 1,
+                "attempt_no": 1,
+                "score": questions,
+                "started_at": now,
+                "finished_at": now,
+                "questions": question_rows,
+                "user_answers": [
+                    {
+                        "id": q,
+                        "attempt_id": 1,
+                        "question_id": q,
+                        "selected_option_ids": [q * options],
+                        "is_correct": True,
+                        "submitted_at": now,
+                    }
+                    for q in range(1, questions + 1)
+                ],
+            },
+        }
+    )
+    return quiz, attempt
+
+
+def build_app(route_class: type[APIRoute], response_class: type[JSONResponse], quiz, attempt) -> FastAPI:
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/quizzes/1/detail", response_model=QuizDetailResponse)
+    async def quiz_detail():
+        return quiz
+
+    @router.get("/attempts/1/details", response_model=AttemptDetailResponse)
+    async def attempt_details():
+        return attempt
+
+    app = FastAPI(default_response_class=response_class)
+    app.include_router(router)
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> tuple[float, int]:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        body = (await client.get(path)).content
+        started = perf_counter()
+        for _ in range(requests):
+            await client.get(path)
+        return (perf_counter() - started) / requests, len(body)
+
+
+async def main(questions: int, options: int, requests: int) -> None:
+    quiz, attempt = build_payloads(questions, options)
+    variants = {
+        "fastapi default": build_app(APIRoute, JSONResponse, quiz, attempt),
+        "prevalidated": build_app(PrevalidatedRoute, FastJSONResponse, quiz, attempt),
+    }
+
+    for path in ("/quizzes/1/detail", "/attempts/1/details"):
+        for name, app in variants.items():
+            seconds, size = await measure(app, path, requests)
+            print(f"{path:<22} {name:<16} {seconds * 1000:8.3f} ms/request  {size} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--options", type=int, default=6)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main(args.questions, args.options, args.requests))
@@ -0,0 +1,200 @@
+from os import environ
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_404_NOT_FOUND
+
+environ["APP_ENV"] = "test"
+
+pytestmark = pytest.mark.asyncio
+
+
+async def create_quiz(app: FastAPI, client: AsyncClient, admin: dict) -> dict:
+    """A quiz of three single-choice questions worth one point each, as its detail document."""
+    quiz_in = dict(
+        title="Arithmetic",
+        tag_names=["math"],
+        questions=[
+            dict(
+                question_text=f"{n} + {n}?",
+                question_type="single",
+                options=[dict(option_text=str(2 * n), is_correct=True), dict(option_text=str(2 * n + 1))],
+            )
+            for n in range(1, 4)
+        ],
+    )
+    response = await client.post(app.url_path_for("quizzes:create"), json=quiz_in, headers=admin["headers"])
+    assert response.status_code == HTTP_201_CREATED
+
+    response = await client.get(app.url_path_for("quizzes:get_by_id", quiz_id=response.json()["data"]["id"]))
+    return response.json()["data"]
+
+
+async def play(app: FastAPI, client: AsyncClient, user: dict, quiz: dict, *, correct: int) -> dict:
+    """Start, answer (the first `correct` questions right, the rest wrong) and submit an attempt; returns its result."""
+    response = await client.post(app.url_path_for("attempts:start_quiz", quiz_id=quiz["id"]), headers=user["headers"])
+    assert response.status_code == HTTP_201_CREATED
+    attempt_id = response.json()["data"]["id"]
+
+    answers = [
+        dict(
+            question_id=question["id"],
+            selected_option_ids=[next(option["id"] for option in question["options"] if option["is_correct"] == (index < correct))],
+        )
+        for index, question in enumerate(quiz["questions"])
+    ]
+    response = await client.post(app.url_path_for("answers:submit_to_attempt", attempt_id=attempt_id), json=answers, headers=user["headers"])
+    assert response.status_code == HTTP_201_CREATED
+
+    response = await client.post(app.url_path_for("attempts:submit_attempt", attempt_id=attempt_id), json={}, headers=user["headers"])
+    assert response.status_code == HTTP_200_OK
+    return response.json()["data"]
+
+
+async def total_score(app: FastAPI, client: AsyncClient, user: dict) -> int:
+    response = await client.get(app.url_path_for("auth:info"), headers=user["headers"])
+    return response.json()["data"]["total_score"]
+
+
+async def test_total_score_counts_only_improvements_on_each_quiz(app: FastAPI, client: AsyncClient, new_user) -> None:
+    admin = await new_user(admin=True)
+    quiz, other_quiz = await create_quiz(app, client, admin), await create_quiz(app, client, admin)
+    user = await new_user()
+    assert await total_score(app, client, user) == 0
+
+    await play(app, client, user, quiz, correct=2)
+    assert await total_score(app, client, user) == 2
+
+    await play(app, client, user, quiz, correct=1)  # worse than the best, nothing credited
+    assert await total_score(app, client, user) == 2
+
+    await play(app, client, user, quiz, correct=3)  # only the improvement over the best is credited
+    assert await total_score(app, client, user) == 3
+
+    await play(app, client, user, other_quiz, correct=1)
+    assert await total_score(app, client, user) == 4
+
+
+async def global_leaderboard(app: FastAPI, client: AsyncClient, **params) -> list[dict]:
+    """Every entry of the global leaderboard, walked page by page."""
+    entries, page_params = [], dict(limit=10, **params)
+    while True:
+        response = await client.get(app.url_path_for("users:leaderboard"), params=page_params)
+        assert response.status_code == HTTP_200_OK
+        page = response.json()["data"]
+        entries += page["entries"]
+        if page["next_after_id"] is None:
+            return entries
+        page_params.update(after_score=page["next_after_score"], after_id=page["next_after_id"])
+
+
+async def test_global_leaderboard_pages_by_total_score(app: FastAPI, client: AsyncClient, new_user) -> None:
+    admin = await new_user(admin=True)
+    quiz = await create_quiz(app, client, admin)
+    user = await new_user()
+    await play(app, client, user, quiz, correct=3)
+
+    entries = await global_leaderboard(app, client)
+    ordering = [(-entry["total_score"], entry["user_id"]) for entry in entries]
+    assert ordering == sorted(ordering)
+    assert len({entry["user_id"] for entry in entries}) == len(entries)
+    assert dict(user_id=user["id"], username=user["username"], total_score=3) in entries
+
+
+async def leaderboard_position(app: FastAPI, client: AsyncClient, user: dict, quiz: dict, neighbours: int) -> dict:
+    response = await client.get(
+        app.url_path_for("quizzes:get_leaderboard_position", quiz_id=quiz["id"]),
+        params=dict(neighbours=neighbours),
+        headers=user["headers"],
+    )
+    assert response.status_code == HTTP_200_OK
+    return response.json()["data"]
+
+
+def ranks(entries: list[dict]) -> list[tuple[int, int, int]]:
+    return [(entry["rank"], entry["user_id"], entry["score"]) for entry in entries]
+
+
+async def test_rank_breaks_ties_by_who_reached_the_score_first(app: FastAPI, client: AsyncClient, new_user) -> None:
+    admin = await new_user(admin=True)
+    quiz = await create_quiz(app, client, admin)
+    first, second, third, fourth = [await new_user() for _ in range(4)]
+    await play(app, client, first, quiz, correct=3)
+    await play(app, client, second, quiz, correct=2)
+    await play(app, client, third, quiz, correct=2)
+    await play(app, client, fourth, quiz, correct=1)
+    await play(app, client, second, quiz, correct=2)  # equalling the best does not move it later
+
+    position = await leaderboard_position(app, client, third, quiz, neighbours=1)
+    assert ranks([position["entry"]]) == [(3, third["id"], 2)]
+    assert ranks(position["above"]) == [(2, second["id"], 2)]
+    assert ranks(position["below"]) == [(4, fourth["id"], 1)]
+
+    position = await leaderboard_position(app, client, first, quiz, neighbours=2)
+    assert ranks([position["entry"]]) == [(1, first["id"], 3)]
+    assert position["above"] == []
+    assert ranks(position["below"]) == [(2, second["id"], 2), (3, third["id"], 2)]
+
+    position = await leaderboard_position(app, client, second, quiz, neighbours=2)
+    assert position["entry"]["attempt_number"] == 1
+    assert ranks(position["above"]) == [(1, first["id"], 3)]
+    assert ranks(position["below"]) == [(3, third["id"], 2), (4, fourth["id"], 1)]
+
+
+async def test_rank_lookup_without_a_finished_attempt_is_not_found(app: FastAPI, client: AsyncClient, new_user) -> None:
+    admin = await new_user(admin=True)
+    quiz = await create_quiz(app, client, admin)
+    user = await new_user()
+
+    response = await client.get(app.url_path_for("quizzes:get_leaderboard_position", quiz_id=quiz["id"]), headers=user["headers"])
+    assert response.status_code == HTTP_404_NOT_FOUND
+    assert response.json()["context"]["reason"] == "You have no finished attempts for this quiz"
+
+
+async def test_best_attempts_keep_the_first_attempt_reaching_the_best_score(app: FastAPI, client: AsyncClient, new_user) -> None:
+    admin = await new_user(admin=True)
+    quiz, other_quiz = await create_quiz(app, client, admin), await create_quiz(app, client, admin)
+    user = await new_user()
+
+    await play(app, client, user, quiz, correct=1)
+    improved = await play(app, client, user, quiz, correct=3)
+    await play(app, client, user, quiz, correct=3)  # equalling the best is not an improvement
+    await play(app, client, user, quiz, correct=2)
+    other = await play(app, client, user, other_quiz, correct=2)
+
+    response = await client.get(app.url_path_for("attempts:get_user_best_attempts"), headers=user["headers"])
+    assert response.status_code == HTTP_200_OK
+    latest, best = response.json()["data"]
+
+    assert (latest["quiz_id"], latest["best_score"], latest["best_attempt_id"], latest["attempts_count"]) == (other_quiz["id"], 2, other["attempt_id"], 1)
+    assert latest["best_finished_at"] == latest["last_finished_at"]
+    assert (best["quiz_id"], best["best_score"], best["best_attempt_id"], best["attempts_count"]) == (quiz["id"], 3, improved["attempt_id"], 4)
+    assert best["best_finished_at"] != best["last_finished_at"]
+
+    # the leaderboard reads the same summary
+    position = await leaderboard_position(app, client, user, quiz, neighbours=0)
+    assert (position["entry"]["score"], position["entry"]["attempt_number"]) == (3, improved["attempt_no"])
+
+
+@pytest.mark.parametrize("window", ["day", "week"])
+async def test_windowed_leaderboards_rank_scores_of_the_current_bucket(app: FastAPI, client: AsyncClient, new_user, window: str) -> None:
+    admin = await new_user(admin=True)
+    quiz, other_quiz = await create_quiz(app, client, admin), await create_quiz(app, client, admin)
+    leader, runner_up = await new_user(), await new_user()
+    await play(app, client, runner_up, quiz, correct=1)
+    await play(app, client, runner_up, quiz, correct=2)
+    await play(app, client, leader, quiz, correct=3)
+    await play(app, client, leader, other_quiz, correct=1)
+
+    response = await client.get(app.url_path_for("quizzes:get_leaderboard", quiz_id=quiz["id"]), params=dict(window=window))
+    assert response.status_code == HTTP_200_OK
+    board = response.json()["data"]
+    assert board["window"] == window
+    assert [(entry["user_id"], entry["score"], entry["rank"]) for entry in board["entries"]] == [(leader["id"], 3, 1), (runner_up["id"], 2, 2)]
+
+    entries = await global_leaderboard(app, client, window=window)
+    assert dict(user_id=leader["id"], username=leader["username"], total_score=4) in entries
+    assert dict(user_id=runner_up["id"], username=runner_up["username"], total_score=2) in entries
+    ordering = [(-entry["total_score"], entry["user_id"]) for entry in entries]
+    assert ordering == sorted(ordering)
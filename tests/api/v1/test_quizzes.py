@@ -0,0 +1,147 @@
+from os import environ
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_403_FORBIDDEN,
+)
+
+environ["APP_ENV"] = "test"
+
+pytestmark = pytest.mark.asyncio
+
+
+def new_quiz() -> dict:
+    return dict(
+        title="Capitals",
+        description="European capitals",
+        tag_names=["geography"],
+        questions=[
+            dict(
+                question_text="Capital of France?",
+                question_type="single",
+                points=2,
+                options=[dict(option_text="Paris", is_correct=True), dict(option_text="Lyon")],
+            ),
+            dict(
+                question_text="Capital of Spain?",
+                question_type="single",
+                options=[dict(option_text="Madrid", is_correct=True), dict(option_text="Seville")],
+            ),
+        ],
+    )
+
+
+async def create_quiz(app: FastAPI, client: AsyncClient, admin: dict) -> dict:
+    response = await client.post(app.url_path_for("quizzes:create"), json=new_quiz(), headers=admin["headers"])
+    assert response.status_code == HTTP_201_CREATED
+    return await get_quiz(app, client, response.json()["data"]["id"])
+
+
+async def get_quiz(app: FastAPI, client: AsyncClient, quiz_id: int) -> dict:
+    response = await client.get(app.url_path_for("quizzes:get_by_id", quiz_id=quiz_id))
+    assert response.status_code == HTTP_200_OK
+    return response.json()["data"]
+
+
+async def update_questions(app: FastAPI, client: AsyncClient, admin: dict, quiz_id: int, questions: list[dict]):
+    return await client.put(
+        app.url_path_for("quizzes:update", quiz_id=quiz_id),
+        json=dict(questions=questions),
+        headers=admin["headers"],
+    )
+
+
+def as_update(question: dict) -> dict:
+    """A question of the quiz document as it is sent back unchanged, ids included."""
+    return dict(
+        id=question["id"],
+        question_text=question["question_text"],
+        question_type=question["question_type"],
+        points=question["points"],
+        options=[dict(id=option["id"], option_text=option["option_text"], is_correct=option["is_correct"]) for option in question["options"]],
+    )
+
+
+async def test_quiz_detail_timestamps_match_the_list_format(app: FastAPI, client: AsyncClient, new_user) -> None:
+    admin = await new_user(admin=True)
+    response = await client.post(app.url_path_for("quizzes:create"), json=new_quiz(), headers=admin["headers"])
+    created = response.json()["data"]
+
+    quiz = await get_quiz(app, client, created["id"])
+
+    assert quiz["created_at"] == created["created_at"]
+    assert quiz["created_at"].endswith("Z")
+    assert quiz["deleted_at"] is None
+    assert all(question["created_at"].endswith("Z") for question in quiz["questions"])
+
+
+async def test_update_edits_questions_and_options_in_place(app: FastAPI, client: AsyncClient, new_user) -> None:
+    admin = await new_user(admin=True)
+    quiz = await create_quiz(app, client, admin)
+    questions = [as_update(question) for question in quiz["questions"]]
+    questions[0]["question_text"] = "What is the capital of France?"
+    questions[0]["options"][1]["option_text"] = "Marseille"
+
+    response = await update_questions(app, client, admin, quiz["id"], questions)
+    assert response.status_code == HTTP_200_OK
+
+    updated = await get_quiz(app, client, quiz["id"])
+    assert [as_update(question) for question in updated["questions"]] == questions
+    # the untouched question keeps its row as it was
+    assert updated["questions"][1]["updated_at"] == quiz["questions"][1]["updated_at"]
+
+
+async def test_update_deletes_missing_questions_and_inserts_new_ones(app: FastAPI, client: AsyncClient, new_user) -> None:
+    admin = await new_user(admin=True)
+    quiz = await create_quiz(app, client, admin)
+    kept = as_update(quiz["questions"][0])
+    kept["options"] = kept["options"][:1] + [dict(option_text="Nice")]
+    inserted = dict(question_text="Capital of Italy?", question_type="text", points=1, options=[])
+
+    response = await update_questions(app, client, admin, quiz["id"], [kept, inserted])
+    assert response.status_code == HTTP_200_OK
+
+    first, second = (await get_quiz(app, client, quiz["id"]))["questions"]
+    assert first["id"] == kept["id"]
+    assert [option["option_text"] for option in first["options"]] == ["Paris", "Nice"]
+    assert first["options"][0]["id"] == kept["options"][0]["id"]
+    assert second["id"] not in {question["id"] for question in quiz["questions"]}
+    assert second["question_text"] == "Capital of Italy?"
+
+
+async def test_update_rejects_ids_that_are_foreign_or_repeated(app: FastAPI, client: AsyncClient, new_user) -> None:
+    admin = await new_user(admin=True)
+    quiz = await create_quiz(app, client, admin)
+    other_quiz = await create_quiz(app, client, admin)
+    first, second = (as_update(question) for question in quiz["questions"])
+    foreign = as_update(other_quiz["questions"][0])
+
+    response = await update_questions(app, client, admin, quiz["id"], [first, foreign])
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert response.json()["context"]["reason"] == f"Questions {[foreign['id']]} do not belong to this quiz"
+
+    response = await update_questions(app, client, admin, quiz["id"], [first, first, second])
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert response.json()["context"]["reason"] == f"Questions {[first['id']]} do not belong to this quiz"
+
+    second["options"].append(dict(foreign["options"][0]))
+    response = await update_questions(app, client, admin, quiz["id"], [first, second])
+    assert response.status_code == HTTP_400_BAD_REQUEST
+    assert response.json()["context"]["reason"] == f"Options {[foreign['options'][0]['id']]} do not belong to question {second['id']}"
+
+    # nothing was applied
+    assert await get_quiz(app, client, quiz["id"]) == quiz
+
+
+async def test_update_requires_an_admin(app: FastAPI, client: AsyncClient, new_user) -> None:
+    admin = await new_user(admin=True)
+    quiz = await create_quiz(app, client, admin)
+    student = await new_user()
+
+    response = await update_questions(app, client, student, quiz["id"], [])
+    assert response.status_code == HTTP_403_FORBIDDEN
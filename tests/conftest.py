@@ -1,11 +1,13 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Awaitable, Callable
 from os import environ
 from typing import Any
+from uuid import uuid4
 
 import pytest_asyncio
 from asgi_lifespan import LifespanManager
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -51,6 +53,31 @@ async def client(initialized_app: FastAPI) -> AsyncGenerator[AsyncClient]:
         yield client
 
 
+@pytest_asyncio.fixture
+def new_user(initialized_app: FastAPI, client: AsyncClient) -> Callable[..., Awaitable[dict[str, Any]]]:
+    """Sign up and sign in a user with unique credentials, promoted to admin if asked; returns it with auth headers."""
+    from app.core import settings
+    from app.models.user import User, UserRole
+
+    async def create(*, admin: bool = False) -> dict[str, Any]:
+        name = f"tester_{uuid4().hex[:12]}"
+        user: dict[str, Any] = dict(username=name, password="123", email=f"{name}@test.com")
+        response = await client.post(initialized_app.url_path_for("auth:signup"), json=user)
+        user["id"] = response.json()["data"]["id"]
+
+        if admin:
+            async with initialized_app.state.pool() as session:
+                await session.execute(update(User).where(User.id == user["id"]).values(role=UserRole.ADMIN))
+                await session.commit()
+
+        response = await client.post(initialized_app.url_path_for("auth:signin"), json=user)
+        access_token = response.json()["data"]["token"]["access_token"]
+        user["headers"] = {"Authorization": f"{settings.jwt_token_prefix} {access_token}", **client.headers}
+        return user
+
+    return create
+
+
 @pytest_asyncio.fixture(scope="module")
 def random_user() -> dict[str, str]:
     return dict(
@@ -0,0 +1,69 @@
+import asyncio
+
+from app.services import answers
+from app.services.answers import get_question_key
+from app.utils.answer_keys import AnswerKeyCache, QuestionKey
+
+
+def test_question_key_grades_selected_options():
+    single = QuestionKey(question_type="single", points=1, correct_option_ids=frozenset({2}))
+    multiple = QuestionKey(question_type="multiple", points=2, correct_option_ids=frozenset({1, 3}))
+    text = QuestionKey(question_type="text", points=1, correct_option_ids=frozenset())
+
+    assert single.grade([2]) is True
+    assert single.grade([2, 2]) is True
+    assert single.grade([1, 2]) is False
+    assert multiple.grade([3, 1]) is True
+    assert multiple.grade([1]) is False
+    assert text.grade(None) is None
+
+
+def test_invalidate_drops_question_lookup():
+    cache = AnswerKeyCache(capacity=1, ttl_seconds=60)
+    key = QuestionKey(question_type="single", points=1, correct_option_ids=frozenset({1}))
+
+    cache.store(1, {10: key}, cache.generation)
+    assert cache.quiz_id_for_question(10) == 1
+
+    cache.store(2, {20: key}, cache.generation)  # evicts quiz 1
+    assert cache.get(1) is None
+    assert cache.quiz_id_for_question(10) is None
+    assert cache.get(2) == {20: key}
+
+
+def test_a_key_compiled_before_an_invalidation_is_not_stored():
+    cache = AnswerKeyCache(capacity=4, ttl_seconds=60)
+    key = QuestionKey(question_type="single", points=1, correct_option_ids=frozenset({1}))
+
+    generation = cache.generation
+    cache.invalidate(1)  # a write lands while the key is being compiled
+    assert cache.store(1, {10: key}, generation) == {10: key}
+    assert cache.get(1) is None
+
+    cache.store(1, {10: key}, cache.generation)
+    assert cache.get(1) == {10: key}
+
+
+def test_a_question_added_on_another_worker_rebuilds_the_cached_key_once(monkeypatch):
+    cache = AnswerKeyCache(capacity=4, ttl_seconds=60)
+    monkeypatch.setattr(answers, "answer_keys", cache)
+    old = QuestionKey(question_type="single", points=1, correct_option_ids=frozenset({1}))
+    added = QuestionKey(question_type="single", points=2, correct_option_ids=frozenset({2}))
+    cache.store(1, {10: old}, cache.generation)
+
+    class Questions:
+        compiled = 0
+
+        async def get_quiz_id_by_question_id(self, *, question_id):
+            return {10: 1, 11: 1}.get(question_id)
+
+        async def get_answer_key(self, *, quiz_id):
+            self.compiled += 1
+            return {10: old, 11: added}
+
+    questions_repo = Questions()
+
+    assert asyncio.run(get_question_key(question_id=11, questions_repo=questions_repo)) == added
+    assert asyncio.run(get_question_key(question_id=11, questions_repo=questions_repo)) == added
+    assert asyncio.run(get_question_key(question_id=12, questions_repo=questions_repo)) is None
+    assert questions_repo.compiled == 1
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+from app.services.gemini_ai import (
+    GeminiAIService,
+    GeneratedQuiz,
+    QuestionData,
+    QuizGenerationData,
+    part_hints,
+    question_fingerprint,
+    split_question_counts,
+)
+from app.utils.resilience import CircuitOpenError
+
+
+def question(text: str) -> QuestionData:
+    return QuestionData(question_text=text, options=["a", "b", "c", "d"], correct_answer=0)
+
+
+class Gemini(GeminiAIService):
+    """Answers each part with the questions `answer(num_questions, hint)` returns, recording the calls."""
+
+    questions_per_call = 10
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = []
+
+    async def _generate_part(self, prompt, num_questions, hint=""):
+        self.calls.append((num_questions, hint))
+        await asyncio.sleep(0)
+        return QuizGenerationData(title="Title", description="Description", questions=self.answer(num_questions, hint))
+
+
+@pytest.mark.parametrize(
+    ("num_questions", "sizes"),
+    [(0, []), (5, [5]), (10, [10]), (11, [6, 5]), (50, [10, 10, 10, 10, 10]), (23, [8, 8, 7])],
+)
+def test_questions_are_split_into_even_calls(num_questions, sizes):
+    assert split_question_counts(num_questions, 10) == sizes
+
+
+def test_parts_get_distinct_focus_hints():
+    assert part_hints(1) == [""]
+    hints = part_hints(3, avoid=["What is X?"])
+    assert len(set(hints)) == 3
+    assert all("part" in hint and "What is X?" in hint for hint in hints)
+
+
+def test_fingerprint_ignores_case_punctuation_and_spacing():
+    assert question_fingerprint("What is  a Closure?") == question_fingerprint("what is a closure")
+    assert question_fingerprint("What is a closure?") != question_fingerprint("What is a class?")
+
+
+def test_merged_quiz_keeps_distinct_questions_up_to_the_limit():
+    quiz = GeneratedQuiz(2)
+    quiz.add_fields(title="Title", description="Description")
+    assert quiz.add_question(question("One?"))
+    assert not quiz.add_question(question("one"))
+    assert quiz.add_question(question("Two?"))
+    assert not quiz.add_question(question("Three?"))
+    assert [q.question_text for q in quiz.result().questions] == ["One?", "Two?"]
+
+
+def test_large_quiz_is_generated_by_parallel_parts():
+    counter = iter(range(1000))
+    gemini = Gemini(lambda n, hint: [question(f"Q{next(counter)}") for _ in range(n)])
+
+    quiz = asyncio.run(gemini.generate_quiz_from_prompt("python", 50))
+
+    assert len(quiz.questions) == 50
+    assert [size for size, _ in gemini.calls] == [10] * 5
+    assert quiz.title == "Title"
+
+
+def test_duplicates_and_failed_parts_are_topped_up():
+    counter = iter(range(1000))
+
+    def answer(n, hint):
+        if "Do not repeat" in hint:
+            return [question(f"Q{next(counter)}") for _ in range(n)]
+        if "part 1 of" in hint:
+            raise ValueError("truncated")
+        if "part 2 of" in hint:
+            return [question("Same?") for _ in range(n)]
+
+    gemini = Gemini(answer)
+    quiz = asyncio.run(gemini.generate_quiz_from_prompt("python", 20))
+
+    assert len(quiz.questions) == 20
+    assert quiz.questions[0].question_text == "Same?"
+    assert len({question_fingerprint(q.question_text) for q in quiz.questions}) == 20
+    # the top-up round asks for what is still missing and lists the questions to avoid
+    top_up = gemini.calls[2:]
+    assert sum(size for size, _ in top_up) == 19
+    assert all("Same?" in hint for _, hint in top_up)
+
+
+def test_generation_fails_when_top_up_still_falls_short():
+    def answer(n, hint):
+        raise ValueError("truncated")
+
+    with pytest.raises(ValueError, match="truncated"):
+        asyncio.run(Gemini(answer).generate_quiz_from_prompt("python", 5))
+
+    with pytest.raises(ValueError, match="only 1 of 5"):
+        asyncio.run(Gemini(lambda n, hint: [question("Same?")] * n).generate_quiz_from_prompt("python", 5))
+
+
+def test_open_circuit_is_not_topped_up():
+    def answer(n, hint):
+        raise CircuitOpenError("gemini", 3.0)
+
+    gemini = Gemini(answer)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(gemini.generate_quiz_from_prompt("python", 20))
+    assert len(gemini.calls) == 2
+
+
+def test_streamed_parts_are_merged_and_deduplicated():
+    class StreamingGemini(GeminiAIService):
+        questions_per_call = 2
+
+        def __init__(self):
+            pass
+
+        async def stream_quiz_text(self, prompt, num_questions, hint=""):
+            part = hint.split("part ")[1][0] if "part " in hint else "top-up"
+            texts = ["Same?", f"{part}?"] if part != "top-up" else ["Extra?"]
+            yield '{"title": "T", "description": "D", "questions": ['
+            for text in texts:
+                await asyncio.sleep(0)
+                yield f'{{"question_text": "{text}", "options": ["a", "b", "c", "d"], "correct_answer": 0}},'
+            yield "]}"
+
+    async def run():
+        return [event async for event in StreamingGemini().stream_quiz("python", 4)]
+
+    events = asyncio.run(run())
+
+    assert events[:2] == [("title", "T"), ("description", "D")]
+    texts = [value.question_text for name, value in events if name == "question"]
+    assert sorted(texts) == ["1?", "2?", "Extra?", "Same?"]
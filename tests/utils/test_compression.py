@@ -0,0 +1,108 @@
+import asyncio
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.utils.compression import CompressionMiddleware, PrecompressedStaticFiles, negotiate_encoding
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, content_types=["application/json", "application/x-ndjson"])
+
+    @app.get("/large")
+    async def large():
+        return {"items": ["repetitive"] * 100}
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse("x" * 1000)
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(3):
+                yield f'{{"line": {i}}}\n'.encode()
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return app
+
+
+def get(app, url: str, accept_encoding: str = "gzip"):
+    async def run():
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(url, headers={"Accept-Encoding": accept_encoding})
+
+    return asyncio.run(run())
+
+
+def test_negotiate_encoding_respects_quality_and_preference():
+    assert negotiate_encoding("gzip, zstd", ("zstd", "gzip")) == "zstd"
+    assert negotiate_encoding("zstd;q=0, gzip;q=0.5", ("zstd", "gzip")) == "gzip"
+    assert negotiate_encoding("*", ("gzip",)) == "gzip"
+    assert negotiate_encoding("br", ("gzip",)) is None
+    assert negotiate_encoding("", ("gzip",)) is None
+
+
+def test_large_allowed_responses_are_compressed():
+    response = get(make_app(), "/large")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == {"items": ["repetitive"] * 100}
+
+
+def test_small_disallowed_and_identity_responses_pass_through():
+    app = make_app()
+    assert "content-encoding" not in get(app, "/small").headers
+    assert "content-encoding" not in get(app, "/text").headers
+    assert "content-encoding" not in get(app, "/large", accept_encoding="identity").headers
+
+
+def test_streamed_responses_are_compressed_per_chunk():
+    response = get(make_app(), "/stream")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text.splitlines() == ['{"line": 0}', '{"line": 1}', '{"line": 2}']
+
+
+def test_static_files_are_served_precompressed_with_cache_control(tmp_path):
+    source = tmp_path / "bundle.js"
+    source.write_text("console.log('quiz');\n" * 200)
+
+    app = FastAPI()
+    app.mount("/static", PrecompressedStaticFiles(directory=tmp_path, max_age=3600, precompress=True, minimum_size=100))
+
+    assert (tmp_path / "bundle.js.gz").exists()
+
+    response = get(app, "/static/bundle.js")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == "public, max-age=3600"
+    assert response.headers["content-length"] == str((tmp_path / "bundle.js.gz").stat().st_size)
+    assert response.content == source.read_bytes()
+    assert gzip.decompress((tmp_path / "bundle.js.gz").read_bytes()) == source.read_bytes()
+
+    async def revalidate():
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/static/bundle.js", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+
+    assert asyncio.run(revalidate()).status_code == 304
+
+    plain = get(app, "/static/bundle.js", accept_encoding="identity")
+    assert "content-encoding" not in plain.headers
+    assert plain.content == source.read_bytes()
+
+
+def test_zstd_is_preferred_when_available():
+    pytest.importorskip("zstandard")
+
+    response = get(make_app(), "/large", accept_encoding="gzip, zstd")
+    assert response.headers["content-encoding"] == "zstd"
+    assert response.json() == {"items": ["repetitive"] * 100}
@@ -0,0 +1,60 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import UTC, datetime
+
+from app.utils.export import ExportFormat, encode_export
+
+COLUMNS = ("attempt_id", "username", "selected_option_ids", "is_correct", "submitted_at")
+
+
+class FakeRow(tuple):
+    @property
+    def _mapping(self):
+        return dict(zip(COLUMNS, self))
+
+
+SUBMITTED_AT = datetime(2025, 8, 1, 12, tzinfo=UTC)
+BATCHES = [
+    [FakeRow((1, "ann", [3, 4], True, SUBMITTED_AT)), FakeRow((1, "ann", None, None, None))],
+    [FakeRow((2, "bob", [5], False, SUBMITTED_AT))],
+]
+
+
+async def batches(items):
+    for rows in items:
+        yield rows
+
+
+def collect(export_format: ExportFormat, items) -> list[bytes]:
+    async def run():
+        return [chunk async for chunk in encode_export(batches(items), export_format, COLUMNS)]
+
+    return asyncio.run(run())
+
+
+def test_ndjson_yields_one_chunk_per_batch():
+    chunks = collect(ExportFormat.NDJSON, BATCHES)
+    assert len(chunks) == 2
+
+    lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert lines[0] == {"attempt_id": 1, "username": "ann", "selected_option_ids": [3, 4], "is_correct": True, "submitted_at": "2025-08-01T12:00:00+00:00"}
+    assert lines[1]["selected_option_ids"] is None
+
+
+def test_csv_writes_header_and_flattens_values():
+    chunks = collect(ExportFormat.CSV, BATCHES)
+    assert len(chunks) == 2
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows == [
+        list(COLUMNS),
+        ["1", "ann", "3;4", "true", "2025-08-01T12:00:00+00:00"],
+        ["1", "ann", "", "", ""],
+        ["2", "bob", "5", "false", "2025-08-01T12:00:00+00:00"],
+    ]
+
+
+def test_csv_without_rows_is_just_the_header():
+    assert collect(ExportFormat.CSV, []) == [(",".join(COLUMNS) + "\r\n").encode()]
@@ -0,0 +1,15 @@
+from app.services.quiz_generation import generation_cache_key, normalize_prompt
+
+
+def test_near_identical_prompts_share_a_key():
+    assert normalize_prompt("  Python   Basics! ") == "python basics"
+    assert normalize_prompt("python basics 10 questions") == "python basics"
+    assert generation_cache_key("Python basics", 10, "gemini-1.5-flash") == generation_cache_key("python basics, 10 questions.", 10, "gemini-1.5-flash")
+
+
+def test_key_depends_on_question_count_model_and_symbols():
+    key = generation_cache_key("C++ basics", 5, "gemini-1.5-flash")
+
+    assert key != generation_cache_key("C++ basics", 10, "gemini-1.5-flash")
+    assert key != generation_cache_key("C++ basics", 5, "gemini-1.5-pro")
+    assert key != generation_cache_key("C basics", 5, "gemini-1.5-flash")
@@ -0,0 +1,127 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from app.core import settings
+from app.core.tasks import in_refill_hours
+from app.database.repositories.generation_pool import GenerationPoolRepository
+from app.database.repositories.tags import TagsRepository
+from app.schemas.quiz import QuizGenerateRequest
+from app.services import quiz_generation
+from app.services.gemini_ai import QuestionData, QuizGenerationData
+from app.services.quiz_generation import QuizGenerationService
+from app.utils.popularity import SearchTermCounter
+
+
+def generated(num_questions: int) -> QuizGenerationData:
+    return QuizGenerationData(
+        title="Python",
+        description="Pooled",
+        questions=[
+            QuestionData(question_text=f"Q{i}?", options=["a", "b", "c", "d"], correct_answer=0)
+            for i in range(num_questions)
+        ],
+    )
+
+
+def test_search_terms_are_counted_decayed_and_trimmed():
+    counter = SearchTermCounter(capacity=2)
+    for term in ["Python", " python ", "SQL", "python", "sql", "rust", "go"]:
+        counter.record(term)
+
+    assert counter.most_common(2) == ["python", "sql"]
+
+    counter.decay()
+    assert counter.most_common(5) == ["python", "sql"]
+
+    for term in ["a", "b", "c", "d", "e"]:
+        counter.record(term)
+    assert len(counter.most_common(10)) <= 4
+
+
+def test_refill_hours_are_utc_and_empty_means_always():
+    night = datetime(2026, 1, 1, 3, 30, tzinfo=UTC)
+
+    assert in_refill_hours(night, [1, 2, 3])
+    assert not in_refill_hours(night.replace(hour=12), [1, 2, 3])
+    assert in_refill_hours(night.replace(hour=12), [])
+
+
+def test_pool_topics_put_configured_first_then_alternate_tags_and_searches(monkeypatch):
+    async def get_popular_tag_names(self, *, limit):
+        return ["Python", "SQL", "Rust"]
+
+    counter = SearchTermCounter(capacity=10)
+    for term in ["docker", "python", "docker", "kubernetes"]:
+        counter.record(term)
+
+    monkeypatch.setattr(TagsRepository, "get_popular_tag_names", get_popular_tag_names)
+    monkeypatch.setattr(quiz_generation, "search_terms", counter)
+    monkeypatch.setattr(settings, "generation_pool_topics", ["World History!", "python"])
+    monkeypatch.setattr(settings, "generation_pool_popular_topics", 3)
+
+    topics = asyncio.run(QuizGenerationService(db=None).pool_topics())
+
+    assert topics == ["world history", "python", "docker", "sql", "rust"]
+
+
+def test_pooled_quiz_is_claimed_before_the_cache_and_trimmed(monkeypatch):
+    claims = []
+
+    async def claim_data(self, *, topic, model, num_questions):
+        claims.append((topic, num_questions))
+        return generated(10).model_dump()
+
+    async def cached_quiz_data(self, *, request):
+        raise AssertionError("the pool answered first")
+
+    monkeypatch.setattr(settings, "generation_pool_enabled", True)
+    monkeypatch.setattr(GenerationPoolRepository, "claim_data", claim_data)
+    monkeypatch.setattr(QuizGenerationService, "cached_quiz_data", cached_quiz_data)
+
+    request = QuizGenerateRequest(prompt="  Python! ", num_questions=5, force_fresh=True)
+    quiz = asyncio.run(QuizGenerationService(db=None).ready_quiz_data(request=request))
+
+    assert claims == [("python", 5)]
+    assert len(quiz.questions) == 5
+
+
+def test_refill_stops_at_the_target_size_or_when_another_worker_holds_the_topic(monkeypatch):
+    class Engine:
+        @asynccontextmanager
+        async def connect(self):
+            yield None
+
+    stock = {"python": 1, "sql": 0}
+    held_elsewhere = {"sql"}
+    unlocked = []
+
+    async def lock_topic(self, *, topic):
+        return topic not in held_elsewhere
+
+    async def unlock_topic(self, *, topic):
+        unlocked.append(topic)
+
+    async def count_data(self, *, topic, model, num_questions):
+        return stock[topic]
+
+    async def add_data(self, *, topic, model, num_questions, data):
+        stock[topic] += 1
+
+    class Gemini:
+        async def generate_quiz_from_prompt(self, prompt, num_questions):
+            return generated(num_questions)
+
+    monkeypatch.setattr(GenerationPoolRepository, "lock_topic", lock_topic)
+    monkeypatch.setattr(GenerationPoolRepository, "unlock_topic", unlock_topic)
+    monkeypatch.setattr(GenerationPoolRepository, "count_data", count_data)
+    monkeypatch.setattr(GenerationPoolRepository, "add_data", add_data)
+    monkeypatch.setattr(quiz_generation, "get_gemini_service", Gemini)
+
+    service = QuizGenerationService(db=SimpleNamespace(bind=Engine()))
+    added = [asyncio.run(service.refill_pool_topic(topic=topic, size=3, num_questions=10)) for topic in ("python", "sql")]
+
+    assert added == [2, 0]
+    assert stock == {"python": 3, "sql": 0}
+    assert unlocked == ["python"]
@@ -0,0 +1,129 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from app.core import generation_workers
+from app.core.generation_workers import GenerationWorkerPool
+from app.schemas.quiz import QuizGenerateRequest
+from app.services.gemini_ai import QuestionData, QuizGenerationData
+from app.services.quiz_generation import quiz_in_from_generation
+
+SETTINGS = SimpleNamespace(
+    generation_workers=2,
+    generation_poll_interval_seconds=60.0,
+    generation_job_lease_seconds=120.0,
+    generation_job_max_attempts=3,
+)
+
+
+def test_quiz_in_from_generation_marks_the_correct_option():
+    generated = QuizGenerationData(
+        title="Capitals",
+        description="European capitals",
+        questions=[QuestionData(question_text="Capital of France?", options=["Lyon", "Paris", "Nice", "Lille"], correct_answer=1)],
+    )
+
+    quiz_in = quiz_in_from_generation(generated, QuizGenerateRequest(prompt="capitals", is_public=False, tag_names=["geo"]))
+
+    assert (quiz_in.title, quiz_in.is_public, quiz_in.tag_names) == ("Capitals", False, ["geo"])
+    [question] = quiz_in.questions
+    assert question.question_type == "single"
+    assert [option.is_correct for option in question.options] == [False, True, False, False]
+
+
+def test_pool_runs_notified_jobs_and_releases_running_ones_on_stop(monkeypatch):
+    queued = [SimpleNamespace(id=1, attempts=1), SimpleNamespace(id=2, attempts=1)]
+    finished, released = [], []
+    block = asyncio.Event()
+
+    class Jobs:
+        def __init__(self, session):
+            pass
+
+        async def claim_next_job(self, **_):
+            return queued.pop(0) if queued else None
+
+        async def release_job(self, *, job):
+            released.append(job.id)
+
+        async def fail_abandoned_jobs(self, **_):
+            return 0
+
+    class Service:
+        def __init__(self, db):
+            pass
+
+        async def run_generation_job(self, *, job):
+            if job.id == 2:
+                await block.wait()  # still generating at shutdown
+            finished.append(job.id)
+
+    @asynccontextmanager
+    async def pool():
+        yield None
+
+    monkeypatch.setattr(generation_workers, "GenerationJobsRepository", Jobs)
+    monkeypatch.setattr(generation_workers, "QuizGenerationService", Service)
+
+    async def run():
+        workers = GenerationWorkerPool(pool, SETTINGS)
+        workers.start()
+        await asyncio.sleep(0.01)
+        assert finished == [1]
+
+        queued.append(SimpleNamespace(id=3, attempts=1))
+        workers.notify()
+        await asyncio.sleep(0.01)
+        assert finished == [1, 3]
+
+        await workers.stop()
+
+    asyncio.run(run())
+    assert released == [2]
+
+
+def test_pool_renews_the_lease_of_running_jobs_until_it_is_lost(monkeypatch):
+    queued = [SimpleNamespace(id=1, attempts=1)]
+    renewals = []
+    block = asyncio.Event()
+
+    class Jobs:
+        def __init__(self, session):
+            pass
+
+        async def claim_next_job(self, **_):
+            return queued.pop(0) if queued else None
+
+        async def renew_lease(self, *, job, lease_seconds):
+            renewals.append((job.id, lease_seconds))
+            return len(renewals) < 3
+
+        async def release_job(self, *, job):
+            pass
+
+        async def fail_abandoned_jobs(self, **_):
+            return 0
+
+    class Service:
+        def __init__(self, db):
+            pass
+
+        async def run_generation_job(self, *, job):
+            await block.wait()
+
+    @asynccontextmanager
+    async def pool():
+        yield None
+
+    monkeypatch.setattr(generation_workers, "GenerationJobsRepository", Jobs)
+    monkeypatch.setattr(generation_workers, "QuizGenerationService", Service)
+
+    async def run():
+        workers = GenerationWorkerPool(pool, SimpleNamespace(**{**vars(SETTINGS), "generation_workers": 1, "generation_job_lease_seconds": 0.03}))
+        workers.start()
+        await asyncio.sleep(0.1)
+        await workers.stop()
+
+    asyncio.run(run())
+    # the third renewal found the job claimed again, so renewing stopped
+    assert renewals == [(1, 0.03)] * 3
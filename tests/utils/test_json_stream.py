@@ -0,0 +1,92 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.schemas.quiz import QuizGenerateRequest
+from app.services import quiz_generation
+from app.services.gemini_ai import GeminiAIService
+from app.services.quiz_generation import QuizGenerationService
+from app.utils.json_stream import JsonObjectStream
+
+ANSWER = """```json
+{
+  "title": "Escapes \\"and\\" {braces}",
+  "description": "a, b",
+  "questions": [
+    {"question_text": "Which bracket closes a list?", "options": ["]", "}", ")", ">"], "correct_answer": 0},
+    {"question_text": "2 + 2?", "options": ["3", "4", "5", "22"], "correct_answer": 1}
+  ]
+}
+```"""
+
+
+@pytest.mark.parametrize("piece_size", [1, 5, 64, len(ANSWER)])
+def test_members_and_array_items_are_emitted_once_complete(piece_size):
+    document = JsonObjectStream()
+    events = []
+    for start in range(0, len(ANSWER), piece_size):
+        events += document.feed(ANSWER[start:start + piece_size])
+
+    parsed = json.loads(ANSWER.strip("`json\n"))
+    assert events == [
+        ("value", "title", parsed["title"]),
+        ("value", "description", "a, b"),
+        ("item", "questions", parsed["questions"][0]),
+        ("item", "questions", parsed["questions"][1]),
+    ]
+    assert document.done
+
+
+def test_first_question_is_emitted_before_the_answer_is_complete():
+    document = JsonObjectStream()
+    first_question_end = ANSWER.index("},") + 1
+
+    events = document.feed(ANSWER[:first_question_end])
+
+    assert [kind for kind, _, _ in events] == ["value", "value", "item"]
+    assert not document.done
+
+
+def test_generation_stream_sends_questions_then_the_stored_quiz(monkeypatch):
+    class Gemini(GeminiAIService):
+        questions_per_call = 10
+
+        def __init__(self):
+            pass
+
+        async def stream_quiz_text(self, prompt, num_questions, hint=""):
+            for start in range(0, len(ANSWER), 16):
+                yield ANSWER[start:start + 16]
+
+    cached = []
+
+    async def cached_quiz_data(self, *, request):
+        return None
+
+    async def cache_quiz_data(self, *, request, generated):
+        cached.append(generated)
+
+    async def create_generated_quiz(self, *, creator, request, generated):
+        return SimpleNamespace(model_dump=lambda mode: {"id": 7, "title": generated.title})
+
+    monkeypatch.setattr(quiz_generation, "get_gemini_service", Gemini)
+    monkeypatch.setattr(QuizGenerationService, "cached_quiz_data", cached_quiz_data)
+    monkeypatch.setattr(QuizGenerationService, "cache_quiz_data", cache_quiz_data)
+    monkeypatch.setattr(QuizGenerationService, "create_generated_quiz", create_generated_quiz)
+
+    async def run():
+        service = QuizGenerationService(db=None)
+        request = QuizGenerateRequest(prompt="brackets", num_questions=2)
+        return [event async for event in service._generation_events(creator=None, request=request)]
+
+    events = [event.decode().split("\n") for event in asyncio.run(run())]
+
+    assert [lines[0] for lines in events] == ["event: field", "event: field", "event: question", "event: question", "event: done"]
+    assert json.loads(events[3][1].removeprefix("data: ")) == {
+        "index": 1,
+        "question": {"question_text": "2 + 2?", "options": ["3", "4", "5", "22"], "correct_answer": 1},
+    }
+    assert json.loads(events[4][1].removeprefix("data: ")) == {"quiz": {"id": 7, "title": 'Escapes "and" {braces}'}}
+    assert len(cached[0].questions) == 2
@@ -0,0 +1,80 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+from app.services.quizzes import QuizzesService
+from app.utils.leaderboard_cache import LeaderboardCacheEntry, QuizLeaderboardCache
+
+START = datetime(2025, 8, 1, tzinfo=UTC)
+
+
+def entry(user_id: int, score: int, minutes: int = 0) -> LeaderboardCacheEntry:
+    return LeaderboardCacheEntry(
+        user_id=user_id,
+        username=f"user{user_id}",
+        score=score,
+        attempt_no=1,
+        finished_at=START + timedelta(minutes=minutes),
+    )
+
+
+def warmed(cache: QuizLeaderboardCache, quiz_id: int, entries: list[LeaderboardCacheEntry]) -> None:
+    cache.begin_warm(quiz_id)
+    cache.warm(quiz_id, f"quiz{quiz_id}", entries)
+
+
+def user_ids(cache: QuizLeaderboardCache, quiz_id: int) -> list[int]:
+    return [cached.user_id for cached in cache.get(quiz_id)[1]]
+
+
+def test_record_keeps_top_k_in_leaderboard_order():
+    cache = QuizLeaderboardCache(capacity=4, top_k=3, ttl_seconds=60)
+    warmed(cache, 1, [entry(1, 90), entry(2, 80), entry(3, 70)])
+
+    cache.record(1, entry(4, 80, minutes=5))  # ties with user 2 but finished later
+    assert user_ids(cache, 1) == [1, 2, 4]
+
+    cache.record(1, entry(3, 95, minutes=6))  # improvement moves the user up
+    assert user_ids(cache, 1) == [3, 1, 2]
+
+    cache.record(1, entry(1, 50, minutes=7))  # worse than the user's best is ignored
+    cache.record(1, entry(5, 10, minutes=8))  # cannot make a full board
+    assert user_ids(cache, 1) == [3, 1, 2]
+
+
+def test_warm_is_dropped_when_a_write_races_it():
+    cache = QuizLeaderboardCache(capacity=4, top_k=3, ttl_seconds=60)
+
+    cache.begin_warm(1)
+    cache.record(1, entry(1, 90))
+    cache.warm(1, "quiz1", [])
+    assert cache.get(1) is None
+
+    warmed(cache, 1, [])
+    assert cache.get(1) == ("quiz1", [])
+
+
+def test_least_recently_used_quiz_is_evicted():
+    cache = QuizLeaderboardCache(capacity=2, top_k=3, ttl_seconds=60)
+    warmed(cache, 1, [entry(1, 10)])
+    warmed(cache, 2, [entry(1, 20)])
+
+    cache.get(1)
+    warmed(cache, 3, [entry(1, 30)])
+
+    assert cache.get(2) is None
+    assert user_ids(cache, 1) == [1]
+    assert user_ids(cache, 3) == [1]
+
+
+def test_leaderboard_of_a_missing_quiz_leaves_no_warm_marker(monkeypatch):
+    cache = QuizLeaderboardCache(capacity=2, top_k=3, ttl_seconds=60)
+    monkeypatch.setattr("app.services.quizzes.quiz_leaderboards", cache)
+
+    class MissingQuizzesRepository:
+        async def get_quiz_by_id(self, *, quiz_id: int):
+            return None
+
+    result = asyncio.run(QuizzesService(None).get_quiz_leaderboard(quiz_id=404, quizzes_repo=MissingQuizzesRepository()))
+
+    assert not result.success and result.error.status_code == 404
+    assert cache._warming == {}
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core import settings
+from app.services.gemini_ai import GeminiAIService, gemini_circuit
+from app.services.llm_providers import FakeLLMProvider, LLMProvider, create_llm_provider, llm_model_name
+
+
+@pytest.fixture(autouse=True)
+def closed_circuit():
+    # the circuit is shared by every client, and the error injection tests open it
+    gemini_circuit.record_success()
+    yield
+    gemini_circuit.record_success()
+
+
+def fake_settings(**overrides):
+    return settings.model_copy(update={"llm_provider": "fake", "fake_llm_latency_seconds": 0.0, **overrides})
+
+
+def test_fake_provider_is_selected_by_settings():
+    assert isinstance(create_llm_provider(fake_settings()), FakeLLMProvider)
+    assert llm_model_name(fake_settings()) == "fake"
+    assert llm_model_name(settings) == settings.gemini_model
+
+
+def test_providers_must_implement_generate_and_stream():
+    class GenerateOnly(LLMProvider):
+        model_name = "partial"
+
+        async def generate(self, prompt: str, num_questions: int, hint: str = "") -> str:
+            return ""
+
+    with pytest.raises(TypeError, match="stream"):
+        GenerateOnly()
+
+
+def test_fake_answers_are_deterministic_and_differ_per_hint():
+    answer = FakeLLMProvider.answer("python", 3, "part 1")
+
+    assert answer == FakeLLMProvider.answer("python", 3, "part 1")
+    assert answer != FakeLLMProvider.answer("python", 3, "part 2")
+    assert len(json.loads(answer)["questions"]) == 3
+
+
+def test_large_quiz_is_generated_offline():
+    service = GeminiAIService(fake_settings())
+
+    quiz = asyncio.run(service.generate_quiz_from_prompt("python", 50))
+
+    assert len(quiz.questions) == 50
+    assert quiz.title == "Quiz about python"
+
+
+def test_streamed_quiz_matches_the_answer_format():
+    service = GeminiAIService(fake_settings())
+
+    async def run():
+        return [event async for event in service.stream_quiz("python", 12)]
+
+    events = asyncio.run(run())
+
+    assert events[:2] == [("title", "Quiz about python"), ("description", "6 generated questions about python.")]
+    assert sum(name == "question" for name, _ in events) == 12
+
+
+def test_closing_a_stream_early_is_not_a_model_failure():
+    service = GeminiAIService(fake_settings())
+
+    async def run():
+        for _ in range(settings.gemini_circuit_failure_threshold + 1):
+            events = service.stream_quiz("python", 12)
+            await anext(events)
+            await events.aclose()
+        return await service.generate_quiz_from_prompt("python", 3)
+
+    quiz = asyncio.run(run())
+
+    assert gemini_circuit.consecutive_failures == 0
+    assert len(quiz.questions) == 3
+
+
+def test_injected_errors_fail_the_generation():
+    service = GeminiAIService(fake_settings(fake_llm_error_rate=1.0))
+
+    with pytest.raises(ValueError, match="Injected fake LLM failure"):
+        asyncio.run(service.generate_quiz_from_prompt("python", 5))
+
+
+def test_slow_provider_times_out():
+    service = GeminiAIService(fake_settings(fake_llm_latency_seconds=1.0, gemini_timeout_seconds=0.01))
+
+    with pytest.raises(ValueError, match="timed out"):
+        asyncio.run(service.generate_quiz_from_prompt("python", 5))
@@ -0,0 +1,97 @@
+import asyncio
+
+from fastapi import APIRouter, FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+from pydantic import SecretStr
+
+from app.core import settings
+from app.core.metrics import metrics_access_allowed
+from app.core.security import bcrypt_stats, run_bcrypt
+from app.utils import metrics
+from app.utils.metrics import MetricsMiddleware, MetricsRegistry
+
+
+def test_counters_gauges_and_histograms_render_in_exposition_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    in_flight = registry.gauge("in_flight", "In flight.")
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+
+    requests.inc('/a"b')
+    requests.inc('/a"b', amount=2)
+    in_flight.inc()
+    in_flight.dec()
+    for seconds in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(seconds, "/a")
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a\\"b"} 3' in lines
+    assert "in_flight 0" in lines
+    assert [line for line in lines if line.startswith("latency_seconds")] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_middleware_labels_requests_with_the_route_template(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "http_requests", registry.counter("requests", "", ("method", "route", "status")))
+    monkeypatch.setattr(metrics, "http_request_duration", registry.histogram("duration", "", ("method", "route")))
+    monkeypatch.setattr(metrics, "http_requests_in_flight", registry.gauge("in_flight", "", ("method",)))
+
+    router = APIRouter()
+
+    @router.get("/quizzes/{quiz_id}")
+    async def get_quiz(quiz_id: int):
+        return {"id": quiz_id}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.add_middleware(MetricsMiddleware)
+
+    async def run():
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            for path in ("/api/quizzes/1", "/api/quizzes/2", "/api/quizzes/x", "/missing"):
+                await client.get(path)
+            await client.request("BREW", "/missing")
+
+    asyncio.run(run())
+    lines = registry.render().splitlines()
+
+    assert 'requests{method="GET",route="/api/quizzes/{quiz_id}",status="200"} 2' in lines
+    assert 'requests{method="GET",route="/api/quizzes/{quiz_id}",status="422"} 1' in lines
+    assert 'requests{method="GET",route="unmatched",status="404"} 1' in lines
+    assert 'duration_count{method="GET",route="/api/quizzes/{quiz_id}"} 3' in lines
+    assert 'in_flight{method="GET"} 0' in lines
+    assert 'requests{method="other",route="unmatched",status="404"} 1' in lines
+
+
+def test_bcrypt_calls_run_off_the_event_loop_and_are_counted():
+    seen = []
+
+    async def run():
+        return await run_bcrypt(lambda value: seen.append(bcrypt_stats.in_flight) or value * 2, 21)
+
+    assert asyncio.run(run()) == 42
+    assert seen == [1]
+    assert bcrypt_stats.in_flight == 0
+
+
+def test_metrics_are_served_to_allowed_networks_or_with_the_token():
+    def request(host: str, authorization: str | None = None) -> Request:
+        headers = [(b"authorization", authorization.encode())] if authorization else []
+        return Request({"type": "http", "method": "GET", "path": "/metrics", "headers": headers, "client": (host, 1234)})
+
+    restricted = settings.model_copy(update={"metrics_allowed_networks": ["10.0.0.0/8"], "metrics_token": None})
+    with_token = settings.model_copy(update={"metrics_allowed_networks": [], "metrics_token": SecretStr("s3cret")})
+
+    assert metrics_access_allowed(request("10.1.2.3"), restricted)
+    assert not metrics_access_allowed(request("203.0.113.9"), restricted)
+    assert not metrics_access_allowed(request("testclient"), restricted)
+    assert metrics_access_allowed(request("203.0.113.9", "Bearer s3cret"), with_token)
+    assert not metrics_access_allowed(request("203.0.113.9", "Bearer wrong"), with_token)
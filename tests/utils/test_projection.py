@@ -0,0 +1,45 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from app.database.repositories.projections import attempt_projection, question_projection, quiz_projection
+from app.schemas.question import QuestionOutData
+from app.schemas.quiz import QuizOutData
+from app.schemas.quiz_attempt import AttemptOutData
+from app.utils.projection import construct_rows, validate_rows
+
+
+@pytest.mark.parametrize(
+    ("columns", "schema"),
+    [(quiz_projection(), QuizOutData), (question_projection(), QuestionOutData), (attempt_projection(), AttemptOutData)],
+)
+def test_projection_labels_match_schema_fields(columns, schema):
+    assert [column.key for column in columns] == list(schema.model_fields)
+
+
+def test_validate_rows_parses_json_aggregated_children():
+    row = {
+        "id": 1,
+        "quiz_id": 3,
+        "question_text": "2 + 2?",
+        "question_type": "single",
+        "points": 1,
+        "options": [
+            {"id": 7, "question_id": 1, "option_text": "4", "is_correct": True, "created_at": "2025-08-01T12:00:00.5+00:00", "updated_at": None, "deleted_at": None},
+        ],
+        "created_at": datetime(2025, 8, 1, 12, tzinfo=UTC),
+        "updated_at": None,
+        "deleted_at": None,
+    }
+
+    [question] = validate_rows(QuestionOutData, [row])
+    assert question == QuestionOutData.model_validate(row)
+    assert question.options[0].created_at == datetime(2025, 8, 1, 12, 0, 0, 500000, tzinfo=UTC)
+
+
+def test_construct_rows_serializes_like_validated_models():
+    started_at = datetime(2025, 8, 1, 12, tzinfo=UTC)
+    row = {"id": 1, "quiz_id": 2, "user_id": 3, "attempt_no": 1, "score": 0, "started_at": started_at, "finished_at": None}
+
+    [attempt] = construct_rows(AttemptOutData, [row])
+    assert attempt.model_dump_json() == AttemptOutData.model_validate(row).model_dump_json()
@@ -0,0 +1,24 @@
+from app.schemas.option import OptionInQuestionUpdate
+from app.schemas.question import QuestionInQuizUpdate
+from app.services.questions import invalid_item_ids
+
+
+def question(question_id: int | None) -> QuestionInQuizUpdate:
+    return QuestionInQuizUpdate(id=question_id, question_text="Q?", question_type="text")
+
+
+def test_new_items_without_an_id_are_valid():
+    assert invalid_item_ids(set(), [question(None), question(None)]) == []
+    assert invalid_item_ids({1, 2}, [question(2), question(None), question(1)]) == []
+
+
+def test_unknown_and_duplicated_ids_are_invalid_once_each():
+    items_in = [question(3), question(1), question(9), question(1), question(1), question(None)]
+
+    assert invalid_item_ids({1, 2, 3}, items_in) == [1, 9]
+
+
+def test_option_ids_are_checked_the_same_way():
+    options_in = [OptionInQuestionUpdate(id=5, option_text="a"), OptionInQuestionUpdate(id=6, option_text="b")]
+
+    assert invalid_item_ids({5}, options_in) == [6]
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from app.services.quiz_attempts import QuizAttemptsService
+from app.utils.answer_keys import QuestionKey
+from app.utils.leaderboard_cache import LeaderboardCacheEntry, QuizLeaderboardCache
+
+STARTED_AT = datetime(2025, 8, 1, 12, tzinfo=UTC)
+FINISHED_AT = datetime(2025, 8, 1, 12, 15, tzinfo=UTC)
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.commits = 0
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        pass
+
+
+def attempt(attempt_id: int = 5, **fields) -> SimpleNamespace:
+    return SimpleNamespace(
+        **{"id": attempt_id, "quiz_id": 1, "user_id": 7, "attempt_no": 2, "score": 0, "started_at": STARTED_AT, "finished_at": None, **fields}
+    )
+
+
+class FakeAttemptsRepository:
+    def __init__(self) -> None:
+        self.connection = FakeConnection()
+
+    async def get_unfinished_attempt(self, *, user_id: int, quiz_id: int):
+        return None
+
+    async def create_attempt(self, *, quiz_id: int, user_id: int):
+        return attempt(quiz_id=quiz_id, user_id=user_id)
+
+    async def get_attempt_by_id(self, *, attempt_id: int):
+        return attempt(attempt_id)
+
+    async def finish_attempt(self, *, attempt, score: int):
+        attempt.score = score
+        attempt.finished_at = FINISHED_AT
+        return attempt
+
+
+class FakeQuizzesRepository:
+    async def get_quiz_by_id(self, *, quiz_id: int):
+        return SimpleNamespace(id=quiz_id)
+
+
+class FakeQuestionsRepository:
+    async def get_answer_key(self, *, quiz_id: int):
+        return {
+            10: QuestionKey(question_type="single", points=3, correct_option_ids=frozenset({100})),
+            11: QuestionKey(question_type="single", points=2, correct_option_ids=frozenset({110})),
+        }
+
+
+class FakeAnswersRepository:
+    async def get_answers_by_attempt(self, *, attempt_id: int):
+        return [
+            SimpleNamespace(id=1, attempt_id=attempt_id, question_id=10, selected_option_ids=[100], text_answer=None, is_correct=True),
+            SimpleNamespace(id=2, attempt_id=attempt_id, question_id=11, selected_option_ids=[111], text_answer=None, is_correct=False),
+        ]
+
+
+class FakeRollupsRepository:
+    async def record_finished_attempt(self, *, attempt) -> None:
+        pass
+
+
+def warmed_board(monkeypatch) -> QuizLeaderboardCache:
+    cache = QuizLeaderboardCache(capacity=4, top_k=3, ttl_seconds=60)
+    monkeypatch.setattr("app.services.quiz_attempts.quiz_leaderboards", cache)
+    monkeypatch.setattr("app.services.answers.answer_keys.get", lambda quiz_id: None)
+    cache.begin_warm(1)
+    cache.warm(1, "quiz1", [LeaderboardCacheEntry(user_id=8, username="other", score=1, attempt_no=1, finished_at=STARTED_AT)])
+    return cache
+
+
+def test_starting_an_attempt_commits_it_and_leaves_the_leaderboard_alone(monkeypatch):
+    cache = warmed_board(monkeypatch)
+    attempts_repo = FakeAttemptsRepository()
+
+    result = asyncio.run(
+        QuizAttemptsService(None).start_quiz_attempt(
+            quiz_id=1,
+            user=SimpleNamespace(id=7, username="player"),
+            attempts_repo=attempts_repo,
+            quizzes_repo=FakeQuizzesRepository(),
+        )
+    )
+    response = asyncio.run(result.unwrap())
+
+    assert response.message == "Quiz attempt started successfully"
+    assert response.data.attempt_no == 2
+    assert attempts_repo.connection.commits == 1
+    assert [entry.user_id for entry in cache.get(1)[1]] == [8]
+
+
+def test_submitting_an_attempt_records_it_on_the_cached_leaderboard(monkeypatch):
+    cache = warmed_board(monkeypatch)
+
+    result = asyncio.run(
+        QuizAttemptsService(None).submit_quiz_attempt(
+            attempt_id=5,
+            user=SimpleNamespace(id=7, username="player"),
+            attempts_repo=FakeAttemptsRepository(),
+            questions_repo=FakeQuestionsRepository(),
+            answers_repo=FakeAnswersRepository(),
+            rollups_repo=FakeRollupsRepository(),
+        )
+    )
+    response = asyncio.run(result.unwrap())
+
+    assert response.data.total_points == 3
+    assert cache.get(1)[1][0] == LeaderboardCacheEntry(
+        user_id=7, username="player", score=3, attempt_no=2, finished_at=FINISHED_AT
+    )
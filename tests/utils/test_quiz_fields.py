@@ -0,0 +1,42 @@
+import pytest
+from fastapi.exceptions import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.dependencies.quizzes import get_quiz_field_selection
+from app.database.repositories.projections import quiz_document
+from app.models.answer import Answer  # noqa: F401 - registers the mapper Question.answers refers to
+from app.schemas.quiz import QUIZ_SCALAR_FIELDS, QuizInclude
+
+
+def test_no_parameters_keeps_default_shape():
+    assert get_quiz_field_selection(fields=None, include=None) is None
+
+
+def test_fields_are_normalized_and_always_include_id():
+    selection = get_quiz_field_selection(fields=" title , created_at,title", include=None)
+
+    assert selection.fields == ("id", "title", "created_at")
+    assert selection.include == ()
+
+
+def test_include_options_implies_questions():
+    selection = get_quiz_field_selection(fields=None, include="options")
+
+    assert selection.fields == QUIZ_SCALAR_FIELDS
+    assert selection.include == (QuizInclude.QUESTIONS, QuizInclude.OPTIONS)
+
+
+@pytest.mark.parametrize(("fields", "include"), [("id,password", None), (None, "tags,answers")])
+def test_unknown_names_are_rejected(fields, include):
+    with pytest.raises(HTTPException) as error:
+        get_quiz_field_selection(fields=fields, include=include)
+
+    assert error.value.status_code == 400
+
+
+def test_quiz_document_only_renders_requested_parts():
+    sql = str(quiz_document(fields=("id", "title"), include=("tags",)).compile(dialect=postgresql.dialect()))
+
+    assert "quiz_tags" in sql
+    assert "questions" not in sql
+    assert "description" not in sql
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from app.utils import resilience
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, CircuitState, TokenBucket
+
+
+def test_circuit_opens_after_consecutive_failures_and_lets_one_trial_through(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(resilience, "monotonic", lambda: clock[0])
+    circuit = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+
+    circuit.before_call()
+    circuit.record_failure()
+    circuit.before_call()
+    circuit.record_success()  # resets the consecutive count
+    for _ in range(2):
+        circuit.before_call()
+        circuit.record_failure()
+    assert circuit.state is CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError) as error:
+        circuit.before_call()
+    assert error.value.retry_after == 30
+
+    clock[0] += 30
+    circuit.before_call()  # the trial call
+    with pytest.raises(CircuitOpenError):
+        circuit.before_call()
+
+    circuit.record_failure()  # a failed trial reopens at once
+    assert circuit.state is CircuitState.OPEN and circuit.times_opened == 2
+
+    clock[0] += 30
+    circuit.before_call()
+    circuit.record_success()
+    assert circuit.state is CircuitState.CLOSED
+    circuit.before_call()
+
+
+def test_abandoned_trial_frees_the_slot_without_counting_as_a_failure(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(resilience, "monotonic", lambda: clock[0])
+    circuit = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    circuit.before_call()
+    circuit.record_failure()
+
+    clock[0] += 30
+    circuit.before_call()
+    circuit.record_abandoned()
+
+    assert circuit.state is CircuitState.HALF_OPEN and circuit.consecutive_failures == 1
+    circuit.before_call()  # the next call becomes the trial
+    circuit.record_success()
+    assert circuit.state is CircuitState.CLOSED
+
+
+def test_token_bucket_allows_a_burst_then_waits_for_refills(monkeypatch):
+    clock = [0.0]
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(resilience, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(resilience.asyncio, "sleep", fake_sleep)
+
+    async def run():
+        bucket = TokenBucket(rate=2, capacity=2)
+        return [await bucket.acquire() for _ in range(4)]
+
+    assert asyncio.run(run()) == [0.0, 0.0, 0.5, 0.5]
+    assert slept == [0.5, 0.5]
@@ -0,0 +1,18 @@
+from app.utils.response_cache import ResponseCache
+
+
+def test_key_normalizes_parameter_order():
+    assert ResponseCache.key("quizzes:get_all", skip=0, limit=20) == ResponseCache.key("quizzes:get_all", limit=20, skip=0)
+
+
+def test_body_rendered_before_invalidation_is_not_stored():
+    cache = ResponseCache(capacity=8, ttl_seconds=60)
+    key = ResponseCache.key("quizzes:get_all", skip=0, limit=20)
+
+    generation = cache.generation
+    cache.invalidate()
+    cache.set(key, b"stale", generation)
+    assert cache.get(key) is None
+
+    cache.set(key, b"fresh", cache.generation)
+    assert cache.get(key) == b"fresh"
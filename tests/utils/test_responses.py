@@ -0,0 +1,54 @@
+import asyncio
+
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel
+
+from app.api.routing import PrevalidatedRoute
+from app.utils.responses import FastJSONResponse
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+class ItemWithSecret(Item):
+    secret: str
+
+
+def make_app() -> FastAPI:
+    router = APIRouter(route_class=PrevalidatedRoute)
+
+    @router.post("/items", response_model=Item, status_code=201)
+    async def create_item():
+        return Item(id=1, name="quiz")
+
+    @router.get("/items/secret", response_model=Item)
+    async def get_item_with_secret():
+        return ItemWithSecret(id=2, name="quiz", secret="hidden")
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.include_router(router)
+    return app
+
+
+def request(method: str, url: str):
+    async def run():
+        async with AsyncClient(transport=ASGITransport(app=make_app()), base_url="http://test") as client:
+            return await client.request(method, url)
+
+    return asyncio.run(run())
+
+
+def test_exact_response_model_is_serialized_once_with_route_status():
+    response = request("POST", "/items")
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == Item(id=1, name="quiz").model_dump_json().encode()
+
+
+def test_subclass_takes_regular_path_and_is_filtered_by_response_model():
+    response = request("GET", "/items/secret")
+    assert response.status_code == 200
+    assert response.json() == {"id": 2, "name": "quiz"}
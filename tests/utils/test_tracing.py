@@ -0,0 +1,202 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from asgi_correlation_id import CorrelationIdMiddleware
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.database.repositories.base import db_error_handler
+from app.utils.responses import FastJSONResponse
+from app.utils.service_result import return_service
+from app.utils.tracing import (
+    BackgroundExporter,
+    JsonLinesExporter,
+    OTLPHttpExporter,
+    RingBufferExporter,
+    TracingMiddleware,
+    instrument_engine,
+    span,
+    tracer,
+)
+
+
+@pytest.fixture
+def buffer():
+    buffer = RingBufferExporter(10)
+    tracer.configure([buffer])
+    yield buffer
+    tracer.shutdown()
+
+
+class ItemsRepository:
+    @db_error_handler
+    async def get_item(self, item_id: int) -> dict:
+        return {"id": item_id}
+
+
+class ItemsService:
+    @return_service
+    async def get_item(self, item_id: int) -> dict:
+        return await ItemsRepository().get_item(item_id)
+
+
+def traced_app() -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        result = await ItemsService().get_item(item_id)
+        return await result.unwrap()
+
+    app.add_middleware(TracingMiddleware)
+    app.add_middleware(CorrelationIdMiddleware)
+    return app
+
+
+def get(app: FastAPI, path: str, **kwargs):
+    async def run():
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_request_spans_nest_route_service_repository_and_serialization(buffer):
+    request_id = "0123456789abcdef0123456789abcdef"
+    response = get(traced_app(), "/items/7", headers={"X-Request-ID": request_id})
+
+    assert response.json() == {"id": 7}
+    [spans] = buffer.recent()
+    by_name = {span.name: span for span in spans}
+    root = by_name["GET /items/{item_id}"]
+    service = by_name["ItemsService.get_item"]
+    repository = by_name["ItemsRepository.get_item"]
+    serialization = by_name["serialize response"]
+
+    assert spans[-1] is root and root.parent_id is None
+    assert root.trace_id == request_id
+    assert root.attributes["correlation_id"] == request_id
+    assert root.attributes["http.status_code"] == 200
+    assert (service.kind, service.parent_id) == ("service", root.span_id)
+    assert (repository.kind, repository.parent_id) == ("repository", service.span_id)
+    assert serialization.parent_id == root.span_id
+    assert all(span.trace_id == request_id and span.end_ns >= span.start_ns for span in spans)
+
+
+def test_unsampled_requests_and_code_outside_a_trace_record_nothing(buffer):
+    with span("outside") as outside:
+        assert outside is None
+
+    tracer.sample_rate = 0.0
+    get(traced_app(), "/items/1")
+
+    assert buffer.recent() == []
+
+
+def test_ring_buffer_keeps_the_latest_traces_newest_first(buffer):
+    app = traced_app()
+    for item_id in range(12):
+        get(app, f"/items/{item_id}", headers={"X-Request-ID": f"{item_id:032x}"})
+
+    recent = buffer.recent(3)
+
+    assert len(buffer.traces) == 10
+    assert [spans[-1].trace_id for spans in recent] == [f"{item_id:032x}" for item_id in (11, 10, 9)]
+
+
+def test_sql_statements_become_child_spans(buffer):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, max_statement_length=20)
+
+    with tracer.start_trace("job", "internal") as root, engine.connect() as conn:
+        conn.execute(text("SELECT 1 AS first_column_name"))
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing"))
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 2"))
+
+    [spans] = buffer.recent()
+    sql = [span for span in spans if span.kind == "sql"]
+
+    assert [span.attributes["db.statement"] for span in sql] == ["SELECT 1 AS first_co", "SELECT * FROM missin"]
+    assert all(span.parent_id == root.span_id for span in sql)
+    assert sql[0].error is None
+    assert sql[1].error.startswith("OperationalError")
+
+
+def test_json_lines_exporter_appends_one_line_per_span(tmp_path, buffer):
+    path = tmp_path / "traces.jsonl"
+    exporter = JsonLinesExporter(str(path))
+    tracer.configure([buffer, exporter])
+
+    get(traced_app(), "/items/3")
+    exporter.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines][-1] == "GET /items/{item_id}"
+    assert {line["kind"] for line in lines} == {"service", "repository", "serialization", "server"}
+
+
+def test_background_exporters_must_implement_write():
+    class Unwritten(BackgroundExporter):
+        pass
+
+    with pytest.raises(TypeError, match="write"):
+        Unwritten()
+
+
+class CollectorStandIn(BaseHTTPRequestHandler):
+    received: list = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.received.append((self.path, self.headers["Content-Type"], self.headers.get("Authorization"), json.loads(body)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def collector():
+    CollectorStandIn.received = []
+    server = HTTPServer(("127.0.0.1", 0), CollectorStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1/traces", CollectorStandIn.received
+    server.shutdown()
+    server.server_close()
+
+
+def test_otlp_exporter_posts_otlp_json_to_a_collector(collector):
+    endpoint, received = collector
+    exporter = OTLPHttpExporter(endpoint, service_name="quiz-api", headers={"Authorization": "Bearer t"})
+    tracer.configure([exporter])
+
+    with tracer.start_trace("job", "internal", attempt=2) as root:
+        with pytest.raises(ValueError):
+            with span("step", retries=1.5):
+                raise ValueError("boom")
+    tracer.shutdown()
+
+    [(path, content_type, authorization, payload)] = received
+    assert (path, content_type, authorization) == ("/v1/traces", "application/json", "Bearer t")
+
+    [resource_spans] = payload["resourceSpans"]
+    assert resource_spans["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "quiz-api"}}]
+    step, job = resource_spans["scopeSpans"][0]["spans"]
+    assert (job["traceId"], job["spanId"], job["parentSpanId"]) == (root.trace_id, root.span_id, "")
+    assert step["parentSpanId"] == root.span_id
+    assert job["startTimeUnixNano"] == str(root.start_ns)
+    assert {"key": "attempt", "value": {"intValue": "2"}} in job["attributes"]
+    assert {"key": "retries", "value": {"doubleValue": 1.5}} in step["attributes"]
+    assert step["status"] == {"code": 2, "message": "ValueError: boom"}
+    assert job["status"] == {"code": 0}